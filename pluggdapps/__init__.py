@@ -40,7 +40,7 @@ about the package which is documented in :func:`package` function.
 Refer to :ref:`glossary` for terminologies used.
 """
 
-import imp, sys
+import imp, sys, importlib
 import pkg_resources    as pkg
 from   os.path          import join
 
@@ -67,15 +67,19 @@ import pluggdapps.interfaces
 
 # plugins
 import pluggdapps.config    # Load plugins for configuration backends.
-import pluggdapps.erl       # Load netscale interfaces.
-import pluggdapps.commands  # Load pa-script sub-command framework
-import pluggdapps.scaffolds # Load scaffolding framework
-import pluggdapps.web       # Load web framework
-
-# applications
-import pluggdapps.docroot   # Application to serve static files.
-import pluggdapps.webadmin  # Application to configure platform through
+
+subsystems = [
+    'pluggdapps.erl',       # Load netscale interfaces.
+    'pluggdapps.commands',  # Load pa-script sub-command framework
+    'pluggdapps.scaffolds', # Load scaffolding framework
+    'pluggdapps.web',       # Load web framework
+    # applications
+    'pluggdapps.docroot',   # Application to serve static files.
+    'pluggdapps.webadmin',  # Application to configure platform through
                             # browser.
+]
+"""Subsystems of pluggdapps, imported by :func:`loadpackages`. Unless
+`loadpackages()` is asked to load them lazily."""
 
 def package( pa ) :
     """Entry point that returns a dictionary of key,value information about
@@ -96,7 +100,29 @@ def package( pa ) :
         'ttlplugins' : []
     }
 
-def loadpackages():
+def loadpackages( lazy=False ):
+    """Import pluggdapps subsystems and all pluggdapps packages, and
+    initialize plugin data structures.
+
+    ``lazy``,
+        If True, a cached plugin manifest (refer :mod:`pluggdapps.manifest`)
+        is used instead of importing pluggdapps subsystems. Modules defining
+        interfaces and plugins are then imported only when they are looked 
+        up. If the manifest is not available, or stale, all subsystems are
+        imported and the manifest is rebuilt.
+    """
+    from pluggdapps.manifest import manifest_key, load_manifest, \
+                                    build_manifest, save_manifest
+    manifest = None
+    if lazy :
+        key = manifest_key( papackages )
+        manifest = load_manifest( key )
+
+    if manifest :
+        pluggdapps.plugin.PluginMeta._manifest = manifest
+    else :
+        [ importlib.import_module( m ) for m in subsystems ]
+
     packages = list(papackages.keys())
     packages.remove( 'pluggdapps' )
     for pkgname in sorted(packages) :
@@ -105,6 +131,9 @@ def loadpackages():
         imp.load_module( pkgname, f, path, descr )
     pluggdapps.plugin.plugin_init() # Initialize plugin data structures
 
+    if lazy and not manifest :
+        save_manifest( build_manifest( key ))
+
 
 def callpackages( pa ):
     """Call `package` entrypoint for each pluggdapps package."""
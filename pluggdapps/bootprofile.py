@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+# This file is subject to the terms and conditions defined in
+# file 'LICENSE', which is part of this source code package.
+#       Copyright (c) 2011 R Pratap Chakravarthy
+
+"""Profile booting of pluggdapps platform. Functions and methods that take
+part in booting are wrapped to measure wall time and memory allocated by
+them. Measurements are grouped under following phases,
+
+* ``import``, importing pluggdapps, pluggdapps subsystems and packages.
+* ``callpackages``, package() entry point of each pluggdapps package.
+* ``default_settings`` and ``normalize_settings``, for each plugin.
+* ``ini``, parsing master ini file and instance ini files.
+* ``configdb``, dbinit() and config() methods of
+  :class:`pluggdapps.config.ConfigSqlite3DB`.
+* ``startapp``, starting each mounted web-application.
+* ``onboot``, onboot() method of each web-application's router.
+
+Modules once imported are not imported again, hence profiling must be done in
+a fresh python process, refer to
+:class:`pluggdapps.commands.profileboot.ProfileBoot` sub-command.
+"""
+
+import sys, time, json, tracemalloc
+from   functools import wraps
+
+__all__ = [ 'BootProfiler', 'profileboot', 'CHILDSCRIPT' ]
+
+CHILDSCRIPT = (
+    "import time, tracemalloc\n"
+    "tracemalloc.start()\n"
+    "t, mem = time.perf_counter(), tracemalloc.get_traced_memory()[0]\n"
+    "import pluggdapps\n"
+    "t, mem = time.perf_counter() - t, tracemalloc.get_traced_memory()[0] - mem\n"
+    "from pluggdapps.bootprofile import main\n"
+    "main( t, mem )\n"
+)
+"""Python script to profile booting in a fresh process. Command line
+arguments are, master configuration file or an empty string if there is none,
+output file to save measurements as JSON and optionally ``-w`` to boot
+:class:`pluggdapps.platform.Webapps`."""
+
+class BootProfiler( object ):
+    """Collect wall time and allocated memory for boot phases. Measurements
+    for the same ``(phase, name)`` are aggregated. Memory is measured using
+    ``tracemalloc``, which is expected to be started before profiling."""
+
+    def __init__( self ):
+        self.records = {}   # (phase, name) -> [ calls, seconds, bytes ]
+        self._depth = {}    # phase -> True, if a call is being measured
+
+    def record( self, phase, name, seconds, nbytes ):
+        """Add a measurement for ``name`` under ``phase``."""
+        r = self.records.setdefault( (phase, name), [0, 0.0, 0] )
+        r[0] += 1
+        r[1] += seconds
+        r[2] += nbytes
+
+    def wrap( self, phase, name, func ):
+        """Return a wrapper for ``func`` measuring its calls under ``phase``.
+        ``name`` can be a string or a callable accepting the same arguments as
+        ``func`` and returning a string. Only the outermost call of a phase is
+        measured, so that methods chaining to their base class or imports
+        triggering other imports are not counted twice."""
+        @wraps( func )
+        def measured( *args, **kwargs ):
+            if self._depth.get( phase, False ) :
+                return func( *args, **kwargs )
+            nm = name( *args, **kwargs ) if callable( name ) else name
+            self._depth[ phase ] = True
+            mem = tracemalloc.get_traced_memory()[0]
+            t = time.perf_counter()
+            try :
+                return func( *args, **kwargs )
+            finally :
+                self._depth[ phase ] = False
+                self.record( phase, nm, time.perf_counter() - t,
+                             tracemalloc.get_traced_memory()[0] - mem )
+        return measured
+
+    def wrapclassmethod( self, phase, cls, attr ):
+        """Wrap classmethod ``attr`` defined by class ``cls``. Calls are
+        measured under plugin's canonical name of the class they are invoked
+        on."""
+        func = cls.__dict__[ attr ].__func__
+        name = lambda c, *args, **kwargs : getattr( c, 'caname', c.__name__ )
+        setattr( cls, attr, classmethod( self.wrap( phase, name, func )))
+
+    def wrapsettings( self ):
+        """Wrap :class:`pluggdapps.plugin.ISettings` methods for all plugin
+        classes, and their bases, loaded so far."""
+        from pluggdapps.plugin import PluginMeta
+        classes = set()
+        [ classes.update( info['cls'].mro() )
+          for info in PluginMeta._pluginmap.values() ]
+        for cls in classes :
+            for attr in [ 'default_settings', 'normalize_settings' ] :
+                if isinstance( cls.__dict__.get( attr, None ), classmethod ) :
+                    self.wrapclassmethod( attr, cls, attr )
+
+    def wrapmethod( self, phase, cls, attr, name ):
+        """Wrap method ``attr`` for ``cls`` and its base classes."""
+        for c in cls.mro() :
+            func = c.__dict__.get( attr, None )
+            if callable( func ) and not hasattr( func, '__wrapped__' ) :
+                setattr( c, attr, self.wrap( phase, name, func ))
+
+    def table( self ):
+        """Return measurements as list of dictionaries, sorted by wall time.
+        Time is in milliseconds and memory in bytes."""
+        rows = [ { 'phase' : phase, 'name' : name, 'calls' : calls,
+                   'time' : round( seconds * 1000, 3 ), 'alloc' : nbytes }
+                 for (phase, name), (calls, seconds, nbytes)
+                                            in self.records.items() ]
+        return sorted( rows, key=lambda r : r['time'], reverse=True )
+
+
+def profileboot( inifile, webapps=False, prof=None ):
+    """Load pluggdapps packages and boot the platform with master
+    configuration file ``inifile``, same as how `pa` script does. If
+    ``webapps`` is True, :class:`pluggdapps.platform.Webapps` is booted and
+    mounted applications are started. Return :class:`BootProfiler` object
+    with measurements."""
+    import imp, importlib
+    import pluggdapps
+    import pluggdapps.utils
+    from   pluggdapps.plugin   import plugin_info
+    from   pluggdapps.platform import Pluggdapps, Webapps
+    from   pluggdapps.config   import ConfigSqlite3DB
+
+    prof = prof or BootProfiler()
+    importlib.import_module = prof.wrap(
+        'import', lambda m, *a, **kw : m, importlib.import_module )
+    imp.load_module = prof.wrap(
+        'import', lambda m, *a, **kw : m, imp.load_module )
+    pluggdapps.utils.call_entrypoint = prof.wrap(
+        'callpackages', lambda d, *a, **kw : d.project_name,
+        pluggdapps.utils.call_entrypoint )
+    Pluggdapps._loadini = prof.wrap(
+        'ini', lambda pa, ini, *a : ini, Pluggdapps._loadini )
+    Webapps._loadinstance = prof.wrap(
+        'ini', lambda pa, appsett, ini, **kw : ini, Webapps._loadinstance )
+    ConfigSqlite3DB.dbinit = prof.wrap(
+        'configdb', 'dbinit', ConfigSqlite3DB.dbinit )
+    ConfigSqlite3DB.config = prof.wrap(
+        'configdb', 'config', ConfigSqlite3DB.config )
+
+    prof.wrap( 'loadpackages', 'loadpackages',
+               pluggdapps.loadpackages )( lazy=True )
+    prof.wrapsettings()
+
+    platform = Webapps if webapps else Pluggdapps
+    pa = prof.wrap( 'boot', platform.__name__, platform.boot )( inifile )
+    if webapps :
+        for webapp in pa.webapps.values() :
+            name = '%s %s' % (webapp.caname, webapp.netpath)
+            webapp.startapp = prof.wrap( 'startapp', name, webapp.startapp )
+            cls = plugin_info( webapp['IHTTPRouter'].lower() )['cls']
+            prof.wrapmethod( 'onboot', cls, 'onboot',
+                 lambda r : '%s %s' % (r.caname, r.webapp.netpath) )
+        prof.wrap( 'start', platform.__name__, pa.start )()
+    return prof
+
+def main( seconds, nbytes ):
+    """Entry point for :data:`CHILDSCRIPT`. ``seconds`` and ``nbytes`` are
+    measurements for importing pluggdapps."""
+    inifile, outfile = sys.argv[1:3]
+    prof = BootProfiler()
+    prof.record( 'import', 'pluggdapps', seconds, nbytes )
+    profileboot( inifile or None, webapps=('-w' in sys.argv[3:]), prof=prof )
+    open( outfile, 'w' ).write( json.dumps( prof.table() ))
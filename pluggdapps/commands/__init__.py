@@ -35,13 +35,15 @@ def mainargs( interface, pattern, argv ):
     if pattern :
         pattc = re.compile(pattern)
         subcmds = [ name.split('.', 1)[1]
-                    for name in PluginMeta._implementers[ interface ].keys()
+                    for name in PluginMeta._lookup( interface ).keys()
                     if re.match(pattc, name) ]
     else :
         subcmds = [ name.split('.', 1)[1]
-                    for name in PluginMeta._implementers[ interface ].keys() ]
+                    for name in PluginMeta._lookup( interface ).keys() ]
 
-    return h.takewhile( lambda x : x not in subcmds, argv )
+    # Sub-commands can be aliased with hyphenated names, like `profile-boot`.
+    issubcmd = lambda x : not x.startswith('-') and x.replace('-','') in subcmds
+    return h.takewhile( lambda x : not issubcmd(x), argv )
 
 import pluggdapps.commands.commands
 import pluggdapps.commands.ls
@@ -49,3 +51,10 @@ import pluggdapps.commands.serve
 import pluggdapps.commands.pviews
 import pluggdapps.commands.unittest
 import pluggdapps.commands.confdoc
+import pluggdapps.commands.profileboot
+import pluggdapps.commands.connmem
+import pluggdapps.commands.resolvebench
+import pluggdapps.commands.stats
+import pluggdapps.commands.forkbench
+import pluggdapps.commands.timerbench
+import pluggdapps.commands.readbench
@@ -48,6 +48,7 @@ class ConfDoc( Singleton ):
     def handle( self, args ):
         """:meth:`pluggdapps.interfaces.ICommand.handle` interface method."""
         from pluggdapps.plugin import PluginMeta
+        PluginMeta._lazyimportall()
         catalog = ""
         package = (args.package + ':') if args.package else ''
         catalogf = args.outpath or 'configuration.rst'
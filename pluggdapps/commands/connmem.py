@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+# This file is subject to the terms and conditions defined in
+# file 'LICENSE', which is part of this source code package.
+#       Copyright (c) 2011 R Pratap Chakravarthy
+
+import gc, socket, resource, tracemalloc
+
+from   pluggdapps.plugin        import implements, Singleton
+from   pluggdapps.interfaces    import ICommand
+import pluggdapps.utils         as h
+
+class ConnMem( Singleton ):
+    """Sub-command plugin for pa-script to measure memory held by idle
+    connections. Opens N connected socket pairs, hands over one end of each
+    pair to the web server, as if accepted from a listening socket, and
+    reports the memory allocated per connection while the connection waits
+    for its request.
+
+    .. code-block:: bash
+        :linenos:
+
+        $ pa -w -c <master.ini> connmem -n 10000
+
+    The server is not started, the measurement includes the connection
+    plugin, its stream, timeout and event-poll subscription. File descriptor
+    limit is raised to hard-limit if required.
+    """
+
+    implements( ICommand )
+
+    description = "Measure memory held by idle http connections."
+    cmd = 'connmem'
+
+    #---- ICommand API
+    def subparser( self, parser, subparsers ):
+        """:meth:`pluggdapps.interfaces.ICommand.subparser` interface method.
+        """
+        self.subparser = subparsers.add_parser(
+                                self.cmd, description=self.description )
+        self.subparser.set_defaults( handler=self.handle )
+        self.subparser.add_argument(
+                "-n", dest="count",
+                type=int, default=1000,
+                help="Number of idle connections to open." )
+        self.subparser.add_argument(
+                "-t", dest="top",
+                type=int, default=0,
+                help="Report top allocating source lines." )
+        return parser
+
+    def handle( self, args ):
+        """:meth:`pluggdapps.interfaces.ICommand.handle` interface method."""
+        server = self.qp( 'pluggdapps.IHTTPServer', self['IHTTPServer'] )
+        self.fdlimit( args.count * 2 + 64 )
+
+        pairs = [ socket.socketpair() for i in range( args.count ) ]
+        gc.collect()
+        tracemalloc.start()
+        try :
+            mem = tracemalloc.get_traced_memory()[0]
+            for i, (a, b) in enumerate( pairs ) :
+                server.handle_connection( a, ('127.0.0.1', i) )
+            gc.collect()
+            nbytes = tracemalloc.get_traced_memory()[0] - mem
+            stats = tracemalloc.take_snapshot().statistics( 'lineno' )
+        finally :
+            tracemalloc.stop()
+
+        conns = len( server.connections )
+        print( "connections      : %s" % conns )
+        print( "allocated (KB)   : %.1f" % (nbytes / 1024) )
+        print( "bytes/connection : %.1f" % (nbytes / (conns or 1)) )
+        for stat in stats[:args.top] :
+            print( stat )
+
+        [ httpconn.close() for httpconn in server.connections[:] ]
+        [ b.close() for a, b in pairs ]
+
+    #---- Local functions
+
+    def fdlimit( self, count ):
+        """Raise soft limit for open file descriptors to ``count``, not
+        exceeding hard limit."""
+        soft, hard = resource.getrlimit( resource.RLIMIT_NOFILE )
+        if soft != resource.RLIM_INFINITY and soft < count :
+            count = count if hard == resource.RLIM_INFINITY \
+                          else min( count, hard )
+            resource.setrlimit( resource.RLIMIT_NOFILE, (count, hard) )
+
+    # ISettings interface methods
+    @classmethod
+    def default_settings( cls ):
+        """:meth:`pluggdapps.plugin.ISettings.default_settings` interface
+        method."""
+        return _default_settings
+
+    @classmethod
+    def normalize_settings( cls, settings ):
+        """:meth:`pluggdapps.plugin.ISettings.normalize_settings` interface
+        method."""
+        return settings
+
+
+_default_settings = h.ConfigDict()
+_default_settings.__doc__ = ConnMem.__doc__
+
+_default_settings['IHTTPServer'] = {
+    'default' : 'pluggdapps.HTTPEPollServer',
+    'types'   : (str,),
+    'help'    : "Plugin name implementing :class:`IHTTPServer`. Connections "
+                "are handed over to this server plugin.",
+    'webconfig' : False,
+}
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+
+# This file is subject to the terms and conditions defined in
+# file 'LICENSE', which is part of this source code package.
+#       Copyright (c) 2011 R Pratap Chakravarthy
+
+import os, signal, time, socket, http.client
+
+from   pluggdapps.plugin        import implements, Singleton
+from   pluggdapps.interfaces    import ICommand
+from   pluggdapps.log           import closeall
+import pluggdapps.utils         as h
+
+class ForkBench( Singleton ):
+    """Sub-command plugin for pa-script to benchmark throughput of web server
+    in pre-fork mode, refer to :mod:`pluggdapps.web.prefork`. For each count
+    of workers, server is started in a forked process and loaded by client
+    processes, each sending requests on a keep-alive connection, for a fixed
+    duration. Requests served per second is reported.
+
+    .. code-block:: bash
+        :linenos:
+
+        $ pa -w -c <master.ini> forkbench -w 1 2 4 -d 5 -u example.com/
+
+    Disable debug and console logging in master configuration file for
+    meaningful numbers. Client processes run on the same machine, hence
+    throughput scales only till server workers and clients together
+    saturate the available CPUs.
+    """
+
+    implements( ICommand )
+
+    description = "Benchmark throughput of pre-fork web server."
+    cmd = 'forkbench'
+
+    #---- ICommand API
+    def subparser( self, parser, subparsers ):
+        """:meth:`pluggdapps.interfaces.ICommand.subparser` interface method.
+        """
+        self.subparser = subparsers.add_parser(
+                                self.cmd, description=self.description )
+        self.subparser.set_defaults( handler=self.handle )
+        self.subparser.add_argument(
+                "-w", dest="workers",
+                type=int, nargs='+', default=None,
+                help="Number of workers to benchmark, defaults to powers of "
+                     "2 till number of CPUs." )
+        self.subparser.add_argument(
+                "-c", dest="clients",
+                type=int, default=0,
+                help="Number of client processes, defaults to twice the "
+                     "number of workers." )
+        self.subparser.add_argument(
+                "-d", dest="duration",
+                type=float, default=3.0,
+                help="Seconds to load the server for each count of workers." )
+        self.subparser.add_argument(
+                "-u", dest="url",
+                default=None,
+                help="Netpath and path to request, like example.com/index. "
+                     "Defaults to the first mounted application." )
+        return parser
+
+    def handle( self, args ):
+        """:meth:`pluggdapps.interfaces.ICommand.handle` interface method."""
+        # Web modules are imported only when the command is run, so that
+        # other sub-commands do not pay for them.
+        from pluggdapps.web.prefork import Supervisor
+        server = self.qp( 'pluggdapps.IHTTPServer', self['IHTTPServer'] )
+        host, path = self.target( args.url )
+        workers = args.workers or self.workercounts( h.cpu_count() )
+        self.pa.start()
+
+        fmt = '%8s %8s %10s %10s'
+        print( "Requesting http://%s%s on %s CPUs" % (host,path,h.cpu_count()))
+        print( fmt % ('workers', 'clients', 'requests', 'req/sec') )
+        for count in workers :
+            clients = args.clients or count * 2
+            pid, address = self.startserver( Supervisor, server, count )
+            try :
+                n = self.load( address, host, path, clients, args.duration )
+            finally :
+                os.kill( pid, signal.SIGTERM )
+                os.waitpid( pid, 0 )
+            print( fmt % ( count, clients, n, '%.1f' % (n / args.duration) ))
+
+    #---- Local functions
+
+    def workercounts( self, cpus ):
+        """Powers of 2 less than ``cpus``, and ``cpus``."""
+        counts, n = [], 1
+        while n < cpus :
+            counts.append( n )
+            n *= 2
+        return counts + [ cpus ]
+
+    def target( self, url ):
+        """Return host and path to request."""
+        if url is None :
+            netpaths = sorted( self.pa.netpaths )
+            url = netpaths[0] if netpaths else 'localhost/'
+        netloc, path = h.parse_netpath( url )
+        return netloc, path or '/'
+
+    def startserver( self, Supervisor, server, workers ):
+        """Fork a process, using ``Supervisor`` class, supervising
+        ``workers`` number of server processes. Return a tuple of
+        (pid, address) once the server is accepting connections."""
+        sockets = server.bind_sockets()
+        address = sockets[0].getsockname()[:2]
+        if server['listener'] == 'reuseport' :
+            [ sock.close() for sock in sockets ]
+            sockets = []
+        pid = os.fork()
+        if pid == 0 :
+            code = 0
+            try :
+                Supervisor( server, workers, sockets ).start()
+            except BaseException :
+                self.pa.logerror( h.print_exc() )
+                code = 1
+            finally :
+                closeall()
+                os._exit( code )
+
+        [ sock.close() for sock in sockets ]
+        deadline = time.time() + 10
+        while time.time() < deadline :
+            try :
+                socket.create_connection( address, timeout=1 ).close()
+                break
+            except OSError :
+                time.sleep( 0.1 )
+        time.sleep( 0.5 )   # Allow all workers to start.
+        return pid, address
+
+    def load( self, address, host, path, clients, duration ):
+        """Load server listening on ``address`` from ``clients`` number of
+        processes for ``duration`` seconds. Return number of requests
+        served."""
+        deadline = time.time() + duration
+        pipes = []
+        for i in range( clients ) :
+            r, w = os.pipe()
+            if os.fork() == 0 :
+                os.close( r )
+                n = 0
+                try :
+                    n = self.client( address, host, path, deadline )
+                finally :
+                    os.write( w, str( n ).encode( 'ascii' ))
+                    os._exit( 0 )
+            os.close( w )
+            pipes.append( r )
+
+        total = 0
+        for r in pipes :
+            total += int( os.read( r, 64 ) or 0 )
+            os.close( r )
+            os.wait()
+        return total
+
+    def client( self, address, host, path, deadline ):
+        """Send requests on a keep-alive connection till ``deadline``."""
+        n, conn = 0, None
+        headers = { 'Host' : host, 'Connection' : 'keep-alive' }
+        while time.time() < deadline :
+            try :
+                conn = conn or http.client.HTTPConnection( *address )
+                conn.request( 'GET', path, headers=headers )
+                conn.getresponse().read()
+                n += 1
+            except ( OSError, http.client.HTTPException ) :
+                conn.close() if conn else None
+                conn = None
+        return n
+
+    # ISettings interface methods
+    @classmethod
+    def default_settings( cls ):
+        """:meth:`pluggdapps.plugin.ISettings.default_settings` interface
+        method."""
+        return _default_settings
+
+    @classmethod
+    def normalize_settings( cls, settings ):
+        """:meth:`pluggdapps.plugin.ISettings.normalize_settings` interface
+        method."""
+        return settings
+
+
+_default_settings = h.ConfigDict()
+_default_settings.__doc__ = ForkBench.__doc__
+
+_default_settings['IHTTPServer'] = {
+    'default' : 'pluggdapps.HTTPEPollServer',
+    'types'   : (str,),
+    'help'    : "Plugin name implementing :class:`IHTTPServer`, to "
+                "benchmark.",
+    'webconfig' : False,
+}
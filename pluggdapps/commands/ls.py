@@ -73,6 +73,7 @@ class Ls( Singleton ):
 
     def handle( self, args ):
         """:meth:`pluggdapps.interfaces.ICommand.handle` interface method."""
+        PluginMeta._lazyimportall()
 
         opts = [ '_ls_summary', '_ls_settings', '_ls_plugins', '_ls_interfaces',
                  '_ls_webapps', '_ls_packages', '_ls_implementers',
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+# This file is subject to the terms and conditions defined in
+# file 'LICENSE', which is part of this source code package.
+#       Copyright (c) 2011 R Pratap Chakravarthy
+
+import sys, os, json, subprocess, tempfile, shutil
+
+from   pluggdapps.plugin        import implements, Singleton
+from   pluggdapps.interfaces    import ICommand
+from   pluggdapps.platform      import Webapps
+import pluggdapps.utils         as h
+
+class ProfileBoot( Singleton ):
+    """Sub-command plugin for pa-script to profile platform booting. Reports
+    wall time and memory allocated for each boot phase, like importing
+    packages, calling package entry points, gathering plugin settings, parsing
+    ini files, configuration backend and starting web applications. Refer to
+    :mod:`pluggdapps.bootprofile` for the list of phases.
+
+    .. code-block:: bash
+        :linenos:
+
+        $ pa -w -c <master.ini> profile-boot
+
+    Platform is booted again in a fresh process, using the same master
+    configuration file and platform class used by pa-script. Pass ``-C`` to
+    ignore the plugin manifest and boot snapshot cached from earlier boots.
+    """
+
+    implements( ICommand )
+
+    description = "Profile booting of platform."
+    cmd = 'profileboot'
+
+    #---- ICommand API
+    def subparser( self, parser, subparsers ):
+        """:meth:`pluggdapps.interfaces.ICommand.subparser` interface method.
+        """
+        self.subparser = subparsers.add_parser(
+                                self.cmd, aliases=['profile-boot'],
+                                description=self.description )
+        self.subparser.set_defaults( handler=self.handle )
+        self.subparser.add_argument(
+                "-C", dest="cold",
+                action="store_true", default=False,
+                help="Cold boot, without using boot-time caches." )
+        self.subparser.add_argument(
+                "-s", dest="sortby",
+                default='time',
+                choices=[ 'time', 'alloc', 'calls' ],
+                help="Sort measurements by time, alloc or calls." )
+        self.subparser.add_argument(
+                "-n", dest="limit",
+                type=int, default=None,
+                help="Number of rows to report." )
+        self.subparser.add_argument(
+                "-j", dest="jsonfile",
+                default=None,
+                help="Save measurements as JSON in this file." )
+        return parser
+
+    def handle( self, args ):
+        """:meth:`pluggdapps.interfaces.ICommand.handle` interface method."""
+        from pluggdapps.bootprofile import CHILDSCRIPT
+
+        fd, outfile = tempfile.mkstemp( suffix='.json' )
+        os.close( fd )
+        env = dict( os.environ )
+        cachedir = tempfile.mkdtemp() if args.cold else None
+        if cachedir :
+            env['PLUGGDAPPS_CACHE'] = cachedir
+        # Platform booted without master configuration file is passed an
+        # empty argument.
+        cmdargs = [ sys.executable, '-c', CHILDSCRIPT, self.pa.inifile or '',
+                    outfile ]
+        cmdargs += [ '-w' ] if isinstance( self.pa, Webapps ) else []
+        try :
+            subprocess.check_call( cmdargs, env=env,
+                                   stdout=subprocess.DEVNULL )
+            rows = json.loads( open( outfile ).read() )
+        finally :
+            os.remove( outfile )
+            cachedir and shutil.rmtree( cachedir, ignore_errors=True )
+
+        rows = sorted( rows, key=lambda r : r[args.sortby], reverse=True )
+        rows = rows[:args.limit] if args.limit else rows
+        if args.jsonfile :
+            open( args.jsonfile, 'w' ).write( json.dumps( rows, indent=2 ))
+        print( self.report( rows ))
+
+    #---- Local functions
+
+    def report( self, rows ):
+        """Format measurements as text table."""
+        namew = max( [ len(r['name']) for r in rows ] + [4] )
+        fmt = '%-18s %-' + str(namew) + 's %6s %11s %11s'
+        lines = [ fmt % ('phase', 'name', 'calls', 'time(ms)', 'alloc(KB)') ]
+        for r in rows :
+            lines.append( fmt % ( r['phase'], r['name'], r['calls'],
+                                  '%.3f' % r['time'],
+                                  '%.1f' % (r['alloc'] / 1024) ))
+        return '\n'.join( lines )
+
+    # ISettings interface methods
+    @classmethod
+    def default_settings( cls ):
+        """:meth:`pluggdapps.plugin.ISettings.default_settings` interface
+        method."""
+        return _default_settings
+
+    @classmethod
+    def normalize_settings( cls, settings ):
+        """:meth:`pluggdapps.plugin.ISettings.normalize_settings` interface
+        method."""
+        return settings
+
+
+_default_settings = h.ConfigDict()
+_default_settings.__doc__ = ProfileBoot.__doc__
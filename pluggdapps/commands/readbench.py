@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+
+# This file is subject to the terms and conditions defined in
+# file 'LICENSE', which is part of this source code package.
+#       Copyright (c) 2011 R Pratap Chakravarthy
+
+import os, time, socket, collections
+
+from   pluggdapps.plugin        import implements, Singleton
+from   pluggdapps.interfaces    import ICommand
+
+class ReadBench( Singleton ):
+    """Sub-command plugin for pa-script to benchmark read buffers of
+    :class:`pluggdapps.web.server.IOStream`. Data is sent by a forked
+    process over a socket pair and received in ``-s`` sized chunks, the way
+    IOStream does. Time taken to receive is reported for,
+
+    * ``headers``, ``-n`` pipelined requests, each with a header of about
+      ``-H`` bytes, delimited by CRLF-CRLF.
+    * ``body``, request body of ``-b`` mega-bytes, read as a single piece
+      of data of known size.
+
+    for,
+
+    * ``deque``, deque of bytes, merged and split while searching for the
+      delimiter and consuming data.
+    * ``bytearray``, :class:`pluggdapps.web.readbuffer.ReadBuffer`.
+
+    .. code-block:: bash
+        :linenos:
+
+        $ pa readbench -n 20000 -b 10
+    """
+
+    implements( ICommand )
+
+    description = "Benchmark read buffers for parsing requests."
+    cmd = 'readbench'
+
+    #---- ICommand API
+    def subparser( self, parser, subparsers ):
+        """:meth:`pluggdapps.interfaces.ICommand.subparser` interface method.
+        """
+        self.subparser = subparsers.add_parser(
+                                self.cmd, description=self.description )
+        self.subparser.set_defaults( handler=self.handle )
+        self.subparser.add_argument(
+                "-n", dest="requests",
+                type=int, default=20000,
+                help="Number of pipelined requests." )
+        self.subparser.add_argument(
+                "-H", dest="hdrsize",
+                type=int, default=600,
+                help="Size of request header in bytes." )
+        self.subparser.add_argument(
+                "-b", dest="bodysize",
+                type=int, default=10,
+                help="Size of request body in mega-bytes." )
+        self.subparser.add_argument(
+                "-s", dest="chunk",
+                type=int, default=4096,
+                help="Chunk size to read at a time." )
+        return parser
+
+    def handle( self, args ):
+        """:meth:`pluggdapps.interfaces.ICommand.handle` interface method."""
+        # Web modules are imported only when the command is run, so that
+        # other sub-commands do not pay for them.
+        from pluggdapps.web.readbuffer import ReadBuffer
+        ArrayBuffer = arraybuffer( ReadBuffer )
+        header = self.header( args.hdrsize )
+        body = b'x' * (args.bodysize * 1024 * 1024)
+        fmt = '%10s %10s %12s %12s'
+        print( "%s requests of %s byte header, %sMB body, %s byte chunks" % (
+               args.requests, len( header ), args.bodysize, args.chunk ))
+        print( fmt % ('test', 'buffer', 'seconds', 'MB/sec') )
+        for name, cls in [ ('deque', DequeBuffer), ('bytearray', ArrayBuffer) ] :
+            t = self.receive( header * args.requests, args.chunk,
+                              lambda sock : self.headers( sock, cls( args.chunk ),
+                                                          args.requests ))
+            mbs = len( header ) * args.requests / t / 1024 / 1024
+            print( fmt % ('headers', name, '%.3f' % t, '%.1f' % mbs) )
+            t = self.receive( body, args.chunk,
+                              lambda sock : self.body( sock, cls( args.chunk ),
+                                                       len( body )))
+            print( fmt % ('body', name, '%.3f' % t, '%.1f' % (args.bodysize/t)) )
+
+    #---- Local functions
+
+    def header( self, size ):
+        """Request header padded with cookie to about ``size`` bytes."""
+        hdr = ( b"GET /index HTTP/1.1\r\nHost: example.com\r\n"
+                b"Accept: text/html\r\nConnection: keep-alive\r\n" )
+        pad = max( 0, size - len( hdr ) - len( b"Cookie: \r\n\r\n" ))
+        return hdr + b"Cookie: " + b"c" * pad + b"\r\n\r\n"
+
+    def receive( self, data, chunk, reader ):
+        """Send ``data`` from a forked process and return seconds taken by
+        ``reader`` to receive them."""
+        a, b = socket.socketpair()
+        a.setsockopt( socket.SOL_SOCKET, socket.SO_RCVBUF, chunk * 16 )
+        pid = os.fork()
+        if pid == 0 :
+            a.close()
+            b.sendall( data )
+            b.close()
+            os._exit( 0 )
+        b.close()
+        start = time.perf_counter()
+        reader( a )
+        t = time.perf_counter() - start
+        a.close()
+        os.waitpid( pid, 0 )
+        return t
+
+    def headers( self, sock, buf, count ):
+        """Receive ``count`` requests delimited by CRLF-CRLF."""
+        while count :
+            loc = buf.find( b"\r\n\r\n" )
+            if loc == -1 :
+                buf.read( sock, None )
+            else :
+                buf.consume( loc + 4 )
+                count -= 1
+
+    def body( self, sock, buf, size ):
+        """Receive ``size`` bytes and consume them as one piece."""
+        while len( buf ) < size :
+            buf.read( sock, size )
+        assert len( buf.consume( size )) == size
+
+
+class DequeBuffer( object ):
+    """Deque of bytes received from socket, IOStream's read buffer before
+    :class:`ReadBuffer`."""
+
+    def __init__( self, chunk ):
+        self.chunk, self.deque, self.size = chunk, collections.deque(), 0
+
+    def __len__( self ):
+        return self.size
+
+    def read( self, sock, nbytes ):
+        data = sock.recv( self.chunk )
+        self.deque.append( data )
+        self.size += len( data )
+
+    def find( self, delimiter ):
+        while self.deque :
+            loc = self.deque[0].find( delimiter )
+            if loc != -1 or len( self.deque ) == 1 :
+                return loc
+            first, second = len( self.deque[0] ), len( self.deque[1] )
+            self.merge_prefix( max( first * 2, first + second ))
+        return -1
+
+    def consume( self, loc ):
+        self.merge_prefix( loc )
+        self.size -= loc
+        return self.deque.popleft()
+
+    def merge_prefix( self, size ):
+        deque = self.deque
+        if len( deque ) == 1 and len( deque[0] ) <= size :
+            return
+        prefix, remaining = [], size
+        while deque and remaining > 0 :
+            chunk = deque.popleft()
+            if len( chunk ) > remaining :
+                deque.appendleft( chunk[remaining:] )
+                chunk = chunk[:remaining]
+            prefix.append( chunk )
+            remaining -= len( chunk )
+        deque.appendleft( b''.join( prefix ))
+
+
+def arraybuffer( ReadBuffer ):
+    """Return a sub-class of :class:`ReadBuffer`, receiving data the way
+    IOStream does."""
+
+    class ArrayBuffer( ReadBuffer ):
+
+        __slots__ = [ 'chunk' ]
+
+        def __init__( self, chunk ):
+            super().__init__( chunk )
+            self.chunk = chunk
+
+        def read( self, sock, nbytes ):
+            buffered, size = len( self ), self.chunk
+            if nbytes is not None :
+                size = max( size, min( nbytes - buffered, buffered ))
+            if size > self.chunk :
+                self.recv( sock, size )
+            else :
+                self.recv_into( sock, size )
+
+    return ArrayBuffer
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+# This file is subject to the terms and conditions defined in
+# file 'LICENSE', which is part of this source code package.
+#       Copyright (c) 2011 R Pratap Chakravarthy
+
+import random, timeit
+
+from   pluggdapps.plugin        import implements, Singleton
+from   pluggdapps.interfaces    import ICommand
+from   pluggdapps.resolver      import AppResolver
+import pluggdapps.utils         as h
+
+class ResolveBench( Singleton ):
+    """Sub-command plugin for pa-script to benchmark resolution of request
+    to mounted web-application. For each count of mounted applications,
+    synthetic netpaths are mounted, half of them as sub-domains and the other
+    half as script-paths, and time taken to resolve a request is reported
+    for :class:`pluggdapps.resolver.AppResolver` and for linear scan of
+    mounted netpaths.
+
+    .. code-block:: bash
+        :linenos:
+
+        $ pa resolvebench -a 1 10 500
+    """
+
+    implements( ICommand )
+
+    description = "Benchmark request resolution to mounted web-applications."
+    cmd = 'resolvebench'
+
+    #---- ICommand API
+    def subparser( self, parser, subparsers ):
+        """:meth:`pluggdapps.interfaces.ICommand.subparser` interface method.
+        """
+        self.subparser = subparsers.add_parser(
+                                self.cmd, description=self.description )
+        self.subparser.set_defaults( handler=self.handle )
+        self.subparser.add_argument(
+                "-a", dest="apps",
+                type=int, nargs='+', default=[1, 10, 500],
+                help="Number of mounted applications to benchmark." )
+        self.subparser.add_argument(
+                "-n", dest="number",
+                type=int, default=10000,
+                help="Number of requests to resolve." )
+        return parser
+
+    def handle( self, args ):
+        """:meth:`pluggdapps.interfaces.ICommand.handle` interface method."""
+        fmt = '%6s %14s %14s'
+        print( fmt % ('apps', 'resolver(us)', 'linear(us)') )
+        for count in args.apps :
+            netpaths = self.netpaths( count )
+            resolver, linear = AppResolver(), {}
+            for netpath in netpaths :
+                resolver.mount( netpath, netpath )
+                linear[ h.parse_netpath( netpath ) ] = netpath
+            requests = [ self.request( random.choice( netpaths ))
+                         for i in range( args.number ) ]
+            t1 = timeit.timeit(
+                    lambda : [ resolver.resolve( host, path )
+                               for host, path in requests ], number=1 )
+            t2 = timeit.timeit(
+                    lambda : [ self.linearscan( linear, host, path )
+                               for host, path in requests ], number=1 )
+            print( fmt % ( count, '%.3f' % (t1 * 1000000 / args.number),
+                           '%.3f' % (t2 * 1000000 / args.number) ))
+
+    #---- Local functions
+
+    def netpaths( self, count ):
+        """Generate ``count`` netpaths, half as sub-domains and the other half
+        as script-paths."""
+        subdomains = [ 'app%s.example.com/' % i
+                       for i in range( (count+1) // 2 ) ]
+        scripts = [ 'example.com/app%s' % i for i in range( count // 2 ) ]
+        return subdomains + scripts
+
+    def request( self, netpath ):
+        """Generate request (host, path) for an application mounted on
+        ``netpath``."""
+        netloc, script = h.parse_netpath( netpath )
+        return 'www.' + netloc, script.rstrip('/') + '/static/index.html'
+
+    def linearscan( self, mounted, host, path ):
+        """Resolve by scanning each mounted netpath."""
+        for (netloc, script), app in mounted.items() :
+            host = host[4:] if host.startswith('www.') else host
+            if netloc == host :
+                if script in ['/', ''] :
+                    return script, app
+                elif path.startswith( script ) :
+                    return script, app
+        return None, None
+
+    # ISettings interface methods
+    @classmethod
+    def default_settings( cls ):
+        """:meth:`pluggdapps.plugin.ISettings.default_settings` interface
+        method."""
+        return _default_settings
+
+    @classmethod
+    def normalize_settings( cls, settings ):
+        """:meth:`pluggdapps.plugin.ISettings.normalize_settings` interface
+        method."""
+        return settings
+
+
+_default_settings = h.ConfigDict()
+_default_settings.__doc__ = ResolveBench.__doc__
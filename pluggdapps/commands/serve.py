@@ -9,6 +9,7 @@ from   os.path  import abspath
 
 from   pluggdapps.plugin        import implements, ISettings, Singleton
 from   pluggdapps.interfaces    import ICommand, IHTTPServer
+from   pluggdapps.log           import closeall
 import pluggdapps.utils         as h
 
 class Serve( Singleton ):
@@ -26,6 +27,14 @@ class Serve( Singleton ):
 
         $ pa -w -m -c <master.ini> serve -r
 
+    To pick up changes in configuration files without restarting the server,
+    pass ``-s`` switch to this sub-command. Modified configuration files are
+    parsed again and new settings are swapped into the running platform,
+    refer to :meth:`pluggdapps.platform.Pluggdapps.reload`. On-going
+    connections continue with old settings. When the server runs in
+    pre-fork mode, workers are restarted one after the other with new
+    settings.
+
     .. code-block:: text
 
         fork ---> child ------> poll-thread
@@ -54,6 +63,10 @@ class Serve( Singleton ):
         self.subparser.add_argument( "-r", dest="mreload",
                                      action="store_true", default=False,
                                      help="Monitor and reload modules" )
+        self.subparser.add_argument( "-s", dest="sreload",
+                                     action="store_true", default=False,
+                                     help="Monitor and reload settings, "
+                                          "without restarting" )
         return parser
 
     def handle( self, args ):
@@ -65,7 +78,7 @@ class Serve( Singleton ):
     def gemini( self, args ):
         """Start a poll thread and then start pluggdapps platform."""
         server = self.qp( 'pluggdapps.IHTTPServer', self['IHTTPServer'] )
-        if args.mreload :
+        if args.mreload or args.sreload :
             # Launch a thread to poll and then start serving http
             t = threading.Thread( target=self.pollthread, 
                                   name='Reloader', args=(args, server) )
@@ -81,7 +94,12 @@ class Serve( Singleton ):
         # won't kill the process; note os._exit does not call
         # any atexit callbacks, nor does it do finally blocks,
         # flush open files, etc.  In otherwords, it is rude.
-        os._exit(3)
+        #
+        # Exit code 3 asks the monitor to reload, except when pre-fork
+        # supervisor was stopped by SIGTERM or SIGINT.
+        supervisor = getattr( server, 'supervisor', None )
+        closeall()
+        os._exit( 0 if supervisor and supervisor.signalled else 3 )
 
     def fork_and_monitor( self, args ):
         """Fork a child process with same command line arguments except the
@@ -109,11 +127,26 @@ class Serve( Singleton ):
         """Thread (daemon) to monitor for changing files."""
         self.pa.logdebug( "Periodic poll started for module reloader ..." )
         while True:
-            if self.pollthread_checkfiles( args ) == True :
+            if args.mreload and self.pollthread_checkfiles( args ) == True :
                 server.stop()
                 break
+            if args.sreload and self.pa.modifiedinis() :
+                supervisor = getattr( server, 'supervisor', None )
+                if supervisor :     # Pre-fork mode, rolling restart.
+                    supervisor.restart()
+                else :
+                    server.ioloop.add_callback( self.reloadsettings )
             time.sleep( self['reload.poll_interval'] )
 
+    def reloadsettings( self ):
+        """Callback from server's event loop, to reload settings from modified
+        configuration files."""
+        try :
+            for netpath, sections in self.pa.reload() :
+                self.pa.loginfo( "Reloaded %r settings %r", (netpath,sections))
+        except Exception :
+            self.pa.logerror( h.print_exc() )
+
     def pollthread_checkfiles( self, args ):
         """Check whether any of the module files have modified after loading
         this platform. If so, return True else False."""
@@ -123,7 +156,9 @@ class Serve( Singleton ):
             if hasattr( mod, '__file__' ) :
                 modfiles.setdefault( getattr(mod, '__file__'), mod )
         
-        inifiles = self.inifiles() if self['reload.config'] else []
+        # Configuration files are reloaded without restart, if -s is passed.
+        reloadini = self['reload.config'] and not args.sreload
+        inifiles = self.inifiles() if reloadini else []
         files = list(modfiles.keys()) + self.ttlfiles() + inifiles
 
         for filename in files :
@@ -139,7 +174,7 @@ class Serve( Singleton ):
             if filename not in self.module_mtimes :
                 self.module_mtimes[filename] = mtime
             elif self.module_mtimes[filename] < mtime:
-                self.pa.logdebug( "%r changed, reloading ...\n" % filename )
+                self.pa.logdebug( "%r changed, reloading ...\n", (filename,) )
                 return True
         return False
 
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+
+# This file is subject to the terms and conditions defined in
+# file 'LICENSE', which is part of this source code package.
+#       Copyright (c) 2011 R Pratap Chakravarthy
+
+import json, http.client
+
+from   pluggdapps.plugin        import implements, Singleton
+from   pluggdapps.interfaces    import ICommand
+import pluggdapps.utils         as h
+
+class Stats( Singleton ):
+    """Sub-command plugin for pa-script to display request latency
+    statistics of a running server. Statistics are fetched from
+    ``/stats`` JSON end-point of webadmin application, and are available only
+    when ``stats`` is enabled in ``[pluggdapps]`` section. Refer to
+    :mod:`pluggdapps.stats`. Accept statistics of listening sockets and
+    connection counts are always displayed.
+
+    In pre-fork mode, each worker process collects its own statistics, those
+    displayed are of the worker process that served the end-point.
+
+    .. code-block:: bash
+        :linenos:
+
+        $ pa -w -c <master.ini> stats -v
+
+    Server address is computed from configuration settings, which can be
+    overriden using ``-s`` switch.
+    """
+
+    implements( ICommand )
+
+    description = "Display request latency statistics of running server."
+    cmd = 'stats'
+
+    phases = [ 'parse', 'resolve', 'newrequest', 'handle', 'route',
+               'resource', 'view', 'outbound', 'write', 'total' ]
+
+    #---- ICommand API
+    def subparser( self, parser, subparsers ):
+        """:meth:`pluggdapps.interfaces.ICommand.subparser` interface method.
+        """
+        self.subparser = subparsers.add_parser(
+                                self.cmd, description=self.description )
+        self.subparser.set_defaults( handler=self.handle )
+        self.subparser.add_argument(
+                "-s", dest="server",
+                default=None,
+                help="Server address as host:port." )
+        self.subparser.add_argument(
+                "-a", dest="app",
+                default=None,
+                help="Display statistics only for application mounted on "
+                     "this netpath." )
+        self.subparser.add_argument(
+                "-v", dest="views",
+                action="store_true", default=False,
+                help="Display statistics for each view." )
+        self.subparser.add_argument(
+                "-j", dest="json",
+                action="store_true", default=False,
+                help="Print statistics as JSON." )
+        return parser
+
+    def handle( self, args ):
+        """:meth:`pluggdapps.interfaces.ICommand.handle` interface method."""
+        webadmin = self.webadmin()
+        if webadmin is None :
+            print( "Webadmin application is not mounted." )
+            return
+
+        stats = self.fetch( args.server or self.address(), webadmin.netpath )
+        if args.json :
+            print( json.dumps( stats, indent=2, sort_keys=True ))
+            return
+
+        print( "worker process %s" % stats.get( 'pid', '-' ))
+        self.listeners( stats.get( 'listeners', [] ))
+        self.connections( stats.get( 'connections', {} ))
+        if 'apps' not in stats :
+            print( "Statistics are not enabled, set `stats` in [pluggdapps]." )
+            return
+
+        fmt = '  %-36s %8s %10s %10s %10s %10s %10s %10s'
+        for app, phases in sorted( stats['apps'].items() ) :
+            if args.app and app != args.app : continue
+            print( "%s (%s)" % (app, stats['unit']) )
+            print( fmt % ( 'phase', 'count', 'mean', 'p50', 'p90', 'p99',
+                           'p999', 'max' ))
+            self.table( fmt, phases )
+            if args.views :
+                views = stats['views'].get( app, {} )
+                for view, phases in sorted( views.items() ) :
+                    print( "  view %s" % view )
+                    self.table( fmt, phases )
+            print()
+
+    #---- Local functions
+
+    def webadmin( self ):
+        """Return webadmin application mounted in this environment."""
+        for webapp in self.pa.webapps.values() :
+            if webapp.caname == 'pluggdapps.webadmin' :
+                return webapp
+        return None
+
+    def address( self ):
+        """Compute the address of server from configuration settings."""
+        sec = h.plugin2sec( self['IHTTPServer'].lower() )
+        sett, plat = self.pa.settings[sec], self.pa.settings['pluggdapps']
+        host = sett['host'] or plat['host']
+        port = sett['port'] or plat['port']
+        return '%s:%s' % (host, port or h.port_for_scheme( plat['scheme'] ))
+
+    def fetch( self, address, netpath ):
+        """Fetch statistics from webadmin application, mounted on
+        ``netpath``, served by ``address``."""
+        netloc, script = h.parse_netpath( netpath )
+        conn = http.client.HTTPConnection( address )
+        try :
+            conn.request( 'GET', script.rstrip('/') + '/stats',
+                          headers={ 'Host' : netloc } )
+            return json.loads( conn.getresponse().read().decode( 'utf-8' ))
+        finally :
+            conn.close()
+
+    def listeners( self, listeners ):
+        """Print accept statistics of listening sockets, for the worker
+        process that served the request."""
+        fmt = '  %-8s %-24s %10s %10s %8s %8s'
+        print( "listeners" )
+        print( fmt % ('pid', 'address', 'accepted', 'rate/sec', 'queue',
+                      'backlog') )
+        for l in listeners :
+            print( fmt % ( l['pid'], l['address'], l['accepted'],
+                           '%.1f' % l['rate'], l['queue'], l['backlog'] ))
+        print()
+
+    def connections( self, conns ):
+        """Print connection counts, for the worker process that served the
+        request."""
+        if not conns : return
+        fmt = '  %-8s %10s %10s %10s %10s'
+        print( "connections" )
+        print( fmt % ('pid', 'active', 'accepted', 'rejected', 'closed') )
+        print( fmt % ( conns['pid'], conns['active'], conns['accepted'],
+                       conns['rejected'], conns['closed'] ))
+        timeouts = conns.get( 'timeouts', {} )
+        if timeouts :
+            print( "  timeouts : " + ', '.join(
+                   '%s %s' % item for item in sorted( timeouts.items() )))
+        print()
+
+    def table( self, fmt, phases ):
+        """Print summaries of ``phases`` in pipeline order."""
+        order = lambda p : ( self.phases.index( p.split('.')[0] )
+                             if p.split('.')[0] in self.phases else 100, p )
+        for phase in sorted( phases, key=order ) :
+            s = phases[phase]
+            print( fmt % ( phase, s['count'], '%.1f' % s['mean'], s['p50'],
+                           s['p90'], s['p99'], s['p999'], s['max'] ))
+
+    # ISettings interface methods
+    @classmethod
+    def default_settings( cls ):
+        """:meth:`pluggdapps.plugin.ISettings.default_settings` interface
+        method."""
+        return _default_settings
+
+    @classmethod
+    def normalize_settings( cls, settings ):
+        """:meth:`pluggdapps.plugin.ISettings.normalize_settings` interface
+        method."""
+        return settings
+
+
+_default_settings = h.ConfigDict()
+_default_settings.__doc__ = Stats.__doc__
+
+_default_settings['IHTTPServer'] = {
+    'default' : 'pluggdapps.HTTPEPollServer',
+    'types'   : (str,),
+    'help'    : "Plugin name implementing :class:`IHTTPServer`. Statistics "
+                "are fetched from server address configured for this plugin.",
+    'webconfig' : False,
+}
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+# This file is subject to the terms and conditions defined in
+# file 'LICENSE', which is part of this source code package.
+#       Copyright (c) 2011 R Pratap Chakravarthy
+
+import heapq, time, collections
+
+from   pluggdapps.plugin        import implements, Singleton
+from   pluggdapps.interfaces    import ICommand
+import pluggdapps.utils         as h
+
+class TimerBench( Singleton ):
+    """Sub-command plugin for pa-script to benchmark connection timeouts.
+    Connections are opened one after the other on a simulated clock, each
+    connection resets its timeout for every request, and the oldest
+    connection is closed once ``-c`` number of connections are open. Time
+    taken and the peak number of entries held are reported for,
+
+    * ``heap``, heap of timeouts where cancelled timeouts are left in the
+      heap till they are due.
+    * ``compact``, same as ``heap`` but compacted when cancelled timeouts
+      are more than half of the heap, as done by
+      :meth:`pluggdapps.web.server.IOLoop.remove_timeout`.
+    * ``wheel``, :class:`pluggdapps.web.timerwheel.TimerWheel` used for
+      connection timeouts.
+
+    .. code-block:: bash
+        :linenos:
+
+        $ pa timerbench -n 100000 -r 4
+    """
+
+    implements( ICommand )
+
+    description = "Benchmark heap and timing wheel for connection timeouts."
+    cmd = 'timerbench'
+
+    #---- ICommand API
+    def subparser( self, parser, subparsers ):
+        """:meth:`pluggdapps.interfaces.ICommand.subparser` interface method.
+        """
+        self.subparser = subparsers.add_parser(
+                                self.cmd, description=self.description )
+        self.subparser.set_defaults( handler=self.handle )
+        self.subparser.add_argument(
+                "-n", dest="number",
+                type=int, default=100000,
+                help="Number of connections." )
+        self.subparser.add_argument(
+                "-c", dest="concurrent",
+                type=int, default=1000,
+                help="Number of connections open at any time." )
+        self.subparser.add_argument(
+                "-r", dest="resets",
+                type=int, default=4,
+                help="Number of times a connection resets its timeout." )
+        self.subparser.add_argument(
+                "-t", dest="timeout",
+                type=float, default=60.0,
+                help="Connection timeout in seconds." )
+        return parser
+
+    def handle( self, args ):
+        """:meth:`pluggdapps.interfaces.ICommand.handle` interface method."""
+        # Web modules are imported only when the command is run, so that
+        # other sub-commands do not pay for them.
+        from pluggdapps.web.server import Timeout
+        from pluggdapps.web.timerwheel import TimerWheel
+        fmt = '%8s %12s %12s %10s %10s'
+        print( "%s connections, %s concurrent, %s resets per connection" % (
+               args.number, args.concurrent, args.resets ))
+        print( fmt % ('timers', 'seconds', 'us/conn', 'peak', 'expired') )
+        for name, timers in [ ('heap', HeapTimers( Timeout, compact=False )),
+                              ('compact', HeapTimers( Timeout, compact=True )),
+                              ('wheel', WheelTimers( TimerWheel )) ] :
+            t, peak, expired = self.churn( timers, args )
+            print( fmt % ( name, '%.3f' % t, '%.2f' % (t*1000000/args.number),
+                           peak, expired ))
+
+    #---- Local functions
+
+    def churn( self, timers, args ):
+        """Open and close ``args.number`` connections on a simulated clock,
+        one every millisecond, and return a tuple of (seconds, peak entries,
+        expired timers)."""
+        conns, now, peak, expired = collections.deque(), 0.0, 0, 0
+        timers.start( now )
+        start = time.perf_counter()
+        for i in range( args.number ) :
+            now += 0.001
+            timer = timers.add( now + args.timeout )
+            for r in range( args.resets ) :
+                timer = timers.reset( timer, now + args.timeout )
+            conns.append( timer )
+            if len( conns ) > args.concurrent :
+                timers.remove( conns.popleft() )
+            if i % 100 == 0 :   # Event loop iteration.
+                expired += timers.expire( now )
+                peak = max( peak, timers.size() )
+        return time.perf_counter() - start, peak, expired
+
+
+class HeapTimers( object ):
+    """Connection timeouts on a heap, reset by cancelling and adding a new
+    timeout."""
+
+    def __init__( self, Timeout, compact ):
+        self.Timeout, self.compact = Timeout, compact
+
+    def start( self, now ):
+        self.heap, self.cancelled = [], 0
+
+    def add( self, deadline ):
+        timeout = self.Timeout( deadline, h.print_exc )
+        heapq.heappush( self.heap, timeout )
+        return timeout
+
+    def reset( self, timeout, deadline ):
+        self.remove( timeout )
+        return self.add( deadline )
+
+    def remove( self, timeout ):
+        timeout.callback = None
+        self.cancelled += 1
+        if ( self.compact and self.cancelled > 512 and
+             self.cancelled * 2 > len( self.heap ) ) :
+            self.heap = [ t for t in self.heap if t.callback ]
+            heapq.heapify( self.heap )
+            self.cancelled = 0
+
+    def expire( self, now ):
+        n = 0
+        while self.heap :
+            if self.heap[0].callback is None :
+                heapq.heappop( self.heap )
+                self.cancelled -= 1
+            elif self.heap[0].deadline <= now :
+                heapq.heappop( self.heap )
+                n += 1
+            else :
+                break
+        return n
+
+    def size( self ):
+        return len( self.heap )
+
+
+class WheelTimers( object ):
+    """Connection timeouts on a timing wheel, reset in place."""
+
+    def __init__( self, TimerWheel ):
+        self.TimerWheel = TimerWheel
+
+    def start( self, now ):
+        self.wheel = self.TimerWheel( 1.0, now=now )
+
+    def add( self, deadline ):
+        return self.wheel.add( deadline, h.print_exc )
+
+    def reset( self, timer, deadline ):
+        self.wheel.reset( timer, deadline )
+        return timer
+
+    def remove( self, timer ):
+        self.wheel.remove( timer )
+
+    def expire( self, now ):
+        return len( self.wheel.advance( now ))
+
+    def size( self ):
+        return self.wheel.count
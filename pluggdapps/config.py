@@ -53,17 +53,31 @@ class ConfigSqlite3DB( Plugin ):
     * special sections will be present only in case of ``platform`` table.
       For other `netpath` tables, other that ``[DEFAULT]`` section, no special
       section will be stored.
+
+    Tables read from the database are cached. The cache is dropped when
+    another connection, like a pre-forked worker process, commits to the
+    database, detected via ``PRAGMA data_version``. Settings already applied
+    to plugins by a process are not updated, until the process reloads its
+    settings.
     """
 
     implements( IConfigDB )
 
     def __init__( self ):
-        self.conn = sqlite3.connect( self['url'] ) if self['url'] else None
+        self.conn = None
+        self.tables = {}    # netpath -> { section : settings-dictionary }
+        self.versions = {}  # netpath -> number of updates to netpath table
+        # `PRAGMA data_version` of the database when tables were cached.
+        self.dataversion = None
+        self.connect()
 
     def connect( self, *args, **kwargs ):
-        """:meth:`pluggdapps.interfaces.IConfigDB.connect` interface method."""
+        """:meth:`pluggdapps.interfaces.IConfigDB.connect` interface method.
+        Database is opened in write-ahead-log mode, so that readers are not
+        blocked by an on-going update."""
         if self.conn == None and self['url'] :
             self.conn = sqlite3.connect( self['url'] )
+            self.conn.execute( "PRAGMA journal_mode=WAL" )
 
     def dbinit( self, netpaths=[] ):
         """:meth:`pluggdapps.interfaces.IConfigDB.dbinit` interface method.
@@ -73,22 +87,22 @@ class ConfigSqlite3DB( Plugin ):
         ``netpaths``,
             list of web-application mount points. A database table will be
             created for each netpath.
+
+        Tables are not created in a single transaction, sqlite3 module
+        commits implicitly before DDL statements on Python versions older
+        than 3.12. Tables are created only if they do not exist, so that
+        tables missed by an interrupted call are created by the next call.
         """
         if self.conn == None : return None
 
-        c = self.conn.cursor()
-        # Create the `platform` table if it does not exist.
-        c.execute(
-            "CREATE TABLE IF NOT EXISTS platform "
-                "(section TEXT PRIMARY KEY ASC, settings TEXT);" )
-        self.conn.commit()
-
-        for netpath in netpaths :
-            sql = ( "CREATE TABLE IF NOT EXISTS '%s' "
-                        "(section TEXT PRIMARY KEY ASC, settings TEXT);" ) %\
-                  netpath
-            c.execute( sql )
-            self.conn.commit()
+        # Create the `platform` table and netpath tables, if they do not
+        # exist.
+        with self.conn :
+            for netpath in ['platform'] + list( netpaths ) :
+                self.conn.execute(
+                    "CREATE TABLE IF NOT EXISTS %s "
+                    "(section TEXT PRIMARY KEY ASC, settings TEXT);" %
+                    self._tablename( netpath ))
 
     def config( self, **kwargs ):
         """:meth:`pluggdapps.interfaces.IConfigDB.config` interface method.
@@ -109,9 +123,16 @@ class ConfigSqlite3DB( Plugin ):
             If present, this method was invoked for setting configuration
             ``name`` under ``section``. Optional.
 
+        ``settings``,
+            Dictionary of section-name and dictionary of configuration name,
+            value pairs to be updated in a single transaction. Optional.
+
         - if netpath, section, name and value kwargs are supplied, will update
           config-parameter `name` under webapp's `section` with `value`.
           Return the updated value.
+        - if netpath and settings kwargs are supplied, will update
+          config-parameters in each section of webapp's ``settings``. Return
+          ``settings``.
         - if netpath, section, name kwargs are supplied, will return
           configuration `value` for `name` under webapp's `section`.
         - if netpath, section kwargs are supplied, will return dictionary of 
@@ -120,43 +141,92 @@ class ConfigSqlite3DB( Plugin ):
           of sections and settings.
         - if netpath is not supplied, will use `section`, `name` and `value`
           arguments in the context of ``platform`` table.
+
+        Tables are read once from the database and cached, subsequent reads
+        are served from the cache, which is updated along with the database
+        and dropped when the database is changed by another connection.
         """
         if self.conn == None : return None
+        self._refresh()
 
         netpath = kwargs.get( 'netpath', 'platform' )
         section = kwargs.get( 'section', None )
         name = kwargs.get( 'name', None )
         value = kwargs.get( 'value', None )
-
-        c = self.conn.cursor()
-        if section :
-            c.execute(
-                "SELECT * FROM '%s' WHERE section='%s'" % (netpath,section))
-            result = list(c) 
-            secsetts = h.json_decode( result[0][1] ) if result else {}
-            if name and value :
-                secsetts[name] = value
-                secsetts = h.json_encode(secsetts)
-                c.execute( "DELETE FROM '%s' WHERE section='%s'" % 
-                           (netpath, section) )
-                c.execute( "INSERT INTO '%s' VALUES ('%s', '%s')" %
-                           (netpath, section, secsetts) )
-                self.conn.commit()
-                rc = value
-            elif name :
-                rc = secsetts[name]
-            else :
-                rc = secsetts
+        settings = kwargs.get( 'settings', None )
+
+        if section and name and value :
+            self._update( netpath, { section : { name : value }} )
+            rc = value
+        elif settings :
+            self._update( netpath, settings )
+            rc = settings
+        elif section and name :
+            rc = self._table( netpath ).get( section, {} )[name]
+        elif section :
+            rc = dict( self._table( netpath ).get( section, {} ))
         else :
-            c.execute( "SELECT * FROM '%s'" % (netpath,) )
-            rc = {  section : h.json_decode( setts )
-                                        for section, setts in list(c) }
+            rc = { sec : dict( setts )
+                   for sec, setts in self._table( netpath ).items() }
         return rc
 
     def close( self ):
         """:meth:`pluggdapps.interfaces.IConfigDB.close` interface method."""
         if self.conn :
             self.conn.close()
+        self.conn = None
+        self.tables = {}
+        self.dataversion = None
+
+    #---- Local methods
+
+    def version( self, netpath='platform' ):
+        """Return the number of updates made to ``netpath`` table via this
+        plugin. Can be used to detect configuration changes."""
+        return self.versions.get( netpath, 0 )
+
+    def _refresh( self ):
+        """Drop cached tables if the database was changed by another
+        connection since they were cached."""
+        dataversion = self.conn.execute( "PRAGMA data_version" ).fetchone()[0]
+        if dataversion != self.dataversion :
+            self.tables, self.dataversion = {}, dataversion
+
+    def _tablename( self, netpath ):
+        """Quote ``netpath`` as table-name for SQL statements."""
+        return '"%s"' % netpath.replace( '"', '""' )
+
+    def _table( self, netpath ):
+        """Return cached dictionary of sections and settings for ``netpath``
+        table, read from the database if not already cached."""
+        table = self.tables.get( netpath, None )
+        if table is None :
+            c = self.conn.execute(
+                    "SELECT section, settings FROM %s" %
+                    self._tablename( netpath ))
+            table = { section : h.json_decode( setts ) for section, setts in c }
+            self.tables[ netpath ] = table
+        return table
+
+    def _update( self, netpath, settings ):
+        """Update ``settings``, a dictionary of section-name and dictionary of
+        name, value pairs, in ``netpath`` table. All sections are updated in
+        one transaction, the cache is updated once the transaction is
+        committed."""
+        table = self._table( netpath )
+        rows = {}
+        for section, values in settings.items() :
+            secsetts = dict( table.get( section, {} ))
+            secsetts.update( values )
+            rows[ section ] = secsetts
+        with self.conn :
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO %s (section, settings) VALUES (?, ?)" %
+                    self._tablename( netpath ),
+                [ (section, h.json_encode( secsetts ))
+                  for section, secsetts in rows.items() ] )
+        table.update( rows )
+        self.versions[ netpath ] = self.versions.get( netpath, 0 ) + 1
 
     #---- ISettings interface methods
 
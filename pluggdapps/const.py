@@ -6,17 +6,21 @@
 
 """Package constants. Does not depend on other package modules."""
 
-from os.path import dirname, join
+import os
+from os.path import dirname, join, expanduser
 
 __all__ = [ 
     'DEFAULT_INI',      # Default configuration file to use
     'URLSEP',           # URL separater character
     'SPECIAL_SECS',     # List of special sections in configuration file
+    'CACHE_DIR',        # Directory to persist boot-time caches
 ]
 
 DEFAULT_INI = join( dirname(__file__), 'confs', 'develop.ini' )
 URLSEP      = '/'
 SPECIAL_SECS = [ 'pluggdapps', 'mountloc' ]
+CACHE_DIR   = os.environ.get( 'PLUGGDAPPS_CACHE',
+                              join( expanduser('~'), '.cache', 'pluggdapps' ))
 
 CONTENT_IDENTITY = 'identity'
 CONTENT_GZIP = 'gzip'
@@ -53,7 +53,7 @@ class DocRootView( Plugin ):
             resp.write( c['body'] )
             resp.flush( finishing=True )
         else :
-            resp.pa.logdebug( "Not found %r" % docfile )
+            resp.pa.logdebug( "Not found %r", (docfile,) )
             resp.set_status( b'404' )
             resp.flush( finishing=True )
 
@@ -33,7 +33,14 @@ class IConfigDB( Interface ):
 
     def config( **kwargs ):
         """Get or set configuration parameter for platform. For more
-        information refer to corresponding plugin's documentation."""
+        information refer to corresponding plugin's documentation.
+
+        ``settings``,
+            Optional key-word argument, dictionary of section-name and
+            dictionary of configuration name, value pairs. If present,
+            all sections are updated together, in a single transaction if
+            the data-store supports it, and ``settings`` is returned.
+        """
 
     def close():
         """Reverse of :meth:`connect`."""
@@ -215,12 +222,26 @@ class IHTTPConnection( Interface ):
         transfered.
         
         ``chunk``
-            Chunk of data in byte-string to buffer and send.
+            Chunk of data in byte-string to buffer and send. Can also be a
+            list of byte-strings, which are sent without concatenating them.
 
         ``callback``
             Handler to callback when data is written to the socket.
         """
 
+    def write_file( file, offset=0, count=None, callback=None ):
+        """Write ``count`` bytes from ``file``, starting at ``offset``, to the
+        connection without reading them into memory, where possible. Refer
+        to :meth:`write` for ``callback``.
+
+        ``file``
+            File object opened in binary mode. It is closed once written or
+            when the connection is closed.
+
+        ``count``
+            Number of bytes to write, if None, file is written till its end.
+        """
+
     def close():
         """Close this connection."""
 
@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+
+# This file is subject to the terms and conditions defined in
+# file 'LICENSE', which is part of this source code package.
+#       Copyright (c) 2011 R Pratap Chakravarthy
+
+"""Asynchronous logging pipeline for platform. Log messages are formatted
+only if their level is enabled, refer to
+:meth:`pluggdapps.platform.Pluggdapps.loginfo`, and queued in a bounded
+in-memory queue. A background writer thread drains
+the queue in batches to a long-lived file handle or to console.
+
+Queueing a message never blocks the caller, which is typically the thread
+running the event loop. When the queue is full, messages are dropped and
+accounted, and number of dropped messages is logged once the writer catches
+up.
+
+Log files can be rotated based on size and time. Rotated files are suffixed
+with ``.1``, ``.2`` ..., ``.1`` being the latest. Only the process that
+created the writer rotates the file, forked child processes, like pre-fork
+workers, keep appending to the same file and reopen it once it is rotated.
+"""
+
+import sys, os, time, threading, atexit
+from   collections  import deque
+from   os.path      import isfile
+
+__all__ = [ 'DEBUG', 'INFO', 'WARN', 'ERROR', 'LEVELS', 'LogWriter',
+            'logwriter', 'closeall' ]
+
+DEBUG, INFO, WARN, ERROR = 10, 20, 30, 40
+"""Log levels, messages below the configured level are gated before they
+are formatted."""
+
+LEVELS = { 'debug' : DEBUG, 'info' : INFO, 'warn' : WARN, 'error' : ERROR }
+"""Mapping of level names, as configured in ``logging.level``, to log
+levels."""
+
+class LogWriter( object ):
+    """Write log messages queued by :meth:`put` using a background thread.
+    If ``filename`` is None messages are written to ``sys.stdout``.
+
+    ``queuesize``,
+        Maximum number of messages waiting to be written. Messages queued
+        beyond this limit are dropped.
+
+    ``flushinterval``,
+        Seconds to wait for messages to accumulate before writing them as a
+        batch.
+
+    ``maxbytes``,
+        Rotate log file when its size exceeds ``maxbytes``. Zero disables
+        size based rotation.
+
+    ``interval``,
+        Rotate log file every ``interval`` seconds. Zero disables time based
+        rotation.
+
+    ``backups``,
+        Number of rotated files to keep.
+    """
+
+    written = 0
+    """Number of messages written."""
+
+    dropped = 0
+    """Number of messages dropped because the queue was full."""
+
+    rotations = 0
+    """Number of times the log file was rotated."""
+
+    def __init__( self, filename=None, queuesize=10000, flushinterval=0.5,
+                  maxbytes=0, interval=0, backups=5 ):
+        self.filename = filename
+        self.configure( queuesize=queuesize, flushinterval=flushinterval,
+                        maxbytes=maxbytes, interval=interval, backups=backups )
+        self.closed = False
+        self.stopped = False             # Writer thread has exited.
+        self.rotator = True              # Disabled in forked children.
+        self._reported = 0               # Dropped messages already logged.
+        self._fd = None
+        self._rolloverat = None
+        self._start()
+
+    def configure( self, **kwargs ):
+        """Update writer parameters, that are accepted by the constructor, in
+        ``kwargs``."""
+        for name in [ 'queuesize', 'flushinterval', 'maxbytes', 'interval',
+                      'backups' ] :
+            if name in kwargs : setattr( self, name, kwargs[name] )
+        self._rolloverat = None
+
+    def put( self, line ):
+        """Queue ``line`` to be written. Never blocks, if the queue is full
+        ``line`` is dropped. Return True if ``line`` was queued."""
+        if self.stopped or len( self.queue ) >= self.queuesize :
+            self.dropped += 1
+            return False
+        self.queue.append( line )
+        self.wakeup.is_set() or self.wakeup.set()
+        return True
+
+    def flush( self ):
+        """Block until all queued messages are written. Shall not be called
+        from the event loop."""
+        while self.queue and self.thread.is_alive() :
+            self.wakeup.set()
+            time.sleep( 0.001 )
+        with self.lock : pass
+
+    def close( self ):
+        """Write queued messages, stop the writer thread and close the log
+        file."""
+        self.closed = True
+        self.wakeup.set()
+        self.thread.join()
+        self.stopped = True
+        if self._fd : self._fd.close()
+        self._fd = None
+
+    #---- Local functions
+
+    def _start( self ):
+        """Start writer thread with an empty queue."""
+        self.queue = deque()
+        self.wakeup = threading.Event()
+        self.lock = threading.Lock()     # Held while draining the queue.
+        self.thread = threading.Thread(
+                target=self._run, name='pluggdapps-log', daemon=True )
+        self.thread.start()
+
+    def _run( self ):
+        while not self.closed :
+            self.wakeup.wait( self.flushinterval )
+            self.wakeup.clear()
+            self._drain()
+        self._drain()
+
+    def _drain( self ):
+        """Write all queued messages and dropped-messages note, if any, as a
+        single batch."""
+        with self.lock :
+            queue = self.queue
+            lines = [ queue.popleft() for i in range( len(queue) ) ]
+            dropped = self.dropped - self._reported
+            if dropped :
+                self._reported += dropped
+                lines.append( "WARN: Dropped %s log messages\n" % dropped )
+            if lines :
+                try :
+                    fd = self._file()
+                    fd.write( ''.join( lines ))
+                    fd.flush()
+                    self.written += len( lines )
+                except (OSError, ValueError) :
+                    self.dropped += len( lines )
+                    self._reported += len( lines )
+            # Checked even when there is nothing to write, other processes
+            # may be writing to the same file.
+            if self.filename and self.rotator :
+                try :
+                    self._rotate()
+                except OSError :
+                    pass
+
+    def _file( self ):
+        if self.filename is None :
+            return sys.stdout
+        if self._fd is not None and not self.rotator and self._rotated() :
+            self._fd.close()
+            self._fd = None
+        if self._fd is None :
+            self._fd = open( self.filename, 'a' )
+        return self._fd
+
+    def _rotated( self ):
+        """Whether the log file was rotated, by another process, since it
+        was opened."""
+        try :
+            st = os.stat( self.filename )
+        except FileNotFoundError :
+            return True
+        return not os.path.samestat( st, os.fstat( self._fd.fileno() ))
+
+    def _rotate( self ):
+        """Rotate log file if it has exceeded size or time limits. Size of
+        the file includes lines written by other processes."""
+        now = time.time()
+        if self._rolloverat is None :
+            self._rolloverat = now + self.interval
+        try :
+            size = os.stat( self.filename ).st_size
+        except FileNotFoundError :
+            return
+        bysize = self.maxbytes and size >= self.maxbytes
+        bytime = self.interval and now >= self._rolloverat
+        if not size or not (bysize or bytime) : return
+
+        self._fd and self._fd.close()
+        self._fd = None
+        name = self.filename
+        for i in range( self.backups - 1, 0, -1 ) :
+            src = '%s.%s' % (name, i)
+            isfile( src ) and os.replace( src, '%s.%s' % (name, i+1) )
+        if self.backups :
+            os.replace( name, name + '.1' )
+        else :
+            os.remove( name )
+        self._rolloverat = now + self.interval
+        self.rotations += 1
+
+
+_writers = {}   # filename -> LogWriter, None for console.
+
+def logwriter( filename=None, **kwargs ):
+    """Return the :class:`LogWriter` for ``filename``, there is only one
+    writer per file (and console) for the entire process. If writer already
+    exists it is re-configured with ``kwargs``."""
+    writer = _writers.get( filename, None )
+    if writer is None or writer.closed :
+        writer = _writers[ filename ] = LogWriter( filename, **kwargs )
+    else :
+        writer.configure( **kwargs )
+    return writer
+
+def closeall():
+    """Write queued messages and close all log writers. Called when the
+    interpreter exits, should be called explicitly before ``os._exit()``."""
+    for writer in list( _writers.values() ) :
+        writer.close()
+    _writers.clear()
+
+def _afterfork():
+    """Writer threads do not survive fork(), start them again in the child
+    process. Messages queued before fork are discarded in the child, they
+    will be written by the parent. Log files are rotated only by the parent,
+    child re-opens the file when it is rotated."""
+    for writer in _writers.values() :
+        if writer.closed : continue
+        writer.rotator = False
+        writer._start()
+
+atexit.register( closeall )
+os.register_at_fork( after_in_child=_afterfork )
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+# This file is subject to the terms and conditions defined in
+# file 'LICENSE', which is part of this source code package.
+#       Copyright (c) 2011 R Pratap Chakravarthy
+
+"""Plugin manifest is a blue-print of interfaces and plugins defined by
+pluggdapps packages, persisted on disk, so that subsequent start-ups need not
+import every module defining them. The manifest contains,
+
+* interface canonical-names, module defining the interface and canonical-names
+  of plugins implementing the interface.
+* plugin canonical-names, module defining the plugin and its normalized
+  default settings, if they can be serialized as JSON.
+
+Manifest is keyed by the version of pluggdapps packages and the modification
+time of their source files, a stale manifest is simply discarded and rebuilt
+by importing all packages. When a manifest is available,
+:class:`pluggdapps.plugin.PluginMeta` imports the module defining an interface
+or a plugin only when they are looked up.
+"""
+
+import sys, os, json, hashlib
+from   os.path  import join, dirname
+
+from   pluggdapps.const import CACHE_DIR
+
+__all__ = [ 'manifest_file', 'manifest_key', 'build_manifest',
+            'load_manifest', 'save_manifest' ]
+
+def manifest_file():
+    """Return the manifest file's location for this python environment."""
+    env = hashlib.sha1( sys.prefix.encode('utf-8') ).hexdigest()[:12]
+    return join( CACHE_DIR, 'manifest-%s.json' % env )
+
+def manifest_key( papackages ):
+    """Compute a key for manifest based on version of each package in
+    ``papackages`` and modification time of their python source files."""
+    sha = hashlib.sha1()
+    for pkgname, info in sorted( papackages.items() ) :
+        line = '%s %s\n' % (pkgname, info['package'].version)
+        sha.update( line.encode('utf-8') )
+        for dirpath, dirnames, filenames in os.walk( info['location'] ) :
+            dirnames[:] = sorted([ d for d in dirnames
+                                   if not d.startswith(('.', '__pycache__')) ])
+            for f in sorted( filenames ) :
+                if not f.endswith( '.py' ) : continue
+                path = join( dirpath, f )
+                st = os.stat( path )
+                line = '%s %s %s\n' % (path, st.st_mtime_ns, st.st_size)
+                sha.update( line.encode('utf-8') )
+    return sha.hexdigest()
+
+def build_manifest( key ):
+    """Build manifest from interfaces and plugins blue-printed so far by
+    :class:`pluggdapps.plugin.PluginMeta`. Expected to be called after all
+    pluggdapps packages are imported and plugin_init() is called."""
+    from pluggdapps.plugin import PluginMeta
+
+    interfaces, plugins = {}, {}
+    for caname, info in PluginMeta._interfmap.items() :
+        module = _moduleof( info['cls'] )
+        if module :
+            interfaces[ caname ] = { 'module' : module, 'plugins' : [] }
+
+    for i, pmap in PluginMeta._implementers.items() :
+        if i.caname in interfaces :
+            interfaces[ i.caname ]['plugins'] = sorted( pmap.keys() )
+
+    for caname, info in PluginMeta._pluginmap.items() :
+        module = _moduleof( info['cls'] )
+        if module :
+            plugins[ caname ] = { 'module'   : module,
+                                  'settings' : _settingsof( info['cls'] ) }
+
+    return { 'key' : key, 'interfaces' : interfaces, 'plugins' : plugins }
+
+def load_manifest( key ):
+    """Load manifest from disk. Return None if a manifest is not available
+    or if it is not valid for ``key``."""
+    try :
+        manifest = json.loads( open( manifest_file() ).read() )
+    except ( OSError, ValueError ) :
+        return None
+    return manifest if manifest.get( 'key', None ) == key else None
+
+def save_manifest( manifest ):
+    """Save ``manifest`` on disk. Failing to save the manifest is not an
+    error, start-up will simply not be optimized."""
+    mfile = manifest_file()
+    tmpfile = '%s.%s' % (mfile, os.getpid())
+    try :
+        os.makedirs( dirname( mfile ), exist_ok=True )
+        open( tmpfile, 'w' ).write( json.dumps( manifest ))
+        os.replace( tmpfile, mfile )
+    except OSError :
+        pass
+
+
+#---- Local functions
+
+def _moduleof( cls ):
+    """Return the importable module name defining class ``cls``. Classes
+    defined in modules that cannot be imported by name, like dynamically
+    generated plugins from template files, are skipped."""
+    modname = cls.__module__
+    mod = sys.modules.get( modname, None )
+    if modname == '__main__' or mod is None or hasattr( mod, '_ttlfile' ) :
+        return None
+    return modname if getattr( mod, '__file__', '' ).endswith('.py') else None
+
+def _settingsof( cls ):
+    """Normalized default settings for plugin class ``cls``, if they can be
+    serialized as JSON. Otherwise None."""
+    from pluggdapps.platform import DEFAULT
+
+    sett = dict( DEFAULT().items() )
+    try :
+        for b in reversed( cls.mro() ) :
+            if hasattr( b, 'default_settings' ) :
+                sett.update( dict( b.default_settings().items() ))
+                sett = b.normalize_settings( sett )
+        return sett if json.loads( json.dumps( sett )) == sett else None
+    except Exception :
+        return None
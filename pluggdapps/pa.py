@@ -70,8 +70,8 @@ def main():
     from pluggdapps import loadpackages
     import pluggdapps.commands
 
-    loadpackages()  # This is important, otherwise plugins in other packages 
-                    # will not be detected.
+    loadpackages( lazy=True )   # This is important, otherwise plugins in
+                                # other packages will not be detected.
 
     # Create command line parser.
     # Get a list of sub-commands supported in command line.
@@ -150,13 +150,20 @@ context of a web-application, configuration settings from application-ini-file
 will override settings from the master-ini-file.
 """
 
+import pickle
 from   configparser          import SafeConfigParser
-from   os.path               import dirname, isfile, abspath
+from   os.path               import dirname, isfile, abspath, getmtime
 from   copy                  import deepcopy
-import re
+from   functools             import partial
 
 from   pluggdapps.const      import SPECIAL_SECS, URLSEP
+from   pluggdapps.plugin     import PluginMeta, plugin_info
 from   pluggdapps.interfaces import IWebApp, IConfigDB
+from   pluggdapps.log        import DEBUG, INFO, WARN, ERROR, LEVELS, logwriter
+from   pluggdapps.resolver   import AppResolver
+from   pluggdapps.stats      import RequestStats
+from   pluggdapps.snapshot   import snapshot_key, plugins_key, content_hash, \
+                                    load_snapshot, save_snapshot
 import pluggdapps.utils      as h
 
 SPECIAL_SECTIONS = ['DEFAULT', 'pluggdapps']
@@ -222,6 +229,44 @@ def pluggdapps_defaultsett():
                     "Supported names are `console`, `file`.",
         'options' : [ 'console', 'file' ],
     }
+    sett['logging.level'] = {
+        'default' : 'debug',
+        'types'   : (str,),
+        'help'    : "Minimum level of messages to log. Debug messages are "
+                    "logged only when [DEFAULT] `debug` is also True.",
+        'options' : [ 'debug', 'info', 'warn', 'error' ],
+    }
+    sett['logging.queue_size'] = {
+        'default' : 10000,
+        'types'   : (int,),
+        'help'    : "Maximum number of log messages waiting to be written "
+                    "by the background writer. Messages logged beyond this "
+                    "limit are dropped and accounted.",
+    }
+    sett['logging.flush_interval'] = {
+        'default' : 0.5,
+        'types'   : (float,),
+        'help'    : "Seconds to wait for log messages to accumulate before "
+                    "writing them as a batch.",
+    }
+    sett['logging.rotate_bytes'] = {
+        'default' : 0,
+        'types'   : (int,),
+        'help'    : "Rotate log file when its size exceeds this many bytes. "
+                    "Zero disables size based rotation. In pre-fork mode, "
+                    "log file is rotated only by the supervisor process.",
+    }
+    sett['logging.rotate_interval'] = {
+        'default' : 0,
+        'types'   : (int,),
+        'help'    : "Rotate log file every so many seconds. Zero disables "
+                    "time based rotation.",
+    }
+    sett['logging.backups'] = {
+        'default' : 5,
+        'types'   : (int,),
+        'help'    : "Number of rotated log files to keep.",
+    }
     sett['port'] = {
         'default'   : 8080,
         'types'     : (int,),
@@ -231,6 +276,15 @@ def pluggdapps_defaultsett():
                       "file.",
         'webconfig' : False,
     }
+    sett['stats'] = {
+        'default'   : False,
+        'types'     : (bool,),
+        'help'      : "Record latency histograms for each phase of requests "
+                      "served by the platform, per application and per view. "
+                      "Refer to :mod:`pluggdapps.stats`. Can be modified "
+                      "only in the .ini file.",
+        'webconfig' : False,
+    }
     sett['scheme'] = {
         'default'   : 'http',
         'types'     : (str,),
@@ -246,8 +300,15 @@ def pluggdapps_defaultsett():
 def normalize_pluggdapps( sett ):
     """Normalize settings for [pluggdapps] special section."""
     sett['port'] = h.asint( sett['port'] )
+    sett['stats'] = h.asbool( sett['stats'] )
     if isinstance( sett['logging.output'], str ):
         sett['logging.output'] = h.parsecsv( sett['logging.output'] )
+    sett['logging.level'] = sett['logging.level'].lower()
+    sett['logging.queue_size'] = h.asint( sett['logging.queue_size'] )
+    sett['logging.flush_interval'] = h.asfloat( sett['logging.flush_interval'] )
+    sett['logging.rotate_bytes'] = h.asint( sett['logging.rotate_bytes'] )
+    sett['logging.rotate_interval'] = h.asint( sett['logging.rotate_interval'] )
+    sett['logging.backups'] = h.asint( sett['logging.backups'] )
     return sett
 
 def mountloc_defaultsett():
@@ -258,6 +319,48 @@ def mountloc_defaultsett():
 def normalize_mountloc( sett ):
     return sett
 
+class PluginFactory( object ):
+    """Compiled initializer for plugins of a class, instantiated in the
+    context of a platform and optionally a web-application. Platform compiles
+    a factory once for every ``(webapp, plugin-class)`` and subsequent
+    instantiations of the plugin simply pick the pre-computed settings and
+    bound query APIs from the factory, instead of gathering them again.
+
+    ``pa``,
+        Platform object.
+
+    ``webapp``,
+        Web-application context, None if plugin is not under a webapp.
+
+    ``settings``,
+        Settings dictionary for plugin's section, shared by all instances of
+        the plugin class under the same context. Plugin instances access them
+        via a copy-on-write :class:`pluggdapps.utils.config.SettingsView`.
+
+    ``apis``,
+        Dictionary of query API names and its bound function.
+    """
+
+    __slots__ = ( 'pa', 'webapp', 'settings', 'apis' )
+
+    def __init__( self, pa, webapp, settings, apis ):
+        self.pa = pa
+        self.webapp = webapp
+        self.settings = settings
+        self.apis = apis
+
+    def __call__( self, plugin, kwargs ):
+        """Initialize ``plugin`` instance with its context. ``settings`` 
+        key-word argument, if present in ``kwargs``, is popped out and
+        overrides plugin settings."""
+        settings = kwargs.pop( 'settings', None )
+        plugin._settngx = h.SettingsView(
+                self.settings, dict( settings ) if settings else None )
+        plugin.pa = self.pa
+        plugin.webapp = self.webapp
+        plugin._factory = self
+
+
 class Pluggdapps( object ):
     """Platform class tying together pluggdapps platform, component
     architecture and configuration system. Do not instantiate this class
@@ -274,8 +377,21 @@ class Pluggdapps( object ):
     configdb = None
     """:class:`pluggdapps.interfaces.IConfigDB` plugin instance."""
 
+    stats = None
+    """:class:`pluggdapps.stats.RequestStats` object if ``stats`` is
+    enabled in ``[pluggdapps]`` section, else None."""
+
+    loglevel = INFO
+    """Minimum level of messages to log, computed from ``logging.level`` and
+    [DEFAULT] ``debug`` settings. Refer to :mod:`pluggdapps.log`."""
+
     def __init__( self, erlport=None ):
         self.erlport = erlport # TODO: Document this once bolted with netscale
+        self._factories = {}   # (webapp, plugin-class) -> PluginFactory
+        self._apis = {}        # webapp -> { query-api-name : function }
+        self._snapshot = True  # False, if settings are from backend store
+        self._inis = {}        # ini-file -> (mtime, parsed sections)
+        self._logwriters = []  # [ (LogWriter, colorize), ... ]
 
     def _preboot( cls, baseini, *args, **kwargs ):
         """Prebooting. We need pre-booting because package() entry point can
@@ -298,7 +414,7 @@ class Pluggdapps( object ):
         if dbsett :
             [ pa.settings[section].update(d) for section, d in dbsett.items() ]
 
-        pa.logsett = h.settingsfor( 'logging.', pa.settings['pluggdapps'] )
+        pa._logsetup()
         callpackages( pa )
         return configdb
 
@@ -317,14 +433,18 @@ class Pluggdapps( object ):
         pa.inifile = baseini
         pa.settings = pa._loadsettings( baseini )
         pa.configdb = configdb
+        pa._watchini( baseini )
 
         # Configuration from backend store
         dbsett = pa.configdb.config()
         if dbsett :
             [ pa.settings[section].update(d) for section, d in dbsett.items() ]
+            pa._snapshot = False
 
         # Logging related settings go under `[pluggdapps]` section
-        pa.logsett = h.settingsfor( 'logging.', pa.settings['pluggdapps'] )
+        pa._logsetup()
+        if pa.settings['pluggdapps']['stats'] :
+            pa.stats = RequestStats()
 
         return pa
 
@@ -347,26 +467,13 @@ class Pluggdapps( object ):
         ``args`` and ``kwargs``,
             are received from query_plugin's ``args`` and ``kwargs``.
         """
-        plugin._settngx.update( self.settings[ h.plugin2sec(plugin.caname) ])
-        plugin.pa = self
-
-        plugin.query_plugins = h.hitch_method( plugin, plugin.__class__,
-                                      Pluggdapps.query_plugins, self )
-        plugin.query_pluginr = h.hitch_method( plugin, plugin.__class__,
-                                      Pluggdapps.query_pluginr, self )
-        plugin.query_plugin  = h.hitch_method( plugin, plugin.__class__,
-                                      Pluggdapps.query_plugin, self )
-
-        plugin.qps = h.hitch_method( plugin, plugin.__class__,
-                                     Pluggdapps.query_plugins, self )
-        plugin.qpr = h.hitch_method( plugin, plugin.__class__,
-                                     Pluggdapps.query_pluginr, self )
-        plugin.qp  = h.hitch_method( plugin, plugin.__class__,
-                                     Pluggdapps.query_plugin, self )
-
-        # Plugin settings
-        plugin._settngx.update( kwargs.pop( 'settings', {} ))
-
+        cls = plugin.__class__
+        factory = self._factories.get( cls, None )
+        if factory is None :
+            settings = self.settings[ h.plugin2sec( cls.caname ) ]
+            factory = self._factories[ cls ] = PluginFactory(
+                            self, None, settings, self._queryapis( None ))
+        factory( plugin, kwargs )
         return args, kwargs
 
     #---- Configuration APIs
@@ -387,24 +494,197 @@ class Pluggdapps( object ):
         ``value``,
             If present, this method was invoked for setting configuration
             ``name`` under ``section``. Optional.
+
+        ``settings``,
+            Dictionary of section-name and dictionary of configuration name,
+            value pairs to be updated together. Optional.
         """
         section = kwargs.get( 'section', None )
         name = kwargs.get( 'name', None )
         value = kwargs.get( 'value', None )
         if section and name and value :
-            self.settings[section][name] = value
+            self._pushsettings( self.settings, { section : { name : value }})
+        elif kwargs.get( 'settings', None ) :
+            self._pushsettings( self.settings, kwargs['settings'] )
         return self.configdb.config( **kwargs )
 
+    def modifiedinis( self ):
+        """Return a list of configuration files modified after they were
+        loaded by the platform."""
+        return [ inifile for inifile, (mtime, _) in self._inis.items()
+                 if isfile( inifile ) and getmtime( inifile ) != mtime ]
+
+    def reload( self ):
+        """Reload settings from modified configuration files without
+        restarting the platform. Only the modified files are parsed again
+        and only the sections that are changed are normalized again.
+
+        New settings are swapped into the platform, instead of updating the
+        settings in-place, plugins instantiated after reload will use new
+        settings while plugins instantiated earlier, like the ones serving
+        an on-going connection, will continue with old settings. Plugins
+        cached by the platform are moved to new settings.
+
+        Must be called from the thread serving the platform, typically as a
+        callback from the event loop. Return a list of tuples, (netpath,
+        sections) for each reloaded settings. Netpath is ``platform`` for
+        platform settings.
+        """
+        changed = self._inidiff( self.inifile ) \
+                        if self.inifile in self.modifiedinis() else []
+        updates = self._reloadplatform( changed )
+        swaps = self._swapsettings( self.settings, updates )
+        self._rebase( self, swaps )
+        'pluggdapps' in updates and self._logsetup()
+        return [ ('platform', sorted( updates )) ] if updates else []
+
     #---- Internal methods.
 
+    def _watchini( self, inifile ):
+        """Remember modification time and parsed sections of ``inifile``, to
+        detect changes during :meth:`reload`."""
+        if inifile and isfile( inifile ) :
+            self._inis[ inifile ] = ( getmtime(inifile), self._readini(inifile) )
+
+    def _readini( self, inifile ):
+        """Parse ``inifile`` and return a dictionary of sections and its raw
+        options."""
+        cp = SafeConfigParser()
+        cp.read( inifile )
+        secs = { sec : dict( cp.items( sec, raw=True )) for sec in cp.sections() }
+        secs['DEFAULT'] = dict( cp.defaults() )
+        return secs
+
+    def _inidiff( self, inifile ):
+        """Parse ``inifile`` again and return a list of sections changed
+        since it was last parsed."""
+        mtime, old = self._inis[ inifile ]
+        self._watchini( inifile )
+        new = self._inis[ inifile ][1]
+        return [ sec for sec in set(old) | set(new)
+                     if old.get( sec, None ) != new.get( sec, None ) ]
+
+    def _reloadplatform( self, changed ):
+        """Compute platform settings for ``changed`` sections of master
+        configuration file. Return a dictionary of section name and its new
+        settings."""
+        if 'mountloc' in changed :
+            self.logwarn( "Changes to [mountloc] need a restart." )
+        if 'DEFAULT' in changed :
+            sections = [ sec for sec in self.settings if sec != 'mountloc' ]
+        else :
+            sections = [ sec for sec in changed
+                         if sec in self.settings and sec != 'mountloc' ]
+        if not sections : return {}
+
+        plugins = [ sec for sec in sections if h.is_plugin_section( sec ) ]
+        settings = self._loadini( self.inifile, self._defaultsettings(plugins) )
+        dbsett = self.configdb.config() or {}
+        updates = {}
+        for sec in sections :
+            updates[sec] = settings[sec] if sec in settings else \
+                                            deepcopy( self.settings[sec] )
+            updates[sec].update( dbsett.get( sec, {} ))
+        return updates
+
+    def _swapsettings( self, settings, updates ):
+        """Replace section dictionaries in ``settings`` with dictionaries in
+        ``updates`` and move plugin factories to new dictionaries. Return a
+        dictionary of id(old-dictionary) to (old, new) dictionaries."""
+        swaps = {}
+        for sec, sett in updates.items() :
+            old, settings[sec] = settings.get( sec, None ), sett
+            if old is not None : swaps[ id(old) ] = (old, sett)
+        for factory in self._factories.values() :
+            old, new = swaps.get( id(factory.settings), (None, None) )
+            factory.settings = new if old is factory.settings \
+                                   else factory.settings
+        return swaps
+
+    def _rebase( self, obj, swaps, seen=None ):
+        """Move plugins reachable from ``obj``, via attributes and
+        containers, to swapped settings. Object pools are cleared, so that
+        pooled plugins are instantiated again with new settings."""
+        from pluggdapps.plugin import PluginBase
+        seen = set() if seen is None else seen
+        if id(obj) in seen : return
+        seen.add( id(obj) )
+
+        if isinstance( obj, dict ) :
+            [ self._rebase( x, swaps, seen ) for x in list( obj.values() ) ]
+        elif isinstance( obj, (list, tuple, set) ) :
+            [ self._rebase( x, swaps, seen ) for x in list( obj ) ]
+        elif isinstance( obj, h.FreeList ) :
+            obj.clear()
+        elif isinstance( obj, (PluginBase, Pluggdapps) ) :
+            view = getattr( obj, '_settngx', None )
+            old, new = swaps.get( id(getattr( view, 'base', None )), (0, 0) )
+            if view is not None and old is view.base :
+                view.base = new
+            for attr, x in list( vars( obj ).items() ) :
+                if attr not in self._norebase :
+                    self._rebase( x, swaps, seen )
+
+    _norebase = [ 'pa', 'webapp', '_factory', '_settngx', '_factories',
+                  '_apis', '_inis', 'settings', 'appsettings' ]
+
+    def _queryapis( self, webapp ):
+        """Return a dictionary of query APIs bound to this platform. Computed
+        once and shared by all plugin factories."""
+        apis = self._apis.get( webapp, None )
+        if apis is None :
+            apis = self._apis[ webapp ] = {
+                'query_plugins' : partial( Pluggdapps.query_plugins, self ),
+                'query_pluginr' : partial( Pluggdapps.query_pluginr, self ),
+                'query_plugin'  : partial( Pluggdapps.query_plugin, self ),
+            }
+            apis['qps'] = apis['query_plugins']
+            apis['qpr'] = apis['query_pluginr']
+            apis['qp']  = apis['query_plugin']
+        return apis
+
+    def _pushsettings( self, settings, updates ):
+        """Update configuration parameters from ``updates``, a dictionary of
+        section-name and dictionary of name, value pairs, and normalize each
+        updated section once. The section dictionary is updated in-place, it
+        being the shared layer for every live plugin instance of that section,
+        new values are immediately visible to all of them."""
+
+        for section, values in updates.items() :
+            sett = dict( settings[section] )
+            sett.update( values )
+            if section == 'DEFAULT' :
+                sett = normalize_defaults( sett )
+            elif section == 'pluggdapps' :
+                sett = normalize_pluggdapps( sett )
+            elif h.is_plugin_section( section ) :
+                cls = plugin_info( h.sec2plugin( section ) )['cls']
+                for b in reversed( cls.mro() ) :
+                    if hasattr( b, 'normalize_settings' ) :
+                        sett = b.normalize_settings( sett )
+            settings[section].update( sett )
+
     def _loadsettings( self, inifile ):
         """Load ``inifile`` and override the default settings with inifile's
-        configuration. Return them as dictionary of global settings."""
+        configuration. Return them as dictionary of global settings. Settings
+        are picked from boot snapshot, refer :mod:`pluggdapps.snapshot`, if
+        ``inifile`` and pluggdapps packages are not modified since the
+        snapshot was saved."""
 
         SPECIAL_SECS = [ 'pluggdapps' ]
+        if not inifile or (not isfile(inifile)) :
+            return self._loadini( inifile, self._defaultsettings() )
+
+        key, entry = snapshot_key( inifile ), 'settings:' + plugins_key()
+        blob = load_snapshot( inifile, key ).get( entry, None )
+        if blob :
+            return pickle.loads( blob )
+
         defaults = self._defaultsettings()
         # Override plugin defaults with configuration from ini-file(s)
-        return self._loadini( inifile, defaults )
+        settings = self._loadini( inifile, defaults )
+        save_snapshot( inifile, key, **{ entry : settings } )
+        return settings
 
 
     def _loadini( self, baseini, defaultsett ):
@@ -445,6 +725,11 @@ class Pluggdapps( object ):
             if cp.has_section( pluginsec ) :
                 sett.update( dict( cp.items( pluginsec, vars=_vars )))
                 sett.pop( 'here', None )    # TODO : how `here` ??
+            elif h.sec2plugin( pluginsec ) not in PluginMeta._pluginmap :
+                # Plugin not imported yet, default settings from manifest are
+                # already normalized.
+                settings[ pluginsec ] = sett
+                continue
             cls = plugin_info( h.sec2plugin( pluginsec ) )['cls']
             for b in reversed( cls.mro() ) :
                 if hasattr( b, 'normalize_settings' ) :
@@ -452,7 +737,7 @@ class Pluggdapps( object ):
             settings[ pluginsec ] = sett
         return settings
 
-    def _defaultsettings( self ):
+    def _defaultsettings( self, sections=None ):
         """By now it is expected that all interface specs and plugin
         definitions would have been loaded by loading packages implementing
         them and pluggdapps' plugin meta-classing. This function will collect
@@ -461,9 +746,10 @@ class Pluggdapps( object ):
           { "plugin:<pkgname>.<pluginname>" : default_settings,
              ...
           }
-        """
-        from pluggdapps.plugin import PluginMeta
 
+        If ``sections`` is a list of plugin sections, default settings are
+        collected only for those plugins.
+        """
         # Default settings for plugins.
         default = dict( DEFAULT().items() )
         defaultsett = { 'DEFAULT'    : deepcopy(default) }
@@ -472,10 +758,22 @@ class Pluggdapps( object ):
         defaultsett['pluggdapps'].update( 
                         dict( pluggdapps_defaultsett().items() ))
 
+        # Plugins that are not yet imported, pick their default-settings
+        # from plugin manifest. If not available, import them now.
+        lazyplugins = PluginMeta._lazyplugins()
+        for name, sett in list( lazyplugins.items() ) :
+            if sett is None :
+                plugin_info( name )
+                lazyplugins.pop( name )
+
+        skip = lambda name : \
+                    sections is not None and h.plugin2sec(name) not in sections
+
         # Fetch all the default-settings for loaded plugins using `ISettings`
         # interface. Plugin inheriting from other plugins will override its
         # base's default_settings() in cls.mro() order.
         for name, info in PluginMeta._pluginmap.items() :
+            if skip( name ) : continue
             bases = reversed( info['cls'].mro() )
             sett = deepcopy( default )
             for b in bases :
@@ -484,6 +782,10 @@ class Pluggdapps( object ):
                     sett = b.normalize_settings( sett )
             defaultsett[ h.plugin2sec(name) ] = sett
 
+        for name, sett in lazyplugins.items() :
+            if skip( name ) : continue
+            defaultsett[ h.plugin2sec(name) ] = deepcopy( sett )
+
         return defaultsett
 
 
@@ -509,11 +811,7 @@ class Pluggdapps( object ):
         override default plugin settings. Returns a list of plugin instance
         implementing `interface`
         """
-        from pluggdapps.plugin import PluginMeta
-        if isinstance(interface, str) :
-            intrf = interface.lower()
-            interface = PluginMeta._interfmap.get(intrf, {}).get('cls', None)
-        pmap = PluginMeta._implementers.get(interface, {})
+        pmap = PluginMeta._lookup( interface )
         return [ pcls( pa, *args, **kwargs ) for pcls in pmap.values() ]
 
     qps = query_plugins # Alias
@@ -542,14 +840,8 @@ class Pluggdapps( object ):
         override default plugin settings. Returns a list of plugin instance
         implementing `interface`
         """
-        from pluggdapps.plugin import PluginMeta
-        if isinstance(interface, str) :
-            intrf = interface.lower()
-            interface = PluginMeta._interfmap.get(intrf, {}).get('cls', None)
-        pattc = re.compile(pattern)
-        pmap = PluginMeta._implementers.get(interface, {})
-        return [ pcls( pa, *args, **kwargs )
-                 for pcls in pmap.values() if re.match(pattc, pcls.caname) ]
+        pclasses = PluginMeta._lookupr( interface, pattern )
+        return [ pcls( pa, *args, **kwargs ) for pcls in pclasses ]
 
     qpr = query_pluginr # Alias
 
@@ -578,11 +870,7 @@ class Pluggdapps( object ):
         If ``settings`` key-word argument is present, it will be used to
         override default plugin settings. Return a single Plugin instance.
         """
-        from pluggdapps.plugin import PluginMeta, ISettings
-        if isinstance(interface, str) :
-            intrf = interface.lower()
-            interface = PluginMeta._interfmap.get(intrf, {}).get('cls', None)
-        cls = PluginMeta._implementers.get(interface, {}).get(name.lower(), None)
+        cls = PluginMeta._lookup( interface ).get( name.lower(), None )
         return cls( pa, *args, **kwargs ) if cls else None
 
     qp = query_plugin # Alias
@@ -593,60 +881,71 @@ class Pluggdapps( object ):
     def loginfo( self, formatstr, values=[] ):
         """Use this method to log informational messages. The log messages will
         be formated and handled based on the configuration settings from
-        ``[pluggdapps]`` section.
+        ``[pluggdapps]`` section. ``formatstr`` is formatted with ``values``
+        only if the message is to be logged, hence callers on hot-paths are
+        expected to pass ``values`` instead of pre-formatting them.
         """
-        output, erlport = self.logsett['output'], self.erlport
-        if 'cloud' in output and erlport :
-            self.erlport.loginfo( formatstr, values )
-        if 'file' in output and self.logsett['file'] :
-            open( self.logsett['file'], 'a' ).write( formatstr )
-        if 'console' in output :
-            print( formatstr )
+        if self.loglevel <= INFO :
+            self._log( self.erlport and self.erlport.loginfo,
+                       '', None, formatstr, values )
 
     def logdebug( self, formatstr, values=[] ):
         """Use this method to log debug messages. The log messages will
         be formated and handled based on the configuration settings from
         ``[pluggdapps]`` section.
         """
-        if self.settings['DEFAULT']['debug'] != True : return
-
-        output, erlport = self.logsett['output'], self.erlport
-        formatstr = 'DEBUG: ' + formatstr
-        if 'cloud' in output and erlport :
-            self.erlport.logdebug( formatstr, values )
-        if 'file' in output and self.logsett['file'] :
-            open( self.logsett['file'], 'a' ).write( formatstr )
-        if 'console' in output :
-            print( h.colorize( formatstr, color='33' ))
+        if self.loglevel <= DEBUG :
+            self._log( self.erlport and self.erlport.logdebug,
+                       'DEBUG: ', '33', formatstr, values )
 
     def logwarn( self, formatstr, values=[] ):
         """Use this method to log warning messages. The log messages will
         be formated and handled based on the configuration settings from
         ``[pluggdapps]`` section.
         """
-        output, erlport = self.logsett['output'], self.erlport
-        formatstr = 'WARN: ' + formatstr
-        if 'cloud' in output and erlport :
-            self.erlport.logwarn( formatstr, values )
-        if 'file' in output and self.logsett['file'] :
-            open( self.logsett['file'], 'a' ).write( formatstr )
-        if 'console' in output :
-            print( h.colorize( formatstr, color='32' ))
+        if self.loglevel <= WARN :
+            self._log( self.erlport and self.erlport.logwarn,
+                       'WARN: ', '32', formatstr, values )
 
     def logerror( self, formatstr, values=[] ):
         """Use this method to log error messages. The log messages will
         be formated and handled based on the configuration settings from
         ``[pluggdapps]`` section.
         """
-        output, erlport = self.logsett['output'], self.erlport
-        formatstr = 'ERROR: ' + formatstr
-        if 'cloud' in output and erlport :
-            self.erlport.logerror( formatstr, values )
-        if 'file' in output and self.logsett['file'] :
-            open( self.logsett['file'], 'a' ).write( formatstr )
-        if 'console' in output :
-            print( h.colorize( formatstr, color='31' ))
-
+        if self.loglevel <= ERROR :
+            self._log( self.erlport and self.erlport.logerror,
+                       'ERROR: ', '31', formatstr, values )
+
+    def _logsetup( self ):
+        """Setup logging pipeline from ``logging.*`` settings in
+        ``[pluggdapps]`` section. Log writers are shared by all platforms in
+        this process."""
+        sett = self.logsett = \
+                h.settingsfor( 'logging.', self.settings['pluggdapps'] )
+        level = LEVELS.get( sett['level'], DEBUG )
+        if self.settings['DEFAULT']['debug'] != True :
+            level = max( level, INFO )
+        kwargs = { 'queuesize' : sett['queue_size'],
+                   'flushinterval' : sett['flush_interval'],
+                   'maxbytes' : sett['rotate_bytes'],
+                   'interval' : sett['rotate_interval'],
+                   'backups' : sett['backups'] }
+        writers = []
+        if 'file' in sett['output'] and sett['file'] :
+            writers.append( (logwriter( sett['file'], **kwargs ), False) )
+        if 'console' in sett['output'] :
+            writers.append( (logwriter( None, **kwargs ), True) )
+        self.loglevel, self._logwriters = level, writers
+
+    def _log( self, cloud, prefix, color, formatstr, values ):
+        """Format and queue log message with platform log writers. Never
+        blocks."""
+        if cloud and 'cloud' in self.logsett['output'] :
+            cloud( formatstr, values )
+        msg = prefix + ( formatstr % tuple(values) if values else formatstr )
+        for writer, colorize in self._logwriters :
+            text = h.colorize( msg, color=color ) if colorize and color else msg
+            writer.put( text + '\n' )
 
 
 class Webapps( Pluggdapps ):
@@ -668,6 +967,10 @@ class Webapps( Pluggdapps ):
     _app_resolve_cache = {}
     """A dictionary map of (netloc, script-path) to Web-application object."""
 
+    resolver = None
+    """:class:`pluggdapps.resolver.AppResolver` object, index of mounted
+    web-applications built during boot. Used by :meth:`resolveapp`."""
+
     _monitoredfiles = []
     """Attribute used in debug mode to collect and monitor files that will be
     modified during developement."""
@@ -694,6 +997,7 @@ class Webapps( Pluggdapps ):
         pa = super().boot( baseini, *args, **kwargs )
         pa.webapps = {}
         pa.appurls = {}
+        pa.resolver = AppResolver()
 
         appsettings = pa._mountapps()
 
@@ -713,11 +1017,13 @@ class Webapps( Pluggdapps ):
               for section, d in pa.configdb.config( netpath=netpath ).items() ]
 
             webapp.instkey, webapp.netpath = instkey, None
+            pa._watchini( config )
             pa.webapps[ instkey ] = webapp
             pa.netpaths[ netpath ] = webapp
             pa.appurls[ instkey ] = webapp.baseurl = pa._make_appurl( instkey )
             
             pa._app_resolve_cache[ h.parse_netpath(netpath) ] = webapp
+            pa.resolver.mount( netpath, webapp )
 
             # Resolution mapping for web-applications
             webapp.netpath = netpath
@@ -732,7 +1038,7 @@ class Webapps( Pluggdapps ):
         appnames = []
         for instkey, webapp in self.webapps.items() :
             appsec, netpath, configini = instkey
-            self.loginfo( "Booting application %r ..." % netpath )
+            self.loginfo( "Booting application %r ...", (netpath,) )
             webapp.startapp()
             appnames.append( h.sec2plugin( appsec ))
         return appnames
@@ -740,7 +1046,7 @@ class Webapps( Pluggdapps ):
     def shutdown( self ):
         """Reverse of start() method."""
         for instkey, webapp in self.webapps.items() :
-            self.loginfo( "Shutting down application %r ..." % appname )
+            self.loginfo( "Shutting down application %r ...", (appname,) )
             webapp.shutdown()
         super().shutdown()
 
@@ -755,47 +1061,21 @@ class Webapps( Pluggdapps ):
         ``args`` and ``kwargs``,
             are received from query_plugin's ``args`` and ``kwargs``.
         """
-        from pluggdapps.web.webapp import WebApp
-
-        caname = plugin.caname
-        if isinstance( plugin, WebApp ) : # Ought to be IWebApp plugin
-            appsec, netpath, config = webapp
-            plugin._settngx.update( args[0][ appsec ] )
-            plugin.webapp = plugin
-            args = args[1:]
-
-        elif webapp :                   # Not a IWebApp plugin
-            plugin._settngx.update( webapp.appsettings[ h.plugin2sec(caname) ])
-            plugin.webapp = webapp
-
-        else :                          # plugin not under a webapp
-            plugin._settngx.update( self.settings[ h.plugin2sec(caname) ])
-            plugin.webapp = None
-
-        plugin.pa = self
-
-        plugin.query_plugins = h.hitch_method( 
-            plugin, plugin.__class__, Webapps.query_plugins,
-            self, plugin.webapp )
-        plugin.query_pluginr = h.hitch_method( 
-            plugin, plugin.__class__, Webapps.query_pluginr,
-            self, plugin.webapp )
-        plugin.query_plugin = h.hitch_method(
-            plugin, plugin.__class__, Webapps.query_plugin,
-            self, plugin.webapp )
-
-        plugin.qps = h.hitch_method( 
-            plugin, plugin.__class__, Webapps.query_plugins,
-            self, plugin.webapp )
-        plugin.qpr = h.hitch_method( 
-            plugin, plugin.__class__, Webapps.query_pluginr,
-            self, plugin.webapp )
-        plugin.qp  = h.hitch_method(
-            plugin, plugin.__class__, Webapps.query_plugin,
-            self, plugin.webapp )
-
-        # Plugin settings
-        plugin._settngx.update( kwargs.pop( 'settings', {} ))
+        cls = plugin.__class__
+        factory = self._factories.get( (webapp, cls), None )
+        if factory is None :
+            from pluggdapps.web.webapp import WebApp
+
+            if isinstance( plugin, WebApp ) : # Ought to be IWebApp plugin
+                # Instantiated only once per mount, hence not compiled.
+                appsec, netpath, config = webapp
+                factory = PluginFactory( self, plugin, args[0][ appsec ],
+                                         self._queryapis( plugin ) )
+                args = args[1:]
+            else :
+                factory = self._compilefactory( webapp, cls )
+
+        factory( plugin, kwargs )
         return args, kwargs
 
     #---- Configuration APIs
@@ -820,10 +1100,14 @@ class Webapps( Pluggdapps ):
         ``value``,
             If present, this method was invoked for setting configuration
             ``name`` under ``section``. Optional.
+
+        ``settings``,
+            Dictionary of section-name and dictionary of configuration name,
+            value pairs to be updated together. Optional.
         """
         netpath = kwargs.get( 'netpath', None )
         if netpath == None :
-            super().config( **kwargs )
+            return super().config( **kwargs )
         else :
             section = kwargs.get( 'section', None )
             name = kwargs.get( 'name', None )
@@ -833,11 +1117,84 @@ class Webapps( Pluggdapps ):
             else :
                 settings = self.netpaths[ netpath ].appsettings
             if section and name and value :
-                settings[section][name] = value
+                self._pushsettings( settings, { section : { name : value }})
+            elif kwargs.get( 'settings', None ) :
+                self._pushsettings( settings, kwargs['settings'] )
             return self.configdb.config( **kwargs )
 
+    def reload( self ):
+        """:meth:`Pluggdapps.reload` method, in addition reload settings of
+        mounted web-applications, whose instance configuration file is
+        modified or whose settings are inherited from modified sections of
+        master configuration file."""
+        diffs = { inifile : self._inidiff( inifile )
+                  for inifile in self.modifiedinis() }
+        updates = self._reloadplatform( diffs.pop( self.inifile, [] ))
+
+        # Compute new settings for all applications before swapping them.
+        appupdates = []
+        for instkey, webapp in self.webapps.items() :
+            sections = set( updates ) | set( diffs.get( instkey[2], [] ))
+            sections.discard( 'pluggdapps' )
+            if sections :
+                appupdates.append(
+                    (webapp, self._reloadapp( webapp, updates, sections )) )
+
+        reloaded = [ ('platform', sorted( updates )) ] if updates else []
+        swaps = self._swapsettings( self.settings, updates )
+        for webapp, appupdate in appupdates :
+            swaps.update( self._swapsettings( webapp.appsettings, appupdate ))
+            reloaded.append( (webapp.netpath, sorted( appupdate )) )
+        self._rebase( self, swaps )
+        'pluggdapps' in updates and self._logsetup()
+        return reloaded
+
     #---- Internal methods
 
+    def _reloadapp( self, webapp, updates, sections ):
+        """Compute settings for ``sections`` of ``webapp``, with reloaded
+        platform settings ``updates``. Return a dictionary of section name
+        and its new settings."""
+        appsec, netpath, instconfig = webapp.instkey
+        if 'DEFAULT' in sections :
+            sections = list( webapp.appsettings.keys() )
+        sections = [ sec for sec in sections if sec in webapp.appsettings ]
+        appsett = { sec : deepcopy( updates.get( sec, self.settings[sec] ))
+                    for sec in set( ['DEFAULT'] + sections ) }
+        self._loadinstance( appsett, instconfig, sections=sections )
+        dbsett = self.configdb.config( netpath=netpath ) or {}
+        [ appsett[sec].update( dbsett.get( sec, {} )) for sec in sections ]
+        return { sec : appsett[sec] for sec in sections }
+
+    def _compilefactory( self, webapp, cls ):
+        """Compile a :class:`PluginFactory` for plugin class ``cls`` under
+        ``webapp`` context and remember them for subsequent instantiations."""
+        sec = h.plugin2sec( cls.caname )
+        if webapp :         # Not a IWebApp plugin
+            settings = webapp.appsettings[ sec ]
+        else :              # plugin not under a webapp
+            settings = self.settings[ sec ]
+        factory = PluginFactory(
+                        self, webapp, settings, self._queryapis( webapp ))
+        self._factories[ (webapp, cls) ] = factory
+        return factory
+
+    def _queryapis( self, webapp ):
+        """Return a dictionary of query APIs bound to this platform and
+        ``webapp``. Computed once for every web-application and shared by
+        all plugin factories under that web-application."""
+        apis = self._apis.get( webapp, None )
+        if apis is None :
+            apis = self._apis[ webapp ] = {
+                'query_plugins' : partial( Webapps.query_plugins, self, webapp),
+                'query_pluginr' : partial( Webapps.query_pluginr, self, webapp),
+                'query_plugin'  : partial( Webapps.query_plugin, self, webapp),
+            }
+            apis['qps'] = apis['query_plugins']
+            apis['qpr'] = apis['query_pluginr']
+            apis['qp']  = apis['query_plugin']
+        return apis
+
     def _mountapps( self ):
         """Create application wise settings, using special section
         [mountloc], if any. Also parse referred configuration files."""
@@ -880,6 +1237,19 @@ class Webapps( Pluggdapps ):
 
             mountls.append( (appsec,netpath,configini) )
 
+        # Application settings from boot snapshot, valid only if instance
+        # configuration files are not modified and platform settings are not
+        # overriden by backend store.
+        usesnapshot = self._snapshot and isfile( self.inifile )
+        if usesnapshot :
+            key = snapshot_key( self.inifile )
+            entry = 'appsettings:' + plugins_key()
+            insthash = content_hash( *[ x[2] for x in mountls ] )
+            blob = load_snapshot( self.inifile, key ).get( entry, None )
+            if blob :
+                snaphash, appsettings = pickle.loads( blob )
+                if snaphash == insthash : return appsettings
+
         # Load application configuration from instance configuration file.
         appsettings = {}
         for appsec, netpath, instconfig in mountls :
@@ -888,11 +1258,17 @@ class Webapps( Pluggdapps ):
             if instconfig :
                 self._loadinstance( appsett, instconfig )
             appsettings[ (appsec,netpath,instconfig) ] = appsett
+
+        if usesnapshot :
+            save_snapshot(
+                self.inifile, key, **{ entry : (insthash, appsettings) } )
         return appsettings
 
 
-    def _loadinstance( self, appsett, instanceini ):
-        """Load configuration settings for a web application's instance."""
+    def _loadinstance( self, appsett, instanceini, sections=None ):
+        """Load configuration settings for a web application's instance. If
+        ``sections`` is a list of sections, only those plugin sections are
+        loaded from ``instanceini``."""
         from pluggdapps.plugin import plugin_info
         _vars = { 'here' : abspath( dirname( instanceini )) }
         cp = SafeConfigParser()
@@ -906,6 +1282,7 @@ class Webapps( Pluggdapps ):
         # Update plugin sections in appsett from instanceini
         for sec in cp.sections() :
             if not sec.startswith( 'plugin:' ) : continue
+            if sections is not None and sec not in sections : continue
             sett = dict( cp.items( sec, vars=_vars ))
             sett.pop( 'here', None )    # TODO : how `here` gets populated ??
             appsett[sec].update( sett )
@@ -970,11 +1347,7 @@ class Webapps( Pluggdapps ):
         override default plugin settings. Returns a list of plugin instance
         implementing `interface`
         """
-        from pluggdapps.plugin import PluginMeta
-        if isinstance(interface, str) :
-            intrf = interface.lower()
-            interface = PluginMeta._interfmap.get(intrf, {}).get('cls', None)
-        pmap = PluginMeta._implementers.get(interface, {})
+        pmap = PluginMeta._lookup( interface )
         return [ pcls( pa, webapp, *args, **kwargs ) for pcls in pmap.values() ]
 
     qps = query_plugins # Alias
@@ -1008,14 +1381,8 @@ class Webapps( Pluggdapps ):
         override default plugin settings. Returns a list of plugin instance
         implementing `interface`
         """
-        from pluggdapps.plugin import PluginMeta
-        if isinstance(interface, str) :
-            intrf = interface.lower()
-            interface = PluginMeta._interfmap.get(intrf, {}).get('cls', None)
-        pattc = re.compile(pattern)
-        pmap = PluginMeta._implementers.get(interface, {})
-        return [ pcls( pa, webapp, *args, **kwargs )
-                 for pcls in pmap.values() if re.match(pattc, pcls.caname) ]
+        pclasses = PluginMeta._lookupr( interface, pattern )
+        return [ pcls( pa, webapp, *args, **kwargs ) for pcls in pclasses ]
 
     qpr = query_pluginr # Alias
 
@@ -1049,11 +1416,7 @@ class Webapps( Pluggdapps ):
         If ``settings`` key-word argument is present, it will be used to
         override default plugin settings. Return a single Plugin instance.
         """
-        from pluggdapps.plugin import PluginMeta
-        if isinstance(interface, str) :
-            intrf = interface.lower()
-            interface = PluginMeta._interfmap.get(intrf, {}).get('cls', None)
-        cls = PluginMeta._implementers.get(interface, {}).get(name.lower(), None)
+        cls = PluginMeta._lookup( interface ).get( name.lower(), None )
         return cls( pa, webapp, *args, **kwargs ) if cls else None
 
     qp = query_plugin   # Alias
@@ -1075,20 +1438,14 @@ class Webapps( Pluggdapps ):
             dictionary of URL parts 
         ``webapp``,
             :class:`IWebApp` plugin instance.
+
+        Application mounted on the longest script-path matching the request
+        path is resolved, refer to :class:`pluggdapps.resolver.AppResolver`.
         """
         uriparts = h.parse_url( uri, host=hdrs.get('host', None) )
-        for key, webapp in self._app_resolve_cache.items() :
-            netloc, script = key
-            uri_netloc = ( uriparts['host'][3:]
-                            if uriparts['host'].startswith('www')
-                            else uriparts['host'] )
-            if netloc == uri_netloc :
-                if script in ['/', ''] :
-                    break
-                elif uriparts['path'].startswith( script ) :
-                    uriparts['script'] = script
-                    uriparts['path'] = uriparts['path'][len(script):]
-                    break
-        else :
-            webapp = None
+        script, webapp = self.resolver.resolve(
+                                uriparts['host'], uriparts['path'] )
+        if script not in [ None, '/', '' ] :
+            uriparts['script'] = script
+            uriparts['path'] = uriparts['path'][len(script):]
         return uriparts, webapp
@@ -59,7 +59,7 @@ class it uses a special method, ``_super_init()`` instead of using the builtin
 `super()`.
 """
 
-import sys, inspect
+import sys, inspect, re, importlib
 from   os.path      import isfile, abspath
 
 import pluggdapps.utils as h
@@ -102,6 +102,18 @@ class PluginMeta( type ):
     If a plugin sub-class derives from Singleton then query_* methods and
     functions will return the same object all the time."""
 
+    _queryindex = {}
+    """Index for query_*() APIs. Maps interface, either as class or as
+    interface-name, to a map of plugin names and its class implementing the
+    interface. And maps (interface, pattern) to a list of plugin classes
+    whose canonical name match the pattern. Invalidated when a new plugin
+    class is blue-printed and when :func:`plugin_init` is called."""
+
+    _manifest = None
+    """Plugin manifest, refer :mod:`pluggdapps.manifest`. When available,
+    modules defining interfaces and plugins are imported only when they are
+    looked up."""
+
     # Error messages
     err1 = 'Class `%s` derives both Interface and Plugin'
     err2 = 'Plugin/Interface %r defined multiple times, previously %r'
@@ -130,6 +142,7 @@ class PluginMeta( type ):
         elif PluginBase in mro_bases : # For Plugin sub-classes
             PluginMeta._pluginmap[caname] = \
                     PluginMeta._plugin( new_class, name, bases, d )
+            PluginMeta._queryindex.clear()
             # Register deriving plugin for interfaces implemented by its base
             # classes
             for b in mro_bases[:-1] :   # Skip <class 'object'>
@@ -147,21 +160,22 @@ class PluginMeta( type ):
                         init = b.__init__._original
                         break
 
+            # Resolve the original initializer once, here, instead of
+            # doing it for every instantiation. Avoid calling the masterinit
+            # of the super class.
+            while init and hasattr( init, '_original' ) :
+                init = init._original
+
             def masterinit( self, pa, *args, **kwargs ) :
                 """Plugin Init function hooked in by PluginMeta.
                 Initialize plugin with *args and **kwargs parameters."""
                 # Check for instantiated singleton, if so return.
                 if hasattr( self, 'settings' ): return
 
-                self._settngx = {}
-
                 (args, kwargs) = pa.masterinit( self, *args, **kwargs )
 
-                # Call the original plugin's __init__. Avoid calling the
-                # masterinit of the super class.
-                if init and hasattr( init, '_original' ) :
-                    _original( self, *args, **kwargs )
-                elif init :
+                # Call the original plugin's __init__.
+                if init :
                     init( self, *args, **kwargs )
 
             def super_init( self, cls, *args, **kwargs ):
@@ -190,6 +204,82 @@ class PluginMeta( type ):
 
         return new_class
 
+    @classmethod
+    def _lookup( cls, interface ):
+        """Return a map of plugin names and its class implementing
+        ``interface``, which can be an interface class or canonical form of
+        interface-name."""
+        try :
+            return cls._queryindex[ interface ]
+        except KeyError :
+            pass
+        if isinstance( interface, str ) :
+            cls._lazyimport( implementers=[ interface.lower() ] )
+            i = cls._interfmap.get( interface.lower(), {} ).get( 'cls', None )
+        else :
+            cls._lazyimport( implementers=[ interface.caname ] )
+            i = interface
+        pmap = cls._queryindex[ interface ] = cls._implementers.get( i, {} )
+        return pmap
+
+    @classmethod
+    def _lookupr( cls, interface, pattern ):
+        """Return a list of plugin classes implementing ``interface`` whose
+        canonical name matches regular expression ``pattern``."""
+        key = (interface, pattern)
+        try :
+            return cls._queryindex[ key ]
+        except KeyError :
+            pass
+        pattc = re.compile( pattern )
+        pclasses = cls._queryindex[ key ] = [
+            pcls for pcls in cls._lookup( interface ).values()
+                 if pattc.match( pcls.caname ) ]
+        return pclasses
+
+    @classmethod
+    def _lazyimport( cls, interfaces=[], plugins=[], implementers=[] ):
+        """Import modules listed in the manifest, that define ``interfaces``
+        and ``plugins``, and plugins implementing ``implementers``
+        interfaces. All arguments are lists of canonical names. Return True
+        if a module was imported."""
+        manifest = cls._manifest
+        if manifest is None : return False
+
+        plugins = list( plugins )
+        modules = set()
+        for i in list( interfaces ) + list( implementers ) :
+            x = manifest['interfaces'].get( i, None )
+            if x : modules.add( x['module'] )
+        for i in implementers :
+            x = manifest['interfaces'].get( i, None )
+            if x : plugins.extend( x['plugins'] )
+        for p in plugins :
+            x = manifest['plugins'].get( p, None )
+            if x : modules.add( x['module'] )
+
+        modules = [ m for m in sorted(modules) if m not in sys.modules ]
+        [ importlib.import_module( m ) for m in modules ]
+        if modules :
+            plugin_init()
+        return bool( modules )
+
+    @classmethod
+    def _lazyimportall( cls ):
+        """Import all modules listed in the manifest."""
+        if cls._manifest :
+            cls._lazyimport( interfaces=cls._manifest['interfaces'].keys(),
+                             plugins=cls._manifest['plugins'].keys() )
+
+    @classmethod
+    def _lazyplugins( cls ):
+        """Return a map of plugin canonical-names, for plugins listed in the
+        manifest but not yet imported, to their default settings. Settings
+        can be None, if they are not available in manifest."""
+        manifest = cls._manifest or { 'plugins' : {} }
+        return { nm : x['settings'] for nm, x in manifest['plugins'].items()
+                                    if nm not in cls._pluginmap }
+
     @classmethod
     def _interf( cls, new_class, name, bases, d ):
         """`new_class` is class deriving from Interface baseclass and provides 
@@ -239,16 +329,21 @@ def isimplement( plugin, interface ):
 def isplugin( plugin ):
     """Return True if ``plugin`` is a plugin-object."""
     caname = plugin if isinstance(plugin, str) else plugin.caname
-    return caname in PluginMeta._pluginmap
+    manifest = PluginMeta._manifest
+    return caname in PluginMeta._pluginmap or \
+           bool( manifest and caname in manifest['plugins'] )
 
 def interfaces():
     """Return a complete list of interface classes defined in this
     environment."""
+    PluginMeta._lazyimportall()
     return [ x['cls'] for x in PluginMeta._interfmap.values() ]
 
 def interface( interf ):
     """Return the interface class specified by name ``interf``."""
     if isinstance(interf, str) :
+        if interf not in PluginMeta._interfmap :
+            PluginMeta._lazyimport( interfaces=[interf] )
         return PluginMeta._interfmap[interf]['cls'] 
     else :
         return interf
@@ -259,6 +354,8 @@ def plugin_info( *args ):
     argument is optional, and if provided is the default value to be returned
     if a plugin by name `nm` is not found."""
     caname = args[0] if isinstance(args[0], str) else args[0].caname
+    if caname not in PluginMeta._pluginmap :
+        PluginMeta._lazyimport( plugins=[caname] )
     return PluginMeta._pluginmap.get( caname, *args[1:] )
 
 def interface_info( *args ):
@@ -267,14 +364,17 @@ def interface_info( *args ):
     The second argument is optional, and if provided is the default value to
     be returned if an interface by name `interf` is not found."""
     caname = args[0] if isinstance(args[0], str) else args[0].caname
+    if caname not in PluginMeta._interfmap :
+        PluginMeta._lazyimport( interfaces=[caname] )
     return PluginMeta._interfmap.get( caname, *args[1:] )
 
 def pluginnames( interface=None ):
     """Return a list of plugin names implementing ``interface``. If
     `interface` is None, then return a list of all plugins"""
     if interface :
-        return list( PluginMeta._implementers[interface].keys() )
+        return list( PluginMeta._lookup( interface ).keys() )
     else :
+        PluginMeta._lazyimportall()
         return list( PluginMeta._pluginmap.keys() )
 
 def canonical_name( cls ):
@@ -297,13 +397,13 @@ def canonical_name( cls ):
 
 def pluginclass( interface, name ):
     """Return the plugin class by ``name`` implementing ``interface``."""
-    return PluginMeta._implementers.get( interface, {} ).get( name, None )
+    return PluginMeta._lookup( interface ).get( name, None )
 
 def webapps():
     """Return a list of application names (which are actually plugins
     implementing :class:`IWebApp` interface."""
     from pluggdapps.interfaces import IWebApp
-    return list( PluginMeta._implementers.get( IWebApp, {} ).keys() )
+    return list( PluginMeta._lookup( IWebApp ).keys() )
 
 def whichmodule( attr ):
     """Try to fetch the module name in which ``attr`` is defined."""
@@ -311,6 +411,22 @@ def whichmodule( attr ):
     return sys.modules.get( modname, None ) if modname else None
 
 
+class QueryAPI( object ):
+    """Descriptor binding platform's query APIs, like `query_plugin()`,
+    `qp()` etc.., to plugin instances. Bound APIs are compiled once for every
+    platform and web-application context, by the platform, and fetched from
+    the plugin's factory (refer :class:`pluggdapps.platform.PluginFactory`)
+    when accessed. This way instantiating a plugin does not create a
+    closure for each query API."""
+
+    def __init__( self, name ):
+        self.name = name
+
+    def __get__( self, plugin, cls ):
+        if plugin is None : return self
+        return plugin._factory.apis[ self.name ]
+
+
 class PluginBase( object, metaclass=PluginMeta ):
     """Base class for all plugin classes. Plugin-classes are metaclassed by
     PluginMeta via this base class."""
@@ -379,6 +495,7 @@ def implements( *interfaces ):
             raise Exception( 
                 'Plugin %r implements interface %r twice' % (nm, i) )
         PluginMeta._implementers.setdefault( i, {} ).setdefault( nm, '-na-' )
+    PluginMeta._queryindex.clear()
 
 
 #---- Interfaces
@@ -408,8 +525,9 @@ class ISettings( Interface ):
     _settngx = {}
     """Hidden dictionary of configuration settings. Settings information is
     gathered from different sources and initialized during plugin
-    instantiation. Every plugin provide a dictionary-like interface to access
-    the settings.
+    instantiation, as a copy-on-write view over settings shared by all
+    instances of the plugin class. Every plugin provide a dictionary-like
+    interface to access the settings.
     
     IMPORTANT : Do not access this attribute directly.
     """
@@ -497,6 +615,14 @@ class Plugin( PluginBase ):     # Plugin base class implementing ISettings
     """
     implements( ISettings )
 
+    # Query APIs, bound to plugin's platform and web-application context.
+    query_plugins = QueryAPI( 'query_plugins' )
+    query_pluginr = QueryAPI( 'query_pluginr' )
+    query_plugin  = QueryAPI( 'query_plugin' )
+    qps = QueryAPI( 'qps' )
+    qpr = QueryAPI( 'qpr' )
+    qp  = QueryAPI( 'qp' )
+
     # Dictionary like interface to plugin instances
     def __len__( self ):
         return self._settngx.__len__()
@@ -576,6 +702,7 @@ def plugin_init():
     d[ ISettings ] = { nm : info['cls'] 
                        for nm, info in PluginMeta._pluginmap.items() }
     PluginMeta._implementers = d
+    PluginMeta._queryindex.clear()
 
     # Compute asset-specification for all interfaces and plugins
     for nm, info in PluginMeta._interfmap.items() :
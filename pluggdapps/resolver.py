@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+# This file is subject to the terms and conditions defined in
+# file 'LICENSE', which is part of this source code package.
+#       Copyright (c) 2011 R Pratap Chakravarthy
+
+"""Index of mounted web-applications to resolve a request's host and path to
+the application mounted on a netpath. Hosts are hashed to a trie of
+script-path segments, and the longest mounted script-path matching the
+request path resolves the application. Since the index is built during boot
+and hardly changes after that, lookups on (host, first path segment) are
+memoized, in most cases resolving a request is a single cache hit.
+
+A `www.` prefix in request host is ignored if the host is not mounted as
+such.
+"""
+
+from   functools        import lru_cache
+
+from   pluggdapps.const import URLSEP
+import pluggdapps.utils as h
+
+__all__ = [ 'AppResolver' ]
+
+class TrieNode( object ):
+    """Node for a path segment in script-path trie."""
+
+    __slots__ = [ 'mount', 'children' ]
+
+    def __init__( self ):
+        self.mount = None       # (script, app) mounted at this node.
+        self.children = {}      # path-segment -> TrieNode
+
+
+class AppResolver( object ):
+    """Resolve (host, path) to mounted application, refer to
+    :meth:`pluggdapps.platform.Webapps.resolveapp`. Applications are mounted
+    using :meth:`mount`. ``cachesize`` is the number of recent (host, first
+    path segment) lookups to memoize."""
+
+    def __init__( self, cachesize=1024 ):
+        self.hosts = {}         # netloc -> TrieNode for root script-path
+        self._lookup = lru_cache( maxsize=cachesize )( self._firstsegment )
+
+    def mount( self, netpath, app ):
+        """Mount ``app`` on ``netpath``, a string of host-name and optional
+        script-path."""
+        netloc, script = h.parse_netpath( netpath )
+        node = self.hosts.setdefault( netloc, TrieNode() )
+        for seg in filter( None, script.split( URLSEP )) :
+            node = node.children.setdefault( seg, TrieNode() )
+        node.mount = (script, app)
+        self._lookup.cache_clear()
+
+    def resolve( self, host, path ):
+        """Resolve request ``host`` and ``path`` to a tuple of (script, app)
+        where script is the longest mounted script-path matching ``path``.
+        Return (None, None) if no application is mounted for the request."""
+        segs = path.split( URLSEP, 2 )
+        node, mount = self._lookup( host, segs[1] if len(segs) > 1 else '' )
+        if node and node.children and len(segs) > 2 :
+            for seg in segs[2].split( URLSEP ) :
+                node = node.children.get( seg, None )
+                if node is None : break
+                mount = node.mount or mount
+        return mount or (None, None)
+
+    def _firstsegment( self, host, seg ):
+        """Match ``host`` and first path segment ``seg``. Return a tuple of
+        (node, mount) where node is the trie node for ``seg``, if present,
+        and mount is the longest matching mount so far."""
+        root = self.hosts.get( host, None )
+        if root is None and host.startswith( 'www.' ) :
+            root = self.hosts.get( host[4:], None )
+        if root is None :
+            return None, None
+        node = root.children.get( seg, None )
+        if node is None :
+            return None, root.mount
+        return node, node.mount or root.mount
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+# This file is subject to the terms and conditions defined in
+# file 'LICENSE', which is part of this source code package.
+#       Copyright (c) 2011 R Pratap Chakravarthy
+
+"""Boot snapshot is a persistent cache of fully normalized platform settings
+and application settings, gathered from package defaults and ini files. Every
+master configuration file has its own snapshot, keyed by the content hash of
+the master ini file, version of pluggdapps packages and the plugins defined
+in the environment. Application settings are additionally validated by the
+content hash of instance ini files they are loaded from.
+
+Settings loaded from backend store, like :class:`pluggdapps.config.ConfigSqlite3DB`,
+are not part of the snapshot.
+
+Snapshot entries are preserved as pickled blobs, so that every load returns
+fresh dictionaries without having to deep-copy them. A snapshot file is read
+only once in a process.
+"""
+
+import sys, os, pickle, hashlib
+from   os.path  import join, dirname, abspath
+
+from   pluggdapps.const import CACHE_DIR
+
+__all__ = [ 'snapshot_file', 'snapshot_key', 'plugins_key', 'content_hash',
+            'load_snapshot', 'save_snapshot' ]
+
+_snapshots = {}
+"""Snapshot files already read by this process, mapping of file location to
+snapshot dictionary."""
+
+_pkgkey = None
+"""Key computed from pluggdapps packages, refer
+:func:`pluggdapps.manifest.manifest_key`. Computed once in a process."""
+
+def snapshot_file( inifile ):
+    """Return the location of snapshot file for master configuration file
+    ``inifile``."""
+    key = '%s:%s' % (sys.prefix, abspath( inifile ))
+    name = hashlib.sha1( key.encode('utf-8') ).hexdigest()[:16]
+    return join( CACHE_DIR, 'boot-%s.pickle' % name )
+
+def snapshot_key( inifile ):
+    """Return snapshot key for master configuration file ``inifile``,
+    computed from its content and from pluggdapps packages installed in the
+    environment."""
+    global _pkgkey
+    from pluggdapps import papackages
+    from pluggdapps.manifest import manifest_key
+    if _pkgkey is None :
+        _pkgkey = manifest_key( papackages )
+    return '%s:%s' % (content_hash( inifile ), _pkgkey)
+
+def plugins_key():
+    """Return a hash of plugins defined in the environment, including plugins
+    listed by the manifest and not yet imported. Dynamic plugins created
+    during pre-boot change the key, hence snapshot entries are named by this
+    key."""
+    from pluggdapps.plugin import PluginMeta
+    names = set( PluginMeta._pluginmap.keys() )
+    names.update( PluginMeta._lazyplugins().keys() )
+    sha = hashlib.sha1( ' '.join( sorted( names )).encode('utf-8') )
+    return sha.hexdigest()
+
+def content_hash( *files ):
+    """Return sha1 hash for content of ``files``."""
+    sha = hashlib.sha1()
+    for f in files :
+        sha.update( abspath( f ).encode('utf-8') )
+        sha.update( open( f, 'rb' ).read() )
+    return sha.hexdigest()
+
+def load_snapshot( inifile, key ):
+    """Load snapshot for ``inifile``. Return a dictionary of snapshot
+    entries, where each entry is a pickled blob, if the snapshot is valid for
+    ``key``, else return an empty dictionary."""
+    sfile = snapshot_file( inifile )
+    if sfile not in _snapshots :
+        try :
+            _snapshots[ sfile ] = pickle.loads( open( sfile, 'rb' ).read() )
+        except Exception :
+            _snapshots[ sfile ] = {}
+    snapshot = _snapshots[ sfile ]
+    return snapshot if snapshot.get( 'key', None ) == key else {}
+
+def save_snapshot( inifile, key, **entries ):
+    """Update snapshot for ``inifile``, valid for ``key``, with ``entries``.
+    Each entry value is pickled separately. Failing to save the snapshot is
+    not an error, booting will simply not be optimized."""
+    sfile = snapshot_file( inifile )
+    snapshot = load_snapshot( inifile, key )
+    try :
+        snapshot.update({ k : pickle.dumps( v ) for k, v in entries.items() })
+        snapshot['key'] = key
+        _snapshots[ sfile ] = snapshot
+        tmpfile = '%s.%s' % (sfile, os.getpid())
+        os.makedirs( dirname( sfile ), exist_ok=True )
+        open( tmpfile, 'wb' ).write( pickle.dumps( snapshot ))
+        os.replace( tmpfile, sfile )
+    except Exception :
+        pass
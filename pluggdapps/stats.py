@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+
+# This file is subject to the terms and conditions defined in
+# file 'LICENSE', which is part of this source code package.
+#       Copyright (c) 2011 R Pratap Chakravarthy
+
+"""Latency statistics for requests served by the platform. Time taken by
+each phase of a request is recorded in :class:`Histogram`, an HDR-style
+(high dynamic range) histogram with log-linear buckets, that keeps a fixed
+relative precision for values ranging from microseconds to minutes.
+
+Histograms are maintained per application, and per view for phases after
+the request is routed to a view. All recording happens in the thread
+serving the event loop, hence counters are updated without any locks.
+
+Recorded phases are,
+
+* ``parse``, parsing request start-line and headers.
+* ``resolve``, resolving request to mounted application.
+* ``newrequest``, creating or renewing request plugin.
+* ``handle``, :meth:`IHTTPRequest.handle` including in-bound transformers.
+* ``route``, url match, predicates and content negotiation by router.
+* ``resource``, resource callable.
+* ``view``, view callable.
+* ``outbound.<plugin>``, each :class:`IHTTPOutBound` transformer.
+* ``write``, writing response data till the socket write is complete.
+* ``total``, from request received till the response is completely written.
+
+Statistics are enabled by ``stats`` setting in ``[pluggdapps]`` section,
+refer to :attr:`pluggdapps.platform.Pluggdapps.stats`.
+"""
+
+import time
+
+__all__ = [ 'Histogram', 'RequestStats' ]
+
+class Histogram( object ):
+    """Log-linear histogram of integer values. Values less than
+    2 ** ``subbits`` are counted exactly, larger values are counted in
+    buckets whose width is a power of 2, such that the relative error of any
+    recorded value is less than 2 ** -(subbits-1)."""
+
+    __slots__ = [ 'subbits', 'counts', 'count', 'total', 'min', 'max' ]
+
+    def __init__( self, subbits=7 ):
+        self.subbits = subbits
+        self.counts = {}        # bucket-index -> count
+        self.count = self.total = self.max = 0
+        self.min = None
+
+    def record( self, value ):
+        """Record non-negative integer ``value``."""
+        shift = value.bit_length() - self.subbits
+        idx = value if shift <= 0 else \
+                    (shift << (self.subbits-1)) + (value >> shift)
+        counts = self.counts
+        counts[idx] = counts.get( idx, 0 ) + 1
+        self.count += 1
+        self.total += value
+        self.max = value if value > self.max else self.max
+        self.min = value if self.min is None or value < self.min else self.min
+
+    def valueat( self, idx ):
+        """Return the highest value counted by bucket ``idx``."""
+        if idx < (1 << self.subbits) :
+            return idx
+        shift = (idx >> (self.subbits-1)) - 1
+        mantissa = idx - (shift << (self.subbits-1))
+        return ((mantissa+1) << shift) - 1
+
+    def percentile( self, p ):
+        """Return the value below which ``p`` percent of recorded values
+        fall."""
+        if self.count == 0 : return 0
+        target, acc = max( 1, self.count * p / 100.0 ), 0
+        for idx in sorted( self.counts ) :
+            acc += self.counts[idx]
+            if acc >= target :
+                return min( self.valueat( idx ), self.max )
+        return self.max
+
+    def merge( self, other ):
+        """Add counts from ``other`` histogram, having same precision, to
+        this histogram."""
+        for idx, n in other.counts.items() :
+            self.counts[idx] = self.counts.get( idx, 0 ) + n
+        self.count += other.count
+        self.total += other.total
+        self.max = max( self.max, other.max )
+        if other.min is not None :
+            self.min = other.min if self.min is None \
+                                 else min( self.min, other.min )
+
+    def summary( self ):
+        """Return a dictionary of count, min, max, mean and percentiles of
+        recorded values."""
+        return {
+            'count' : self.count,
+            'min'   : self.min or 0,
+            'max'   : self.max,
+            'mean'  : (self.total / self.count) if self.count else 0,
+            'p50'   : self.percentile( 50 ),
+            'p90'   : self.percentile( 90 ),
+            'p99'   : self.percentile( 99 ),
+            'p999'  : self.percentile( 99.9 ),
+        }
+
+
+class RequestStats( object ):
+    """Latency histograms, in microseconds, for each phase of a request,
+    kept per application and per view.
+
+    Instrumented code takes a timestamp using :func:`timer` and records the
+    elapsed time using :meth:`since`. Both are cheap enough to be called
+    from the event loop for every request.
+    """
+
+    timer = staticmethod( time.perf_counter )
+    """Clock used to timestamp phases."""
+
+    def __init__( self, subbits=7 ):
+        self.subbits = subbits
+        self.reset()
+
+    def reset( self ):
+        """Clear all recorded statistics."""
+        self.apps = {}          # app -> { phase -> Histogram }
+        self.views = {}         # (app, view) -> { phase -> Histogram }
+        self.startedat = time.time()
+
+    def record( self, app, view, phase, usecs ):
+        """Record ``usecs`` microseconds taken by ``phase`` of a request to
+        ``app``. If ``view`` is not None, it is also recorded for (app,
+        view)."""
+        phases = self.apps.get( app, None )
+        if phases is None : phases = self.apps[app] = {}
+        hist = phases.get( phase, None )
+        if hist is None : hist = phases[phase] = Histogram( self.subbits )
+        hist.record( usecs )
+
+        if view is not None :
+            phases = self.views.get( (app, view), None )
+            if phases is None : phases = self.views[(app, view)] = {}
+            hist = phases.get( phase, None )
+            if hist is None : hist = phases[phase] = Histogram( self.subbits )
+            hist.record( usecs )
+
+    def since( self, app, view, phase, start ):
+        """Record time elapsed from ``start``, a timestamp from
+        :attr:`timer`."""
+        usecs = int( (self.timer() - start) * 1000000 )
+        self.record( app, view, phase, usecs if usecs > 0 else 0 )
+
+    def snapshot( self ):
+        """Return a JSON serializable dictionary of summaries, refer to
+        :meth:`Histogram.summary`, for each application and view."""
+        summary = lambda phases : {
+                    phase : hist.summary() for phase, hist in phases.items() }
+        views = {}
+        for (app, view), phases in self.views.items() :
+            views.setdefault( app, {} )[ view ] = summary( phases )
+        return {
+            'startedat' : self.startedat,
+            'unit'      : 'us',
+            'apps'      : { app : summary( phases )
+                            for app, phases in self.apps.items() },
+            'views'     : views,
+        }
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+
+# This file is subject to the terms and conditions defined in
+# file 'LICENSE', which is part of this source code package.
+#       Copyright (c) 2011 R Pratap Chakravarthy
+
+import unittest, tracemalloc
+
+from   pluggdapps.bootprofile import BootProfiler
+
+class UnitTest_BootProfiler( unittest.TestCase ):
+
+    def setUp( self ):
+        tracemalloc.start()
+
+    def tearDown( self ):
+        tracemalloc.stop()
+
+    def test_wrap( self ):
+        prof = BootProfiler()
+        fn = prof.wrap( 'phase', lambda x : 'name%s' % x, lambda x : [x]*100 )
+        assert fn( 1 ) == [1]*100
+        fn( 1 ); fn( 2 )
+        assert prof.records[ ('phase', 'name1') ][0] == 2
+        assert prof.records[ ('phase', 'name2') ][0] == 1
+        assert sorted( r['name'] for r in prof.table() ) == ['name1', 'name2']
+
+    def test_nested( self ):
+        prof = BootProfiler()
+        inner = prof.wrap( 'phase', 'inner', lambda : None )
+        outer = prof.wrap( 'phase', 'outer', lambda : inner() )
+        other = prof.wrap( 'other', 'other', lambda : outer() )
+        other()
+        assert sorted( prof.records.keys() ) == \
+                    [ ('other', 'other'), ('phase', 'outer') ]
+
+if __name__ == '__main__' :
+    unittest.main()
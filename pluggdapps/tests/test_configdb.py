@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+# This file is subject to the terms and conditions defined in
+# file 'LICENSE', which is part of this source code package.
+#       Copyright (c) 2011 R Pratap Chakravarthy
+
+import unittest, tempfile, sqlite3, shutil
+from   os.path              import join
+
+import pluggdapps
+import pluggdapps.snapshot  as snapshot
+import pluggdapps.manifest  as manifest
+from   pluggdapps.platform  import Pluggdapps
+
+class UnitTest_ConfigSqlite3DB( unittest.TestCase ):
+
+    def setUp( self ):
+        # Boot-time caches are written to the temporary directory.
+        tmpdir = self.tmpdir = tempfile.mkdtemp()
+        self._cachedir = snapshot.CACHE_DIR, manifest.CACHE_DIR
+        snapshot.CACHE_DIR = manifest.CACHE_DIR = tmpdir
+        pluggdapps.loadpackages()
+        self.dbfile = join( tmpdir, 'configdb.sqlite3' )
+        inifile = join( tmpdir, 'master.ini' )
+        open( inifile, 'w' ).write(
+            "[pluggdapps]\n[mountloc]\n"
+            "[plugin:pluggdapps.configsqlite3db]\nurl = %s\n" % self.dbfile )
+        self.pa = Pluggdapps.boot( inifile )
+        self.configdb = self.pa.configdb
+
+    def tearDown( self ):
+        self.configdb.close()
+        snapshot.CACHE_DIR, manifest.CACHE_DIR = self._cachedir
+        snapshot._snapshots.clear()
+        shutil.rmtree( self.tmpdir )
+
+    def test_config( self ):
+        configdb = self.configdb
+        sec = 'plugin:pluggdapps.configsqlite3db'
+        assert configdb.config() == {}
+        assert configdb.config( section=sec, name='url', value='x' ) == 'x'
+        assert configdb.config( section=sec, name='url' ) == 'x'
+        assert configdb.config( section=sec ) == { 'url' : 'x' }
+        assert configdb.config() == { sec : { 'url' : 'x' }}
+        assert configdb.version() == 1
+        assert self.pa.settings[sec]['url'] == self.dbfile
+
+    def test_batch( self ):
+        configdb = self.configdb
+        settings = { 'DEFAULT' : { 'debug' : 'true' },
+                     'pluggdapps' : { 'port' : '8080', 'host' : 'x.com' } }
+        assert self.pa.config( settings=settings ) == settings
+        assert configdb.version() == 1
+        assert self.pa.settings['pluggdapps']['port'] == 8080
+        # Read the database directly.
+        conn = sqlite3.connect( self.dbfile )
+        rows = dict( conn.execute( "SELECT * FROM platform" ))
+        assert sorted( rows ) == [ 'DEFAULT', 'pluggdapps' ]
+        conn.close()
+
+    def test_cache( self ):
+        configdb = self.configdb
+        configdb.config( section='DEFAULT', name='debug', value='true' )
+        table = configdb.tables['platform']
+        assert configdb.config() == { 'DEFAULT' : { 'debug' : 'true' }}
+        assert configdb.tables['platform'] is table     # Read from cache.
+        # Updates by other connections, like other worker processes, drop
+        # the cache.
+        conn = sqlite3.connect( self.dbfile )
+        with conn :
+            conn.execute( "DELETE FROM platform" )
+        conn.close()
+        assert configdb.config() == {}
+
+if __name__ == '__main__' :
+    unittest.main()
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+# This file is subject to the terms and conditions defined in
+# file 'LICENSE', which is part of this source code package.
+#       Copyright (c) 2011 R Pratap Chakravarthy
+
+import unittest, socket, tempfile
+
+from   pluggdapps.web.server    import IOStream
+
+class Loop( object ):
+    READ, WRITE, ERROR, EDGE = 1, 4, 24, 1 << 31
+    edge_triggered = False
+
+    def add_handler( self, fd, handler, events ):
+        self.events = events
+
+    def update_handler( self, fd, events ):
+        self.events = events
+
+    def remove_handler( self, fd ):
+        self.events = None
+
+    def add_callback( self, callback ):
+        self.callbacks.append( callback )
+
+class Server( object ):
+    ioloop = Loop()
+    class pa( object ):
+        logdebug = logwarn = logerror = staticmethod( lambda *args : None )
+
+class Conn( object ):
+    def __init__( self, sock ):
+        self.conn, self.address, self.server = sock, ('127.0.0.1', 0), Server()
+        self.settings = { 'max_buffer_size' : 1 << 20,
+                          'read_chunk_size' : 4096 }
+        self.written = 0
+
+    def __getitem__( self, name ):
+        return self.settings[ name ]
+
+    def on_written( self ):
+        self.written += 1
+
+    def on_read( self, nbytes ):
+        pass
+
+class UnitTest_IOStream( unittest.TestCase ):
+
+    def setUp( self ):
+        self.a, self.b = socket.socketpair()
+        self.a.setsockopt( socket.SOL_SOCKET, socket.SO_SNDBUF, 4096 )
+        self.stream = IOStream( Conn( self.a ))
+        self.stream.ioloop.callbacks = []
+        self.done = []
+
+    def tearDown( self ):
+        self.stream.close()
+        self.b.close()
+
+    def receive( self, size ):
+        """Read ``size`` bytes from the other end, while writing the rest."""
+        data = b''
+        while len( data ) < size :
+            data += self.b.recv( 65536 )
+            self.stream.handle_write()
+        return data
+
+    def test_write_vectored( self ):
+        parts = [ b'header\r\n\r\n', b'', b'x' * 100000, b'y' * 10 ]
+        self.stream.write( parts, lambda : self.done.append( True ))
+        assert self.stream.writing()
+        data = self.receive( 100020 )
+        assert data == b''.join( parts )
+        assert self.done == [ True ] and not self.stream.writing()
+
+    def test_write_file( self ):
+        with tempfile.TemporaryFile() as f :
+            f.write( b'0123456789' * 20000 )
+            f.flush()
+            self.stream.write( b'head' )
+            self.stream.write_file( open( f.fileno(), 'rb', closefd=False ),
+                                    offset=10, count=150000 )
+            self.stream.write( b'tail', lambda : self.done.append( True ))
+            data = self.receive( 150008 )
+        assert data == b'head' + (b'0123456789' * 20000)[10:150010] + b'tail'
+        assert self.done == [ True ]
+
+    def test_renew( self ):
+        stream, callbacks = self.stream, self.stream.ioloop.callbacks
+        self.b.sendall( b'first\r\n\r\n' )
+        stream.read_until( b'\r\n\r\n', self.done.append )
+        stream.close()
+        c, d = socket.socketpair()
+        try :
+            stream.renew( Conn( c ))
+            d.sendall( b'second\r\n\r\n' )
+            stream.read_until( b'\r\n\r\n', self.done.append )
+            # Callback queued for the earlier connection is ignored.
+            callbacks.pop( 0 )()
+            assert self.done == [] and stream.reading()
+            callbacks.pop( 0 )()
+            assert self.done == [ b'second\r\n\r\n' ]
+        finally :
+            stream.close()
+            d.close()
+
+if __name__ == '__main__' :
+    unittest.main()
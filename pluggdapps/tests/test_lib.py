@@ -74,3 +74,23 @@ class UnitTest_Util( unittest.TestCase ):
 
     def test_docstr( self ):
         assert docstr(docstr) == "Return the doc-string for the object."
+
+    def test_freelist( self ):
+        class Obj( object ):
+            def reset( self ) : self.data = None
+        fl = FreeList( 1 )
+        assert fl.get() == None
+        a, b = Obj(), Obj()
+        a.data = b.data = 'data'
+        assert fl.put( a ) == True and a.data == None
+        assert fl.put( b ) == False and b.data == 'data'
+        assert len( fl ) == 1
+        assert fl.get() is a and fl.get() == None
+
+    def test_etag( self ):
+        c = Context()
+        assert c.etag.hashout() == '' and c.etag._hasher == None
+        c.etag['a'] = 1
+        assert c['a'] == 1 and c.etag.hashout( prefix='v-' ).startswith('v-')
+        c.etag.clear()
+        assert c.etag._hasher == None and c['a'] == 1
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+# This file is subject to the terms and conditions defined in
+# file 'LICENSE', which is part of this source code package.
+#       Copyright (c) 2011 R Pratap Chakravarthy
+
+import unittest, socket, time
+
+from   pluggdapps.web.server    import Listener, acceptqueue, \
+                                       add_accept_handler
+
+class UnitTest_Listener( unittest.TestCase ):
+
+    def setUp( self ):
+        self.sock = socket.socket( socket.AF_INET, socket.SOCK_STREAM )
+        self.sock.bind( ('127.0.0.1', 0) )
+        self.sock.listen( 16 )
+        self.clients = []
+
+    def tearDown( self ):
+        [ c.close() for c in self.clients ]
+        self.sock.close()
+
+    def test_acceptqueue( self ):
+        if not hasattr( socket, 'TCP_INFO' ) :
+            assert acceptqueue( self.sock ) is None
+            return
+        assert acceptqueue( self.sock ) == (0, 16)
+        address = self.sock.getsockname()
+        for i in range( 3 ) :
+            self.clients.append( socket.create_connection( address ))
+        time.sleep( 0.05 )
+        assert acceptqueue( self.sock ) == (3, 16)
+
+    def test_stats( self ):
+        listener = Listener( self.sock )
+        listener.accepted = 10
+        stats = listener.stats()
+        assert stats['address'] == '127.0.0.1:%s' % self.sock.getsockname()[1]
+        assert stats['accepted'] == 10
+        assert stats['rate'] > 0
+
+    def test_accept_batch( self ):
+        class Loop( object ):
+            def add_handler( self, fd, handler, events ):
+                self.handler = handler
+
+        class Server( object ):
+            class pa( object ):
+                logdebug = logerror = staticmethod( lambda *args : None )
+
+        accepted, loop = [], Loop()
+        self.sock.setblocking( 0 )
+        add_accept_handler( Server(), self.sock,
+                            lambda conn, addr : accepted.append( conn ),
+                            loop, batch=2 )
+        address = self.sock.getsockname()
+        for i in range( 3 ) :
+            self.clients.append( socket.create_connection( address ))
+        time.sleep( 0.05 )
+        loop.handler( self.sock.fileno(), None )
+        assert len( accepted ) == 2
+        loop.handler( self.sock.fileno(), None )
+        assert len( accepted ) == 3
+        [ conn.close() for conn in accepted ]
+
+if __name__ == '__main__' :
+    unittest.main()
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+# This file is subject to the terms and conditions defined in
+# file 'LICENSE', which is part of this source code package.
+#       Copyright (c) 2011 R Pratap Chakravarthy
+
+import unittest, tempfile, time, shutil
+from   os.path          import join, isfile
+
+from   pluggdapps.log   import LogWriter
+
+class UnitTest_LogWriter( unittest.TestCase ):
+
+    def setUp( self ):
+        self.tmpdir = tempfile.mkdtemp()
+        self.logfile = join( self.tmpdir, 'pa.log' )
+
+    def tearDown( self ):
+        shutil.rmtree( self.tmpdir )
+
+    def test_write( self ):
+        writer = LogWriter( self.logfile, flushinterval=10 )
+        for i in range( 100 ) :
+            assert writer.put( 'line %s\n' % i )
+        writer.flush()
+        lines = open( self.logfile ).read().splitlines()
+        assert lines == [ 'line %s' % i for i in range( 100 ) ]
+        assert writer.written == 100
+        writer.close()
+        assert writer.put( 'closed\n' ) == False
+
+    def test_drop( self ):
+        writer = LogWriter( self.logfile, queuesize=10 )
+        with writer.lock :  # Hold the writer, while the queue fills up.
+            results = [ writer.put( 'line %s\n' % i ) for i in range( 15 ) ]
+        assert results.count( False ) == writer.dropped == 5
+        writer.close()
+        lines = open( self.logfile ).read().splitlines()
+        assert len( lines ) == 11
+        assert lines[-1] == 'WARN: Dropped 5 log messages'
+
+    def test_rotate_size( self ):
+        writer = LogWriter( self.logfile, maxbytes=100, backups=2 )
+        for i in range( 5 ) :
+            writer.put( 'x' * 99 + '\n' )
+            writer.flush()
+        writer.close()
+        assert writer.rotations == 5
+        assert isfile( self.logfile + '.1' )
+        assert isfile( self.logfile + '.2' )
+        assert not isfile( self.logfile + '.3' )
+
+    def test_rotate_time( self ):
+        writer = LogWriter( self.logfile, interval=0.05, backups=1 )
+        writer.put( 'first\n' )
+        writer.flush()
+        time.sleep( 0.1 )
+        writer.put( 'second\n' )
+        writer.flush()
+        writer.close()
+        assert writer.rotations == 1
+        assert open( self.logfile + '.1' ).read() == 'first\nsecond\n'
+
+    def test_rotate_shared( self ):
+        # Writer in a forked child, appending to the same file, does not
+        # rotate it and re-opens it once it is rotated by the parent.
+        parent = LogWriter( self.logfile, flushinterval=0.01, maxbytes=100,
+                            backups=2 )
+        child = LogWriter( self.logfile, maxbytes=100, backups=2 )
+        child.rotator = False
+        with child.lock :   # Both lines are written as a single batch.
+            child.put( 'x' * 99 + '\n' )
+            child.put( 'x' * 99 + '\n' )
+        child.flush()
+        assert child.rotations == 0
+        time.sleep( 0.1 )   # Rotated on size, even with nothing to write.
+        assert parent.rotations == 1
+        child.put( 'after\n' )
+        child.flush()
+        parent.close()
+        child.close()
+        assert open( self.logfile ).read() == 'after\n'
+        assert len( open( self.logfile + '.1' ).read() ) == 200
+
+if __name__ == '__main__' :
+    unittest.main()
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+# This file is subject to the terms and conditions defined in
+# file 'LICENSE', which is part of this source code package.
+#       Copyright (c) 2011 R Pratap Chakravarthy
+
+import unittest
+
+import pluggdapps.utils             as h
+from   pluggdapps.web.multipart     import MultipartParser, MultipartError
+from   pluggdapps.web.spooledbody   import SpooledBody
+
+body = (
+    b'preamble\r\n'
+    b'--XyZ\r\n'
+    b'Content-Disposition: form-data; name="title"\r\n'
+    b'\r\n'
+    b'hello\r\n-XyZ --XyZ\r\n'
+    b'--XyZ\r\n'
+    b'Content-Disposition: form-data; name="upload"; filename="a b.txt"\r\n'
+    b'Content-Type: text/plain\r\n'
+    b'\r\n' +
+    b'0123456789' * 100 +
+    b'\r\n--XyZ--\r\n'
+    b'epilogue' )
+
+class UnitTest_Multipart( unittest.TestCase ):
+
+    def test_feed( self ):
+        seen = []
+        onpart = lambda part : seen.append( (part.name, part.size) )
+        for size in [ 1, 7, 64, len( body ) ] :
+            parser = MultipartParser( b'XyZ', spool_size=256, onpart=onpart )
+            [ parser.feed( body[i:i+size] ) for i in range(0, len(body), size) ]
+            title, upload = parser.close()
+            assert title.value == b'hello\r\n-XyZ --XyZ'
+            assert upload.filename == b'a b.txt'
+            assert upload.content_type[:2] == ( b'text', b'plain' )
+            assert upload.value.getvalue() == b'0123456789' * 100
+            assert upload.value.spilled()
+            upload.value.close()
+        # Headers are available before data.
+        assert seen == [ (b'title', 0), (b'upload', 0) ] * 4
+
+    def test_limits( self ):
+        for kwargs in [ dict( max_part_size=500 ), dict( max_field_size=10 ) ]:
+            parser = MultipartParser( b'XyZ', **kwargs )
+            with self.assertRaises( MultipartError ) as cm :
+                parser.feed( body )
+            assert cm.exception.status == 413
+        parser = MultipartParser( b'XyZ' )
+        parser.feed( body[:200] )
+        with self.assertRaises( MultipartError ) as cm :
+            parser.close()                              # Incomplete
+        assert cm.exception.status == 400
+        # Error is raised again on close, later data is discarded.
+        parser = MultipartParser( b'XyZ', max_field_size=2 )
+        self.assertRaises( MultipartError, parser.feed, body[:100] )
+        parser.feed( body[100:] )
+        with self.assertRaises( MultipartError ) as cm :
+            parser.close()
+        assert cm.exception.status == 413
+
+    def test_formbody( self ):
+        nested = (
+            b'--AaB\r\n'
+            b'Content-Disposition: form-data; name="files"\r\n'
+            b'Content-Type: multipart/mixed; boundary=BbC\r\n'
+            b'\r\n'
+            b'--BbC\r\n'
+            b'Content-Disposition: file; filename="x.txt"\r\n'
+            b'\r\n'
+            b'xxx\r\n'
+            b'--BbC\r\n'
+            b'Content-Disposition: file; filename="y.txt"\r\n'
+            b'\r\n'
+            b'yyy\r\n'
+            b'--BbC\r\n'
+            b'Content-Disposition: form-data\r\n'
+            b'\r\n'
+            b'zzz\r\n'
+            b'--BbC--\r\n'
+            b'--AaB--\r\n' )
+        ctype = h.parse_content_type( b'multipart/form-data; boundary="AaB"' )
+        args, multiparts = h.parse_formbody( ctype, nested )
+        files = multiparts[ b'files' ]
+        x, y, z = files
+        assert ( x['filename'], y['filename'] ) == ( 'x.txt', 'y.txt' )
+        assert ( x['value'].getvalue(), y['value'].getvalue() ) == \
+                    ( b'xxx', b'yyy' )
+        # Nested part that is not a file is a plain value.
+        assert z == b'zzz'
+
+    def test_formbody_spooled( self ):
+        ctype = h.parse_content_type( b'application/x-www-form-urlencoded' )
+        body = SpooledBody( 10 )
+        body.write( b'a=1&b=2&a=3' )
+        args, multiparts = h.parse_formbody( ctype, body.finish() )
+        assert args == { b'a' : [ b'1', b'3' ], b'b' : [ b'2' ] }
+        # Spooled url-encoded body is read into memory only upto a limit.
+        with self.assertRaises( MultipartError ) as cm :
+            h.parse_formbody( ctype, body.finish(), max_field_size=10 )
+        assert cm.exception.status == 413
+
+if __name__ == '__main__' :
+    unittest.main()
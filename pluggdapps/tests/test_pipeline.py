@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+# This file is subject to the terms and conditions defined in
+# file 'LICENSE', which is part of this source code package.
+#       Copyright (c) 2011 R Pratap Chakravarthy
+
+import unittest, tempfile
+
+from   pluggdapps.web.server    import PipelinedConnection
+
+class Conn( object ):
+    version = b'HTTP/1.1'
+
+    def __init__( self ):
+        self.request = self.close_callback = self.finish_callback = None
+        self.written = []
+
+    def write( self, data, callback=None ):
+        self.written.append( (self.request, data) )
+
+    def write_file( self, file, offset=0, count=None, callback=None ):
+        self.written.append( (self.request, file) )
+
+class UnitTest_Pipeline( unittest.TestCase ):
+
+    def test_promote( self ):
+        conn = Conn()
+        first, second = PipelinedConnection( conn ), PipelinedConnection( conn )
+        first.request, second.request = 'first', 'second'
+        assert second.version == b'HTTP/1.1'
+        second.write( b'second-1' )
+        first.write( b'first-1' )
+        second.write( b'second-2' )
+        assert conn.written == []       # Held back till promoted.
+
+        first.promote()
+        first.write( b'first-2' )
+        second.promote()
+        assert conn.written == [
+            ('first', b'first-1'), ('first', b'first-2'),
+            ('second', b'second-1'), ('second', b'second-2') ]
+        second.write( b'second-3' )     # Written straight.
+        assert conn.written[-1] == ('second', b'second-3')
+
+    def test_discard( self ):
+        conn, closed = Conn(), []
+        httpconn = PipelinedConnection( conn )
+        httpconn.set_close_callback( lambda : closed.append( True ))
+        with tempfile.TemporaryFile() as f :
+            httpconn.write_file( f )
+            httpconn.discard()
+            assert f.closed and closed == [ True ]
+        assert conn.written == [] and conn.close_callback is None
+
+if __name__ == '__main__' :
+    unittest.main()
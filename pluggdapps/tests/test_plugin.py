@@ -76,6 +76,33 @@ class TestPlugin( unittest.TestCase ):
         from pluggdapps.commands.ls import Ls
         assert pluginclass( ICommand, 'commandls' ) == Ls
 
+    def test_queryindex( self ):
+        from pluggdapps.plugin import PluginMeta
+        from pluggdapps.commands.ls import Ls
+        plugin_init()
+        pmap = PluginMeta._lookup( ICommand )
+        assert pmap['pluggdapps.ls'] == Ls
+        assert PluginMeta._lookup( 'pluggdapps.ICommand' ) is pmap
+        pclasses = PluginMeta._lookupr( ICommand, 'pluggdapps.l.*' )
+        assert pclasses == [ Ls ]
+        assert PluginMeta._lookupr( ICommand, 'pluggdapps.l.*' ) is pclasses
+        plugin_init()
+        assert (ICommand, 'pluggdapps.l.*') not in PluginMeta._queryindex
+
+    def test_manifest( self ):
+        from pluggdapps.manifest import build_manifest
+        import pluggdapps.commands.ls
+        plugin_init()
+        manifest = build_manifest( 'key' )
+        assert manifest['key'] == 'key'
+        assert manifest['plugins']['pluggdapps.ls']['module'] == \
+                    'pluggdapps.commands.ls'
+        assert manifest['plugins']['pluggdapps.ls']['settings'] == \
+                    { 'debug' : False }
+        icommand = manifest['interfaces']['pluggdapps.icommand']
+        assert icommand['module'] == 'pluggdapps.interfaces'
+        assert 'pluggdapps.ls' in icommand['plugins']
+
     def test_applications( self ):
         assert 'webapp' in webapps()
         assert 'docroot' in webapps()
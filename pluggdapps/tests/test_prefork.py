@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+# This file is subject to the terms and conditions defined in
+# file 'LICENSE', which is part of this source code package.
+#       Copyright (c) 2011 R Pratap Chakravarthy
+
+import unittest, os, signal, time
+
+from   pluggdapps.web.prefork   import Supervisor
+
+class Platform( object ):
+    def loginfo( self, formatstr, values=[] ): pass
+    def logerror( self, formatstr, values=[] ): pass
+
+class Server( dict ):
+    pa = Platform()
+
+class UnitTest_Supervisor( unittest.TestCase ):
+    """Supervisor is run against stubbed os.fork(), os.waitpid() and
+    os.kill(), no process is forked."""
+
+    def setUp( self ):
+        self.saved = os.fork, os.waitpid, os.kill
+        self.pids, self.exits, self.kills = iter( range( 100, 200 )), [], []
+        os.fork = lambda : next( self.pids )
+        os.waitpid = lambda pid, options : \
+                self.exits.pop( 0 ) if self.exits else (0, 0)
+        os.kill = lambda pid, sig : self.kills.append( (pid, sig) )
+        self.server = Server({ 'worker.backoff' : 1.0,
+                               'worker.backoff_max' : 8.0,
+                               'worker.graceful_timeout' : 5.0 })
+
+    def tearDown( self ):
+        os.fork, os.waitpid, os.kill = self.saved
+
+    def crash( self, sup, slot ):
+        """Exit worker in ``slot`` and return the delay to restart it."""
+        self.exits.append( (sup.slots[slot], 256) )
+        sup.reap()
+        assert sup.slots[slot] is None
+        return round( sup.restartat[slot] - time.time() )
+
+    def test_backoff( self ):
+        sup = Supervisor( self.server, 1, [] )
+        delays = []
+        for i in range( 6 ) :
+            sup.spawn( 0 )
+            delays.append( self.crash( sup, 0 ))
+        assert delays == [ 1, 2, 4, 8, 8, 8 ]    # Capped by backoff_max.
+        assert sup.crashes == [ 6 ]
+
+        # Worker serving longer than backoff_max is not crashing repeatedly.
+        sup.spawn( 0 )
+        sup.startedat[ sup.slots[0] ] -= 9
+        assert self.crash( sup, 0 ) == 1
+        assert sup.crashes == [ 1 ]
+
+        # Workers exiting after stop are not restarted.
+        sup.spawn( 0 )
+        sup.stop( signal.SIGTERM )
+        self.crash( sup, 0 )
+        assert sup.crashes == [ 1 ] and sup.signalled == signal.SIGTERM
+
+    def test_roll( self ):
+        sup = Supervisor( self.server, 3, [] )
+        [ sup.spawn( slot ) for slot in range( 3 ) ]
+        assert sup.slots == [ 100, 101, 102 ]
+        sup.rolling = [ 0, 1, 2 ]
+        now = time.time()
+
+        # New worker is forked before the old one is asked to stop.
+        sup.roll( now )
+        assert sup.slots == [ 103, 101, 102 ]
+        assert self.kills == [ (100, signal.SIGTERM) ]
+        assert list( sup.retiring ) == [ 100 ]
+
+        # Next slot waits till the old worker exits.
+        sup.roll( now )
+        assert sup.slots == [ 103, 101, 102 ]
+        self.exits.append( (100, 0) )
+        sup.reap()
+        assert sup.retiring == {} and sup.crashes == [ 0, 0, 0 ]
+        sup.roll( now )
+        assert sup.slots == [ 103, 104, 102 ]
+        assert self.kills[-1] == (101, signal.SIGTERM)
+
+        # Old worker not exiting within graceful timeout is killed.
+        sup.roll( now + 7 )
+        assert self.kills[-1] == (101, signal.SIGKILL)
+        self.exits.append( (101, 9) )
+        sup.reap()
+        sup.roll( now + 7 )
+        assert sup.slots == [ 103, 104, 105 ] and sup.rolling == []
+        assert self.kills[-1] == (102, signal.SIGTERM)
+
+if __name__ == '__main__' :
+    unittest.main()
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+# This file is subject to the terms and conditions defined in
+# file 'LICENSE', which is part of this source code package.
+#       Copyright (c) 2011 R Pratap Chakravarthy
+
+import unittest, socket, re
+
+from   pluggdapps.web.readbuffer    import ReadBuffer
+
+class UnitTest_ReadBuffer( unittest.TestCase ):
+
+    def test_find( self ):
+        buf = ReadBuffer( 8 )
+        buf.extend( b'GET / HTTP/1.1\r' )
+        assert buf.find( b'\r\n\r\n' ) == -1
+        buf.extend( b'\n\r' )
+        assert buf.find( b'\r\n\r\n' ) == -1
+        buf.extend( b'\nHost' )     # Delimiter straddles the extends.
+        assert buf.find( b'\r\n\r\n' ) == 14
+        assert buf.consume( 18 ) == b'GET / HTTP/1.1\r\n\r\n'
+        assert buf.find( b'\r\n' ) == -1
+        assert buf.search( re.compile( b'o.t' )) == 4
+        assert len( buf ) == 4
+
+    def test_find_delimiters( self ):
+        buf = ReadBuffer( 8 )
+        buf.extend( b'xxab\r' )
+        assert buf.find( b'\r\n' ) == -1
+        assert buf.find( b'ab' ) == 2       # Scanned data is searched again.
+        buf.extend( b'\nab' )
+        assert buf.find( b'\r\n' ) == 4
+        assert buf.find( b'ab' ) == 2
+
+    def test_reuse( self ):
+        buf = ReadBuffer( 16 )
+        buf.extend( b'0123456789' )
+        buf.consume( 8 )
+        buf.extend( b'abcdefghij' )     # Moved to front, not grown.
+        assert len( buf.buf ) == 16
+        assert buf.consume( 12 ) == b'89abcdefghij'
+        buf.extend( b'x' * 40 )         # Grown.
+        assert buf.consume( 40 ) == b'x' * 40
+        assert len( buf ) == 0 and buf.start == 0
+
+    def test_view( self ):
+        buf = ReadBuffer( 8 )
+        buf.extend( b'abcdef' )
+        view = buf.view( 4 )
+        assert bytes( view ) == b'abcd'
+        self.assertRaises( BufferError, buf.extend, b'x' * 10 )
+        view.release()
+        buf.skip( 4 )
+        buf.extend( b'x' * 10 )
+        assert buf.consume( len( buf )) == b'ef' + b'x' * 10
+
+    def test_recv_into( self ):
+        a, b = socket.socketpair()
+        try :
+            b.sendall( b'hello world' )
+            buf = ReadBuffer( 4 )
+            assert buf.recv_into( a, 5 ) == 5
+            assert buf.recv_into( a, 100 ) == 6
+            assert buf.consume( 11 ) == b'hello world'
+        finally :
+            a.close()
+            b.close()
+
+    def test_chunks( self ):
+        a, b = socket.socketpair()
+        try :
+            buf = ReadBuffer( 4 )
+            b.sendall( b'body' + b'x' * 20 + b'\r\nnext' )
+            assert buf.recv_into( a, 4 ) == 4
+            assert buf.recv( a, 10 ) == 10
+            assert buf.recv_into( a, 4 ) == 4  # Follows the chunks.
+            assert len( buf ) == 18
+            assert buf.consume( 16 ) == b'body' + b'x' * 12
+            b.sendall( b'\r\n' )
+            buf.recv( a, 100 )
+            assert buf.find( b'\r\n' ) == 8
+            assert buf.consume( 10 ) == b'x' * 8 + b'\r\n'
+            assert buf.consume( 6 ) == b'next\r\n'
+            assert len( buf ) == 0
+        finally :
+            a.close()
+            b.close()
+
+if __name__ == '__main__' :
+    unittest.main()
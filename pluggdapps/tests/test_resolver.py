@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+# This file is subject to the terms and conditions defined in
+# file 'LICENSE', which is part of this source code package.
+#       Copyright (c) 2011 R Pratap Chakravarthy
+
+import unittest
+
+from   pluggdapps.resolver import AppResolver
+
+class UnitTest_AppResolver( unittest.TestCase ):
+
+    def setUp( self ):
+        self.resolver = r = AppResolver( cachesize=4 )
+        r.mount( 'example.com/', 'root' )
+        r.mount( 'example.com/admin', 'admin' )
+        r.mount( 'example.com/admin/debug', 'debug' )
+        r.mount( 'docs.example.com/', 'docs' )
+        r.mount( 'static.com/assets', 'assets' )
+
+    def test_resolve( self ):
+        r = self.resolver
+        assert r.resolve( 'example.com', '/' ) == ('/', 'root')
+        assert r.resolve( 'example.com', '' ) == ('/', 'root')
+        assert r.resolve( 'example.com', '/index.html' ) == ('/', 'root')
+        assert r.resolve( 'docs.example.com', '/a/b' ) == ('/', 'docs')
+        assert r.resolve( 'unknown.com', '/' ) == (None, None)
+        assert r.resolve( 'static.com', '/' ) == (None, None)
+        assert r.resolve( 'static.com', '/assets/x.css' ) == \
+                    ('/assets', 'assets')
+
+    def test_longestprefix( self ):
+        r = self.resolver
+        assert r.resolve( 'example.com', '/admin' ) == ('/admin', 'admin')
+        assert r.resolve( 'example.com', '/admin/x' ) == ('/admin', 'admin')
+        assert r.resolve( 'example.com', '/admin/debug/1' ) == \
+                    ('/admin/debug', 'debug')
+        # Script-paths match on path segments
+        assert r.resolve( 'example.com', '/administer' ) == ('/', 'root')
+
+    def test_www( self ):
+        r = self.resolver
+        assert r.resolve( 'www.example.com', '/admin' ) == ('/admin', 'admin')
+        r.mount( 'www.example.com/', 'www' )
+        assert r.resolve( 'www.example.com', '/admin' ) == ('/', 'www')
+
+    def test_memoize( self ):
+        r = self.resolver
+        for i in range( 10 ) :
+            assert r.resolve( 'example.com', '/admin/debug' ) == \
+                        ('/admin/debug', 'debug')
+            assert r.resolve( 'example.com', '/admin' ) == ('/admin', 'admin')
+        assert r._lookup.cache_info().hits == 19
+
+if __name__ == '__main__' :
+    unittest.main()
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+# This file is subject to the terms and conditions defined in
+# file 'LICENSE', which is part of this source code package.
+#       Copyright (c) 2011 R Pratap Chakravarthy
+
+import unittest, tempfile, os, shutil
+from   os.path import join
+
+import pluggdapps
+import pluggdapps.snapshot     as snapshot
+import pluggdapps.manifest     as manifest
+from   pluggdapps.utils.config import SettingsView
+
+class UnitTest_SettingsView( unittest.TestCase ):
+
+    def test_read( self ):
+        base = { 'a' : 1, 'b' : 2 }
+        view = SettingsView( base )
+        assert view['a'] == 1 and view['b'] == 2
+        assert 'a' in view and 'c' not in view
+        assert sorted( view ) == ['a', 'b']
+        assert len( view ) == 2
+        assert view.overlay == None
+
+    def test_copyonwrite( self ):
+        base = { 'a' : 1, 'b' : 2 }
+        view1, view2 = SettingsView( base ), SettingsView( base )
+        view1['a'] = 10
+        view1['c'] = 30
+        assert view1['a'] == 10 and view1['c'] == 30
+        assert view2['a'] == 1 and 'c' not in view2
+        assert base == { 'a' : 1, 'b' : 2 }
+        assert len( view1 ) == 3
+        assert dict( view1.items() ) == { 'a' : 10, 'b' : 2, 'c' : 30 }
+
+    def test_delete( self ):
+        base = { 'a' : 1, 'b' : 2 }
+        view = SettingsView( base )
+        del view['a']
+        assert 'a' not in view and 'a' in base
+        assert list( view ) == ['b']
+        self.assertRaises( KeyError, view.__getitem__, 'a' )
+        self.assertRaises( KeyError, view.__delitem__, 'a' )
+        view['a'] = 100
+        assert view['a'] == 100
+
+    def test_sharedlayer( self ):
+        base = { 'a' : 1, 'b' : 2 }
+        view1, view2 = SettingsView( base ), SettingsView( base, {'b' : 20} )
+        base['a'], base['b'] = 11, 22
+        assert view1['a'] == 11 and view1['b'] == 22
+        assert view2['a'] == 11 and view2['b'] == 20
+
+class UnitTest_Snapshot( unittest.TestCase ):
+
+    def setUp( self ):
+        self.cachedir = tempfile.mkdtemp()
+        self._cachedir, snapshot.CACHE_DIR = snapshot.CACHE_DIR, self.cachedir
+        self.inifile = join( self.cachedir, 'master.ini' )
+        open( self.inifile, 'w' ).write( "[DEFAULT]\ndebug = true\n" )
+
+    def tearDown( self ):
+        snapshot.CACHE_DIR = self._cachedir
+        snapshot._snapshots.clear()
+        shutil.rmtree( self.cachedir )
+
+    def test_snapshot( self ):
+        key = snapshot.content_hash( self.inifile )
+        assert snapshot.load_snapshot( self.inifile, key ) == {}
+        snapshot.save_snapshot( self.inifile, key, settings={ 'a' : 1 } )
+        snapshot._snapshots.clear()     # Force reading from the file.
+        entries = snapshot.load_snapshot( self.inifile, key )
+        assert snapshot.pickle.loads( entries['settings'] ) == { 'a' : 1 }
+        assert snapshot.load_snapshot( self.inifile, 'stale' ) == {}
+
+    def test_contenthash( self ):
+        key = snapshot.content_hash( self.inifile )
+        open( self.inifile, 'a' ).write( "[pluggdapps]\nport = 80\n" )
+        assert snapshot.content_hash( self.inifile ) != key
+
+class UnitTest_Reload( unittest.TestCase ):
+
+    INI = ( "[pluggdapps]\n[mountloc]\n"
+            "[plugin:pluggdapps.httpepollserver]\npoll_threshold = %s\n" )
+
+    def setUp( self ):
+        from pluggdapps.platform import Pluggdapps
+        # Boot-time caches are written to the temporary directory.
+        self.tmpdir = tempfile.mkdtemp()
+        self._cachedir = snapshot.CACHE_DIR, manifest.CACHE_DIR
+        snapshot.CACHE_DIR = manifest.CACHE_DIR = self.tmpdir
+        pluggdapps.loadpackages()
+        self.inifile = join( self.tmpdir, 'master.ini' )
+        open( self.inifile, 'w' ).write( self.INI % 10 )
+        self.pa = Pluggdapps.boot( self.inifile )
+
+    def tearDown( self ):
+        snapshot.CACHE_DIR, manifest.CACHE_DIR = self._cachedir
+        snapshot._snapshots.clear()
+        shutil.rmtree( self.tmpdir )
+
+    def server( self ):
+        return self.pa.qp( self.pa, 'pluggdapps.IHTTPServer',
+                                    'pluggdapps.HTTPEPollServer' )
+
+    def test_reload( self ):
+        pa, sec = self.pa, 'plugin:pluggdapps.httpepollserver'
+        old = self.server()
+        assert pa.modifiedinis() == [] and pa.reload() == []
+        open( self.inifile, 'w' ).write( self.INI % 20 )
+        os.utime( self.inifile, (0, 0) )
+        assert pa.modifiedinis() == [ self.inifile ]
+        assert pa.reload() == [ ('platform', [sec]) ]
+        assert pa.settings[sec]['poll_threshold'] == 20
+        assert self.server()['poll_threshold'] == 20
+        assert old['poll_threshold'] == 10  # Continues with old settings.
+        assert pa.modifiedinis() == []
+
+if __name__ == '__main__' :
+    unittest.main()
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+
+# This file is subject to the terms and conditions defined in
+# file 'LICENSE', which is part of this source code package.
+#       Copyright (c) 2011 R Pratap Chakravarthy
+
+import unittest
+
+from   pluggdapps.web.spooledbody   import SpooledBody
+
+class UnitTest_SpooledBody( unittest.TestCase ):
+
+    def test_spool( self ):
+        body = SpooledBody( 16, chunk_size=10 )
+        body.write( b'0123456789' )
+        with memoryview( b'abcdefghij' ) as view :
+            body.write( view[:8] )
+        assert len( body ) == 18 and body.spilled()
+        body.finish()
+        assert list( body ) == [ b'0123456789', b'abcdefgh' ]
+        body.finish()
+        assert body.read( 4 ) == b'0123'
+        assert body.getvalue() == b'0123456789abcdefgh'
+        body.close()
+
+    def test_transform( self ):
+        body = SpooledBody( 1024, chunk_size=4 )
+        body.write( b'abcdefghij' )
+        calls = []
+        def transform( data, finishing ):
+            calls.append( finishing )
+            return data.upper() + (b'.' if finishing else b'')
+        body = body.finish().transform( transform )
+        assert calls == [ False, False, False, True ]
+        assert body.getvalue() == b'ABCDEFGHIJ.' and not body.spilled()
+        body.close()
+
+if __name__ == '__main__' :
+    unittest.main()
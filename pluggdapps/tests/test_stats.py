@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+# This file is subject to the terms and conditions defined in
+# file 'LICENSE', which is part of this source code package.
+#       Copyright (c) 2011 R Pratap Chakravarthy
+
+import unittest, random
+
+from   pluggdapps.stats import Histogram, RequestStats
+
+class UnitTest_Histogram( unittest.TestCase ):
+
+    def test_exact( self ):
+        hist = Histogram( subbits=7 )
+        [ hist.record( v ) for v in range( 1, 101 ) ]
+        assert hist.count == 100
+        assert hist.min == 1 and hist.max == 100
+        assert hist.percentile( 50 ) == 50
+        assert hist.percentile( 99 ) == 99
+        assert hist.percentile( 100 ) == 100
+
+    def test_precision( self ):
+        hist = Histogram( subbits=7 )
+        values = [ random.randint( 1, 10 ** 8 ) for i in range( 1000 ) ]
+        [ hist.record( v ) for v in values ]
+        values.sort()
+        for p in [ 50, 90, 99 ] :
+            exact = values[ int( len(values) * p / 100 ) - 1 ]
+            assert abs( hist.percentile( p ) - exact ) <= exact / 64
+        # Buckets are contiguous and cover values in order.
+        prev = -1
+        for idx in range( 1000 ) :
+            assert hist.valueat( idx ) > prev
+            prev = hist.valueat( idx )
+
+    def test_merge( self ):
+        h1, h2 = Histogram(), Histogram()
+        [ h1.record( v ) for v in range( 0, 500 ) ]
+        [ h2.record( v ) for v in range( 500, 1000 ) ]
+        h1.merge( h2 )
+        assert h1.count == 1000
+        assert h1.min == 0 and h1.max == 999
+        assert h1.summary()['mean'] == 499.5
+
+
+class UnitTest_RequestStats( unittest.TestCase ):
+
+    def test_record( self ):
+        stats = RequestStats()
+        stats.record( 'a.com/', None, 'resolve', 10 )
+        stats.record( 'a.com/', 'index', 'view', 100 )
+        stats.record( 'a.com/', 'index', 'view', 300 )
+        stats.since( 'b.com/', 'home', 'total', stats.timer() )
+        snap = stats.snapshot()
+        assert sorted( snap['apps'] ) == [ 'a.com/', 'b.com/' ]
+        assert sorted( snap['apps']['a.com/'] ) == [ 'resolve', 'view' ]
+        assert snap['views']['a.com/']['index']['view']['count'] == 2
+        assert snap['views']['a.com/']['index']['view']['max'] == 300
+        assert snap['views']['b.com/']['home']['total']['count'] == 1
+        stats.reset()
+        assert stats.snapshot()['apps'] == {}
+
+if __name__ == '__main__' :
+    unittest.main()
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+# This file is subject to the terms and conditions defined in
+# file 'LICENSE', which is part of this source code package.
+#       Copyright (c) 2011 R Pratap Chakravarthy
+
+import unittest, random
+
+from   pluggdapps.web.timerwheel    import TimerWheel
+
+class UnitTest_TimerWheel( unittest.TestCase ):
+
+    def test_expire( self ):
+        wheel = TimerWheel( 1.0, slots=8, levels=3, now=0 )
+        timers = [ wheel.add( d, d ) for d in [ 0.5, 1.0, 7.5, 9, 70, 600 ] ]
+        assert wheel.count == 6
+        assert wheel.advance( 0.9 ) == []
+        # Timers expiring in the same tick are returned in no order.
+        expire = lambda now : sorted( t.callback for t in wheel.advance(now) )
+        assert expire( 1.0 ) == [ 0.5, 1.0 ]
+        assert expire( 9.5 ) == [ 7.5, 9 ]
+        assert expire( 100 ) == [ 70 ]
+        assert expire( 600 ) == [ 600 ] # Beyond the span, 8 ** 3 ticks.
+        assert wheel.count == 0
+
+    def test_reset_remove( self ):
+        wheel = TimerWheel( 1.0, slots=8, levels=3, now=0 )
+        t1, t2 = wheel.add( 10, 't1' ), wheel.add( 10, 't2' )
+        wheel.reset( t1, 100 )
+        wheel.remove( t2 )
+        wheel.remove( t2 )
+        assert wheel.count == 1
+        assert wheel.advance( 50 ) == []
+        assert wheel.advance( 100 ) == [ t1 ]
+        wheel.reset( t1, 150 )      # Expired timer is scheduled again.
+        assert wheel.advance( 150 ) == [ t1 ]
+
+    def test_random( self ):
+        rnd = random.Random( 10 )
+        wheel = TimerWheel( 1.0, slots=8, levels=3, now=0 )
+        timers = { i : wheel.add( rnd.uniform( 0, 1500 ), i )
+                   for i in range( 2000 ) }
+        for i in range( 0, 2000, 3 ) :
+            wheel.reset( timers[i], rnd.uniform( 0, 1500 ))
+        removed = set( range( 1, 2000, 7 ))
+        [ wheel.remove( timers[i] ) for i in removed ]
+
+        fired, now = set(), 0.0
+        while now < 1600 :
+            now += rnd.uniform( 0.1, 2 )
+            for timer in wheel.advance( now ) :
+                assert now - 3 < timer.deadline <= now
+                fired.add( timer.callback )
+        assert fired == set( range( 2000 )) - removed
+        assert wheel.count == 0
+
+if __name__ == '__main__' :
+    unittest.main()
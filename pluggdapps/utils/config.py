@@ -9,10 +9,11 @@ plugins and process them.
 """
 
 import textwrap
+from   collections.abc  import MutableMapping
 
-__all__ = [ 'ConfigDict', 'settingsfor', 'sec2plugin', 'plugin2sec',
-            'is_plugin_section', 'conf_descriptionfor', 'conf_catalog',
-            'section_settings', 'netpath_settings' ]
+__all__ = [ 'ConfigDict', 'SettingsView', 'settingsfor', 'sec2plugin',
+            'plugin2sec', 'is_plugin_section', 'conf_descriptionfor',
+            'conf_catalog', 'section_settings', 'netpath_settings' ]
 
 class ConfigDict( dict ):
     """A collection of configuration settings. When a fresh key, a.k.a 
@@ -100,6 +101,70 @@ class ConfigItem( dict ):
         return opts() if isinstance( opts, collections.Callable ) else opts
 
 
+class SettingsView( MutableMapping ):
+    """Copy-on-write view of configuration settings. Reads are served from
+    ``base`` dictionary, which is shared by all plugin instances of the same
+    class (and context) and never modified through the view. The first write
+    creates a per-instance ``overlay`` dictionary that shadows the base, 
+    deleted keys are remembered in the overlay as well.
+
+    Since the base layer is shared, configuration updated on the base
+    dictionary, say via web-admin, are visible to every live view that has not
+    overriden the same key.
+    """
+
+    __slots__ = ( 'base', 'overlay' )
+
+    _deleted = object()
+
+    def __init__( self, base, overlay=None ):
+        self.base = base
+        self.overlay = overlay
+
+    def __getitem__( self, key ):
+        if self.overlay and key in self.overlay :
+            value = self.overlay[key]
+            if value is SettingsView._deleted :
+                raise KeyError( key )
+            return value
+        return self.base[key]
+
+    def __setitem__( self, key, value ):
+        if self.overlay is None :
+            self.overlay = {}
+        self.overlay[key] = value
+
+    def __delitem__( self, key ):
+        if key not in self :
+            raise KeyError( key )
+        if self.overlay is None :
+            self.overlay = {}
+        self.overlay[key] = SettingsView._deleted
+
+    def __contains__( self, key ):
+        if self.overlay and key in self.overlay :
+            return self.overlay[key] is not SettingsView._deleted
+        return key in self.base
+
+    def __iter__( self ):
+        if not self.overlay :
+            return iter( self.base )
+        return iter( self._merged() )
+
+    def __len__( self ):
+        if not self.overlay :
+            return len( self.base )
+        return len( self._merged() )
+
+    def __repr__( self ):
+        return repr( self._merged() )
+
+    def _merged( self ):
+        d = dict( self.base )
+        d.update( self.overlay or {} )
+        return { k : v for k, v in d.items() if v is not SettingsView._deleted }
+
+
 def settingsfor( prefix, sett ):
     """Filter settings keys ``sett.keys()`` starting with ``prefix`` and return
     a dictionary of corresponding options. Prefix is pruned of from returned
@@ -142,7 +207,7 @@ def conf_descriptionfor( plugin, info=None ):
 
     Returns a dictionary of configuration key and its ConfigItem value.
     """
-    from pluggdapps.plugin      import PluginMeta
+    from pluggdapps.plugin      import plugin_info
     from pluggdapps.platform    import DEFAULT, pluggdapps_defaultsett
 
     if plugin == 'DEFAULT' : # Description of configuration settings.
@@ -150,7 +215,7 @@ def conf_descriptionfor( plugin, info=None ):
     elif plugin == 'pluggdapps' :
         describe = pluggdapps_defaultsett()
     else :
-        info = info or PluginMeta._pluginmap[ plugin ]
+        info = info or plugin_info( plugin )
         bases = reversed( info['cls'].mro() )
         describe = info['cls'].default_settings()
         for b in bases :
@@ -23,7 +23,7 @@ __all__ = [
     'str2module', 'locatefile', 'hitch', 'hitch_method', 'colorize', 'strof',
     'longest_prefix', 'dictsort', 'formated_filesize', 'age', 'pynamespace',
     # Classes
-    'Context', 'Bunch',
+    'Context', 'Bunch', 'FreeList',
 ]
 
 ver_int = int( str(sys.version_info[0]) + str(sys.version_info[1]) )
@@ -433,6 +433,7 @@ class ETag( dict ):
         """Return the hash digest so far."""
         digest = '' # Initialize
         if self.values() or self._hashin :
+            self._hasher = self._hasher or hashlib.sha1()
             [ self._hasher.update(
                 v if isinstance(v, bytes) else str(v).encode('utf-8') 
               ) for v in self.values() ]
@@ -448,7 +449,7 @@ class ETag( dict ):
         self._init()
 
     def _init( self ):
-        self._hasher = hashlib.sha1()
+        self._hasher = None     # Created only when a digest is computed.
         self._hashin = b''
 
 
@@ -488,3 +489,32 @@ class Bunch( object ):
         return name + '>'
 
 
+class FreeList( object ):
+    """Bounded free-list of objects that can be re-used instead of being
+    allocated afresh. Objects added to the free-list must implement a
+    ``reset()`` method, which is called before the object is pooled and shall
+    drop all references held by the object for its previous use.
+    """
+
+    def __init__( self, size ):
+        self.size = size
+        self.objects = []
+
+    def get( self ):
+        """Return an object from the free-list, if available, else None."""
+        return self.objects.pop() if self.objects else None
+
+    def put( self, obj ):
+        """Reset ``obj`` and add it to the free-list. Return True if ``obj``
+        is pooled, False if the free-list is full."""
+        if len( self.objects ) >= self.size : return False
+        obj.reset()
+        self.objects.append( obj )
+        return True
+
+    def clear( self ):
+        """Drop all pooled objects."""
+        self.objects = []
+
+    def __len__( self ):
+        return len( self.objects )
@@ -13,7 +13,7 @@ from   urllib.parse import urlsplit, unquote, parse_qs, urlunsplit, quote, \
                            urlencode, urljoin
 import urllib.request, urllib.error
 
-from pluggdapps.utils.lib import parsecsv, print_exc
+from pluggdapps.utils.lib import parsecsv, print_exc, strof
 
 strptime = dt.datetime.strptime
 strftime = dt.datetime.strftime
@@ -327,7 +327,7 @@ def parse_netpath( netpath ):
     script = '/' + (parts.pop( 0 ) if parts else '')
     return netloc, script
 
-def parse_formbody( content_type, body ):
+def parse_formbody( content_type, body, **kwargs ):
     """HTML form values can be submited via POST or PUT methods, in which
     case, request Content-Type will be appropriately set. This function
     supports, ``application/x-www-form-urlencoded``, ``multipart/form-data``
@@ -338,100 +338,81 @@ def parse_formbody( content_type, body ):
         Value as return from parse_content_type().
 
     ``body``
-        Byte string of HTTP request body.
+        Byte string of HTTP request body, or an iterable of byte-string
+        chunks like :class:`pluggdapps.web.spooledbody.SpooledBody`.
+        Url-encoded content in a spooled body is read into memory only upto
+        ``max_field_size`` bytes, beyond which
+        :class:`pluggdapps.web.multipart.MultipartError` is raised with
+        status 413.
+
+    ``kwargs``,
+        Limits for multipart content, passed on to
+        :class:`pluggdapps.web.multipart.MultipartParser`.
     """
 
     arguments, multiparts = {}, {}
     if not( content_type and body ) : return arguments, multiparts
 
     if content_type[:2] == ( b"application", b"x-www-form-urlencoded" ) :
+        if not isinstance( body, bytes ) :  # Spooled, read it into memory.
+            from pluggdapps.web.multipart import MultipartError
+            limit = kwargs.get( 'max_field_size', 1048576 )
+            if len( body ) > limit :
+                raise MultipartError(
+                    "Url-encoded form body larger than %s bytes" % limit, 413 )
+            body = b''.join( body )
         for name, values in parse_qs( body ).items() :
             arguments.setdefault( name, [] ).extend( filter( None, values ))
 
     elif content_type[0] == b"multipart" :
-        for headers, value in parse_multipart(content_type, body) :
-            distype, disparams = h.parse_content_disposition(
-                                    headers.get( "content-disposition", None ))
-            disparams = h.multivalue_dict( disparams )
-            name = disparams.get( b'name', [None] )[0]
-
-            if not name : continue
-
-            if b'filename' in disparams :
-                ctype = headers.get( 'content-type', None )
-                ctype = b'/'.join( h.parse_content_type( ctype )[:2] )
-                nvalue = [{ 'filename' : disparams[b'filename'],
-                            'value'     : value,
-                            'content-type' : ctype,
-                            'headers'  : headers }]
-
-            elif isinstance( value, list ) :
-                nvalue = []
-                for headers1, value1 in value :
-                    distype1, disparams1 = \
-                        h.parse_content_disposition(
-                                headers1.get( "content-disposition", None ))
-                    disparams1 = h.multivalue_dict( disparams1 )
-                    ctype = headers1.get( 'content-type', None )
-                    ctype = b'/'.join( h.parse_content_type( ctype )[:2] )
-                    nvalue.append({ 'filename' : disparams1[b'filename'],
-                                    'value' : value1,
-                                    'content-type' : ctype,
-                                    'headers' : headers1 })
-                                
+        def fileof( part ):
+            ctype = part.content_type
+            return { 'filename' : strof( part.filename ),
+                     'value' : part.value,
+                     'content-type' : b'/'.join( ctype[:2] ) if ctype else None,
+                     'headers' : part.headers }
+
+        for part in parse_multipart( content_type, body, **kwargs ) :
+            if not part.name : continue
+
+            if part.isfile() :
+                nvalue = [ fileof( part ) ]
+            elif part.ismultipart() :   # Files submitted as multipart/mixed
+                nvalue = [ fileof( p ) if p.isfile() else p.value
+                           for p in part.value if not p.ismultipart() ]
             else :
-                nvalue = [ value ]
+                nvalue = [ part.value ]
 
-            multiparts.setdefault( name, [] ).extend( nvalue )
+            multiparts.setdefault( part.name, [] ).extend( nvalue )
 
     return arguments, multiparts
 
-def parse_multipart( content_type, data ):
-    """Parses a multipart/form-data (including multipart/mixed) body.
+def parse_multipart( content_type, data, **kwargs ):
+    """Parses a multipart/form-data (including multipart/mixed) body,
+    incrementally, without holding the parts' data in memory.
 
-    `content_type` is parsed using parse_content_type().
-    Returns a list of multipart tuples,
-        [ (Headers, value), ... ]
+    `content_type` is parsed using parse_content_type(). `data` is either a
+    byte-string, an iterable of byte-string chunks, or a
+    :class:`pluggdapps.web.multipart.MultipartParser` already fed with the
+    body. `kwargs` are passed on to the parser. Returns a list of
+    :class:`pluggdapps.web.multipart.Part`.
     """
-    # The standard allows for the boundary to be quoted in the header,
-    # although it's rare (it happens at least for google app engine
-    # xmpp).  I think we're also supposed to handle backslash-escapes
-    # here but I'll save that until we see a client that uses them
-    # in the wild.
-    params = h.multivalue_dict( content_type[2] )
-    boundary = params[b'boundary'][0]
+    from pluggdapps.web.multipart import MultipartParser, newparser
 
-    if boundary.startswith(b'"') and boundary.endswith(b'"'):
-        boundary = boundary[1:-1]
+    if isinstance( data, MultipartParser ) :    # Parsed as it was received.
+        return data.close()
 
-    data = data.rstrip( b'\r\n' )[ :(len(boundary) + 4) ]
-    boundary = b"--" + boundary + b"\r\n"
+    if isinstance( data, bytes ) :  # Fed in pieces, without copying them.
+        view = memoryview( data )
+        data = ( view[ i : i+65536 ] for i in range( 0, len( data ), 65536 ))
 
-    multiparts = []
-    for part in data.split( boundary ) :
-        if not part : continue
-        if not part.endswith( b'\r\n' ) :
-            raise Exception( 'Invalid multipart/form-data' )
-
-        eoh = part.find(b"\r\n\r\n")
-        headers = HTTPHeaders.parse( part[:eoh].decode("utf8") )
-        distype, disparams = h.parse_content_disposition(
-                                    headers.get( "content-disposition", None ))
-
-        disparams = h.multivalue_dict( disparams )
-
-        if distype not in ( b'form-data', b'file' ) : continue
-        content_type1 = parse_content_type( 
-                            headers.get( 'content-type', None ))
-
-        value = part[eoh+4:]
-
-        if content_type1[0] == b'multipart' :
-            value = parse_multipart( content_type1, value )
-        else :
-            value = value[:-2] # Remove CRLF
-        multiparts.append( (headers, value) )
-    return multiparts
+    parser = newparser( content_type, **kwargs )
+    try :
+        [ parser.feed( chunk ) for chunk in data ]
+        return parser.close()
+    except :
+        parser.discard()
+        raise
 
 
 #---- Logic to parse HTTP headers
@@ -482,7 +463,7 @@ def parse_parameters( ls=[] ):
     params = []
     for s in ls :
         try :
-            attr, val = re.match( s, re_param.encode('utf-8') ).groups()
+            attr, val = re.match( re_param.encode('utf-8'), s.strip() ).groups()
             params.append( (attr.lower(), val) )
         except : continue
     return params
@@ -860,10 +841,10 @@ def parse_content_type( value ):
     """
     if value == None : return value
 
-    parts = value.lstrip().split( b';' )
-    typ, subtype = parts[0].split( b'/' )
+    parts = value.strip().split( b';' )
+    typ, subtype = parts[0].strip().split( b'/' )
     params = parse_parameters( parts[1:] ) if parts[1:] else []
-    return typ, subtype, filter( None, params )
+    return typ, subtype, params
 
 #---- additional features
 
@@ -884,8 +865,8 @@ def parse_content_disposition( value ):
     if not value : return value
 
     ps = value.split( b';' )
-    params = parse_parameters( parts[1:] ) if parts[1:] else []
-    return ps[0].lower(), filter( None, params )
+    params = parse_parameters( ps[1:] ) if ps[1:] else []
+    return ps[0].strip().lower(), params
 
 #---- Yet to be cleaned up.
 
@@ -32,7 +32,7 @@ class HTTPCookie( Plugin ):
             cookies.load( cookie )
             return cookies
         except CookieError :
-            self.pa.logwarn( "Unable to parse cookie: %s" % cookie )
+            self.pa.logwarn( "Unable to parse cookie: %s", (cookie,) )
             return None
 
     def set_cookie( self, cookies, name, value, **kwargs ) :
@@ -97,12 +97,12 @@ class HTTPCookie( Plugin ):
         signature_ = signature_.encode( 'utf-8' )
 
         if not self._time_independent_equals( signature, signature_ ):
-            self.pa.logwarn( "Invalid cookie signature %r" % value )
+            self.pa.logwarn( "Invalid cookie signature %r", (value,) )
             return None
 
         timestamp_val = int( timestamp )
         if timestamp_val < (time.time() - self['max_age_seconds']) :
-            self.pa.logwarn( "Expired cookie %r" % value )
+            self.pa.logwarn( "Expired cookie %r", (value,) )
             return None
 
         if timestamp_val > (time.time() + self['max_age_seconds']) :
@@ -111,11 +111,11 @@ class HTTPCookie( Plugin ):
             # digits from the payload to the timestamp without altering the
             # signature.  For backwards compatibility, sanity-check timestamp
             # here instead of modifying _cookie_signature.
-            self.pa.logwarn( "Cookie timestamp in future %r" % value )
+            self.pa.logwarn( "Cookie timestamp in future %r", (value,) )
             return None
 
         if timestamp.startswith( b"0" ) :
-            self.pa.logwarn( "Tampered cookie %r" % value )
+            self.pa.logwarn( "Tampered cookie %r", (value,) )
         try:
             return base64.b64decode( val64 ).decode( 'utf-8' )
         except Exception:
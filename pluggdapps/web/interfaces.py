@@ -205,7 +205,11 @@ class IHTTPRequest( Interface ):
 
     #-- Request handler attribute.
     body = b''
-    """Request body, if present, as a byte string."""
+    """Request body, if present, as a byte string. Body streamed by the
+    connection is a :class:`pluggdapps.web.spooledbody.SpooledBody`,
+    which can be iterated for chunks of body. Streamed multipart body is
+    parsed as it is received, into :attr:`params` and :attr:`files`, and
+    this attribute is left empty."""
 
     chunks = []
     """List of request chunks. Matching view-callable will be called for every
@@ -256,7 +260,11 @@ class IHTTPRequest( Interface ):
 
       { 'filename' : ...,
         'value' : ...,
-        'content-type' : ... }
+        'content-type' : ...,
+        'headers' : ... }
+
+    where ``value`` is a :class:`pluggdapps.web.spooledbody.SpooledBody`,
+    spilled to a temporary file if the file is large.
     """
 
     #---- Framework attributes, initialized by :class:`IWebApp` dorequest() 
@@ -284,6 +292,10 @@ class IHTTPRequest( Interface ):
     view = None
     """A view-callable resolved for this request."""
 
+    viewname = None
+    """Name of the view resolved for this request, as configured with the
+    router."""
+
     resource = None
     """When a view is resolved, along with that an optional resource callable
     might be available. If so this attribute can be one of the following,
@@ -332,6 +344,18 @@ class IHTTPRequest( Interface ):
         about the web application framework. Only processing of request init
         parameters are allowed."""
 
+    def renew( httpconn, method, uri, uriparts, version, headers ):
+        """Re-initialize a pooled request object for a new HTTP request,
+        arguments are same as for :meth:`__init__`. Called only on objects
+        that are reset via :meth:`reset`."""
+
+    def reset():
+        """Called when the request is finished and the object is about to be
+        pooled for re-use, refer to ``pool.requests`` configuration of
+        :class:`pluggdapps.web.webapp.WebApp`. Must drop all references held
+        for the finished request. Once reset, the object shall not be used
+        until it is renewed via :meth:`renew`."""
+
     def supports_http_1_1():
         """Returns True if this request supports HTTP/1.1 semantics"""
 
@@ -370,7 +394,11 @@ class IHTTPRequest( Interface ):
         this specification.
         
         ``body``,
-            Optional kwarg, if request body is present. Passed as byte-string.
+            Optional kwarg, if request body is present. Passed as byte-string,
+            or as :class:`pluggdapps.web.spooledbody.SpooledBody` if the body
+            was streamed, in which case only multipart form data is parsed.
+            Passed as the parser returned by :meth:`multipart` if it was fed
+            with the streamed body.
 
         ``chunk``,
             Optional kwarg, if request is received in chunks. Chunk received
@@ -381,6 +409,21 @@ class IHTTPRequest( Interface ):
             also received.
         """
 
+    def multipart():
+        """Called by :class:`IHTTPConnection` plugin, before a streamed
+        request body is received. Return a
+        :class:`pluggdapps.web.multipart.MultipartParser` to be fed with the
+        body as it is received, or None if the body is not multipart or
+        must be transformed before parsing. Parsed body is passed to
+        :meth:`handle`.
+        """
+
+    def onpart( part ):
+        """Called with :class:`pluggdapps.web.multipart.Part` of a streamed
+        multipart body as soon as its headers are received, before its data.
+        Default implementation does nothing.
+        """
+
     def onfinish():
         """Callback for asyncrhonous finish(). Means the response is sent and
         the request is forgotten. Called by :meth:`IHTTPResponse.onfinish`. It
@@ -487,6 +530,16 @@ class IHTTPResponse( Interface ):
             interface.
         """
 
+    def renew( request ):
+        """Re-initialize a pooled response object for a new ``request``.
+        Called only on objects that are reset via :meth:`reset`."""
+
+    def reset():
+        """Called when the request is finished and the response object is
+        about to be pooled for re-use. Must drop all references held for the
+        finished response. Once reset, the object shall not be used until it
+        is renewed via :meth:`renew`."""
+
     def set_status( code ):
         """Set a response status code. By default it will be 200."""
 
@@ -684,11 +737,12 @@ class IHTTPInBound( Interface ):
 
         ``data``,
             Either request body or chunk data (in case of chunked encoding)
-            in byte-string.
+            in byte-string. Streamed body is transformed chunk by chunk,
+            followed by an empty byte-string with ``finishing`` as True.
 
         ``finishing``,
-            In case of chunked encoding, this denotes whether this is the last
-            chunk to be received.
+            In case of chunked encoding or streamed body, this denotes whether
+            this is the last chunk to be received.
         """
 
 class IHTTPOutBound( Interface ):
@@ -67,6 +67,7 @@ class MatchRouter( Plugin ):
             'content_coding'   : <content-coding as comma separated values>,
             'cache_control'    : <response header value>,
             'rootloc'          : <path to root location for static documents>,
+            'perrequest'       : <boolean, instantiate view for every request>,
           },
           ...
         ]
@@ -182,6 +183,12 @@ class MatchRouter( Plugin ):
             root location where static files are located. Note that when using
             this option, ``pattern`` argument must end with ``*path``.
 
+        ``perrequest``,
+            View and resource callables are resolved once, when the view is
+            added, and re-used for every request. Plugins are instantiated
+            only once. If True, they are resolved for every request, view
+            plugin will be instantiated for every request. Default is False.
+
         ``media_type``, ``language``, ``content_coding`` and ``charset``
         kwargs, if supplied, will be used during content negotiation.
         """
@@ -204,9 +211,15 @@ class MatchRouter( Plugin ):
         view['content_coding'] = kwargs.pop('content_coding',CONTENT_IDENTITY)
         view['language'] = kwargs.pop( 'language', self.webapp['language'] )
         view['charset'] = kwargs.pop( 'charset', self.webapp['encoding'] )
+        view['perrequest'] = kwargs.pop( 'perrequest', False )
         
         # Content Negotiation attributes
         view.update( kwargs )
+
+        # Resolve view and resource callables once.
+        if not view['perrequest'] :
+            view['_view'] = self._resolveview( name, view )
+            view['_resource'] = self._resolveresource( view )
         self.viewlist.append( (name, view) )
 
 
@@ -238,6 +251,8 @@ class MatchRouter( Plugin ):
         """
         resp = request.response
         c = resp.context
+        app, stats = request.webapp.netpath, self.pa.stats
+        t = stats and stats.timer()
 
         # Three phases of request resolution to view-callable
         matches = self._match_url( request, self.viewlist )
@@ -248,6 +263,8 @@ class MatchRouter( Plugin ):
             variant = variants[0]
         else :
             variant = None
+        request.viewname = variant and variant['name']
+        stats and stats.since( app, request.viewname, 'route', t )
 
         if variant :        # If a variant is resolved
             name, viewd, m = variant['name'], variant, variant['_regexmatch']
@@ -259,7 +276,10 @@ class MatchRouter( Plugin ):
 
             # Call IHTTPResource plugin configured for this view callable.
             resource = self._resourceof( request, viewd )
-            resource( request, c ) if resource else None
+            if resource :
+                t = stats and stats.timer()
+                resource( request, c )
+                stats and stats.since( app, name, 'resource', t )
 
             # If etag is available, compute and subsequently clear them.
             etag = c.etag.hashout( prefix='res-' )
@@ -277,7 +297,9 @@ class MatchRouter( Plugin ):
 
         if callable( request.view ) :   # Call the view-callable
             c['h'] = h
+            t = stats and stats.timer()
             request.view( request, c )
+            stats and stats.since( app, request.viewname, 'view', t )
 
     def urlpath( self, request, name, **matchdict ):
         """:meth:`pluggdapps.web.interfaces.IHTTPRouter.route` interface
@@ -317,9 +339,25 @@ class MatchRouter( Plugin ):
     #-- Local methods.
 
     def _viewof( self, request, name, viewd ):
-        """For resolved view ``viewd``, fetch the view-callable."""
+        """For resolved view ``viewd``, fetch the view-callable. Unless
+        ``perrequest`` is configured, it is already resolved by
+        :meth:`add_view`."""
+        if viewd['perrequest'] :
+            return self._resolveview( name, viewd )
+        return viewd['_view']
+
+    def _resourceof( self, request, viewd ):
+        """For resolved view ``viewd``, fetch the resource-callable. Unless
+        ``perrequest`` is configured, it is already resolved by
+        :meth:`add_view`."""
+        if viewd['perrequest'] :
+            return self._resolveresource( viewd )
+        return viewd['_resource']
+
+    def _resolveview( self, name, viewd ):
+        """Resolve view-callable configured for view ``name``."""
         v = viewd['view']
-        self.pa.logdebug( "%r view callable: %r " % (request.uri, v) )
+        self.pa.logdebug( "%r view callable: %r ", (name, v) )
         if isinstance(v, str) and isplugin(v) :
             view = self.qp( IHTTPView, v, name, viewd )
         elif isinstance( v, str ):
@@ -328,10 +366,10 @@ class MatchRouter( Plugin ):
             view = v
         return getattr( view, viewd['attr'] ) if viewd['attr'] else view
 
-    def _resourceof( self, request, viewd ):
-        """For resolved view ``viewd``, fetch the resource-callable."""
+    def _resolveresource( self, viewd ):
+        """Resolve resource-callable configured for view ``viewd``."""
         res = viewd['resource']
-        self.pa.logdebug( "%r resource callable: %r " % (request.uri, res) )
+        self.pa.logdebug( "%r resource callable: %r ", (viewd['name'], res) )
         if isinstance( res, str ) and isplugin( res ) :
             return self.qp( IHTTPResource, res )
         elif isinstance( res, str ) :
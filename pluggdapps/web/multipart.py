@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+
+# This file is subject to the terms and conditions defined in
+# file 'LICENSE', which is part of this source code package.
+#       Copyright (c) 2011 R Pratap Chakravarthy
+
+"""Incremental parser for ``multipart/form-data`` request body. The parser
+is a state machine fed with chunks of body as they are available, it does
+not need the entire body in memory.
+
+Headers of a part are parsed as soon as they are received, before its data.
+Data of file parts is written to :class:`SpooledBody`, which is spilled to a
+temporary file beyond a spool size, while form fields are collected in
+memory upto a limit. Memory used by the parser, apart from the spool, is
+bounded by the size of chunks fed to it.
+"""
+
+import pluggdapps.utils          as h
+from   pluggdapps.web.readbuffer  import ReadBuffer
+from   pluggdapps.web.spooledbody import SpooledBody
+
+__all__ = [ 'MultipartParser', 'MultipartError', 'Part', 'newparser' ]
+
+MAX_HEADER_SIZE = 16 * 1024
+"""Maximum size of headers for a part."""
+
+class MultipartError( Exception ):
+    """Raised for malformed multipart body or when it, or a spooled
+    url-encoded form body, exceeds a limit.
+    ``status`` is the HTTP status code to respond with, 400 for malformed
+    body and 413 for a body larger than the configured limits."""
+
+    def __init__( self, message, status=400 ):
+        super().__init__( message )
+        self.status = status
+
+class Part( object ):
+    """A part of multipart body. ``headers`` are parsed into a dictionary of
+    lower-cased header names, with hyphens replaced by underscores, and
+    byte-string values. ``value`` is a byte-string for form fields,
+    :class:`SpooledBody` for files and list of :class:`Part` for nested
+    multipart content, like ``multipart/mixed``."""
+
+    __slots__ = [ 'headers', 'name', 'filename', 'content_type', 'value',
+                  'size' ]
+
+    def __init__( self, headers ):
+        self.headers = headers
+        distype, disparams = h.parse_content_disposition(
+                                headers.get( 'content_disposition', None )
+                             ) or ( None, [] )
+        disparams = h.multivalue_dict( disparams )
+        name = disparams.get( b'name', [None] )[0]
+        filename = disparams.get( b'filename', [None] )[0]
+        self.name = name and unquote( name )
+        self.filename = filename and unquote( filename )
+        self.content_type = h.parse_content_type(
+                                headers.get( 'content_type', None ))
+        self.value = None
+        self.size = 0
+
+    def ismultipart( self ):
+        """Whether part's content is nested multipart."""
+        return bool( self.content_type ) and \
+               self.content_type[0].lower() == b'multipart'
+
+    def isfile( self ):
+        """Whether part is a file upload."""
+        return self.filename is not None
+
+
+class MultipartParser( object ):
+    """Parse multipart body delimited by ``boundary``, fed incrementally
+    using :meth:`feed`. Parsed parts are available in :attr:`parts`.
+
+    ``spool_size``,
+        Data of file parts is kept in memory till this size, after which
+        it is spilled to a temporary file.
+
+    ``max_part_size``,
+        Maximum size of data in a part. Larger parts fail the parse.
+
+    ``max_field_size``,
+        Maximum size of a form field, which is kept in memory.
+
+    ``onpart``,
+        Optional callable, called with :class:`Part` as soon as its headers
+        are parsed and before its data is received.
+
+    :class:`MultipartError` raised by :meth:`feed` is remembered and raised
+    again by :meth:`close`, data fed after the error is discarded.
+    """
+
+    __slots__ = [ 'delimiter', 'state', 'buf', 'part', 'parts', 'nested',
+                  'spool_size', 'max_part_size', 'max_field_size', 'onpart',
+                  'error' ]
+
+    def __init__( self, boundary, spool_size=1048576,
+                  max_part_size=104857600, max_field_size=1048576,
+                  onpart=None ):
+        self.delimiter = b'\r\n--' + boundary
+        self.state = 'preamble' # Name of the parser's state method.
+        self.buf = ReadBuffer()
+        self.buf.extend( b'\r\n' )  # First delimiter is not preceded by CRLF
+        self.part = None        # Part whose data is being received.
+        self.parts = []         # Parts received so far.
+        self.nested = None      # Parser for nested multipart part.
+        self.spool_size = spool_size
+        self.max_part_size = max_part_size
+        self.max_field_size = max_field_size
+        self.onpart = onpart
+        self.error = None       # MultipartError that failed the parse.
+
+    def feed( self, data ):
+        """Parse next chunk of multipart body ``data``."""
+        if self.state is None : return  # Epilogue is discarded.
+        self.buf.extend( data )
+        try :
+            while self.state and getattr( self, self.state )() : pass
+        except MultipartError as e :
+            self.state, self.error = None, e
+            self.buf.skip( len( self.buf ))
+            self.discard()
+            raise
+
+    def close( self ):
+        """Multipart body is over, return the list of parts. Raises
+        :class:`MultipartError` if the body was incomplete or invalid."""
+        if self.error is not None :
+            raise self.error
+        if self.state is not None :
+            self.discard()
+            raise MultipartError( "Incomplete multipart body" )
+        return self.parts
+
+    def discard( self ):
+        """Release spooled files of parts parsed so far."""
+        self.nested and self.nested.discard()
+        for part in self.parts :
+            if isinstance( part.value, SpooledBody ) :
+                part.value.close()
+            elif isinstance( part.value, list ) :
+                [ p.value.close() for p in part.value
+                  if isinstance( p.value, SpooledBody ) ]
+
+    #---- States, return True if state can make more progress.
+
+    def preamble( self ):
+        """Discard data before the first delimiter."""
+        buf = self.buf
+        loc = buf.find( self.delimiter )
+        if loc == -1 :  # Retain what might be the start of delimiter.
+            buf.skip( max( 0, len( buf ) - len( self.delimiter ) + 1 ))
+            return False
+        buf.skip( loc + len( self.delimiter ))
+        self.state = 'boundary'
+        return True
+
+    def boundary( self ):
+        """Delimiter is followed by ``--`` for the last part, otherwise by
+        optional white-space and CRLF."""
+        buf = self.buf
+        if len( buf ) < 2 : return False
+        with buf.view( 2 ) as view :
+            closing = view == b'--'
+        if closing :
+            buf.skip( 2 )
+            self.state = 'epilogue'
+            return True
+        loc = buf.find( b'\r\n' )
+        if loc == -1 :
+            if len( buf ) > MAX_HEADER_SIZE :
+                raise MultipartError( "Invalid multipart boundary" )
+            return False
+        if buf.consume( loc ).strip( b' \t' ) :
+            raise MultipartError( "Invalid multipart boundary" )
+        buf.skip( 2 )
+        self.state = 'headers'
+        return True
+
+    def headers( self ):
+        """Parse part headers, terminated by an empty line."""
+        buf = self.buf
+        if len( buf ) < 2 : return False
+        with buf.view( 2 ) as view :
+            empty = view == b'\r\n'
+        if empty :
+            hdrdata = b''
+            buf.skip( 2 )
+        else :
+            loc = buf.find( b'\r\n\r\n' )
+            if loc == -1 :
+                if len( buf ) > MAX_HEADER_SIZE :
+                    raise MultipartError( "Multipart headers too large", 413 )
+                return False
+            hdrdata = buf.consume( loc )
+            buf.skip( 4 )
+        self.startpart( parse_headers( hdrdata ))
+        self.state = 'body'
+        return True
+
+    def body( self ):
+        """Receive part data till the next delimiter."""
+        buf, delimiter = self.buf, self.delimiter
+        loc = buf.find( delimiter )
+        if loc == -1 :  # Retain what might be the start of delimiter.
+            self.write( len( buf ) - len( delimiter ) + 1 )
+            return False
+        self.write( loc )
+        buf.skip( len( delimiter ))
+        self.endpart()
+        self.state = 'boundary'
+        return True
+
+    def epilogue( self ):
+        """Discard data after the last delimiter."""
+        self.buf.skip( len( self.buf ))
+        self.state = None
+        return False
+
+    #---- Local functions
+
+    def startpart( self, headers ):
+        part = self.part = Part( headers )
+        if part.ismultipart() :
+            params = h.multivalue_dict( part.content_type[2] )
+            boundary = unquote( params.get( b'boundary', [b''] )[0] )
+            if not boundary :
+                raise MultipartError( "Nested multipart without boundary" )
+            self.nested = MultipartParser(
+                    boundary, spool_size=self.spool_size,
+                    max_part_size=self.max_part_size,
+                    max_field_size=self.max_field_size, onpart=self.onpart )
+        elif part.isfile() :
+            part.value = SpooledBody( self.spool_size )
+        else :
+            part.value = bytearray()
+        self.parts.append( part )
+        self.onpart and self.onpart( part )
+
+    def write( self, nbytes ):
+        """Write ``nbytes`` from the front of buffer to on-going part."""
+        if nbytes <= 0 : return
+        part = self.part
+        field = isinstance( part.value, bytearray )
+        part.size += nbytes
+        if part.size > (self.max_field_size if field else self.max_part_size):
+            raise MultipartError( "Multipart part %r too large" % part.name,
+                                  413 )
+        with self.buf.view( nbytes ) as view :
+            if self.nested :
+                self.nested.feed( view )
+            elif field :
+                part.value.extend( view )
+            else :
+                part.value.write( view )
+        self.buf.skip( nbytes )
+
+    def endpart( self ):
+        part, self.part = self.part, None
+        if self.nested :
+            nested, self.nested = self.nested, None
+            part.value = nested.close()
+        elif isinstance( part.value, SpooledBody ) :
+            part.value.finish()
+        else :
+            part.value = bytes( part.value )
+
+
+def newparser( content_type, **kwargs ):
+    """Return a :class:`MultipartParser` for body of ``content_type``, as
+    returned by :func:`pluggdapps.utils.parsehttp.parse_content_type`.
+    ``kwargs`` are passed on to the parser."""
+    params = h.multivalue_dict( content_type[2] )
+    boundary = unquote( params.get( b'boundary', [b''] )[0] )
+    if not boundary :
+        raise MultipartError( 'Invalid multipart/form-data, no boundary' )
+    return MultipartParser( boundary, **kwargs )
+
+def parse_headers( hdrdata ):
+    """Parse headers of a part into a dictionary."""
+    headers, name = {}, None
+    for line in hdrdata.split( b'\r\n' ) :
+        if line[:1] in ( b' ', b'\t' ) and name : # Folded header
+            headers[ name ] += b' ' + line.strip()
+            continue
+        name, _, value = line.partition( b':' )
+        name = name.strip().lower().replace( b'-', b'_' ).decode( 'latin1' )
+        headers[ name ] = value.strip()
+    return headers
+
+def unquote( value ):
+    """Remove quotes around a parameter ``value``."""
+    value = value.strip()
+    if len( value ) > 1 and value[:1] == value[-1:] == b'"' :
+        value = value[1:-1].replace( b'\\"', b'"' ).replace( b'\\\\', b'\\' )
+    return value
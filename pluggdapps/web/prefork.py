@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+
+# This file is subject to the terms and conditions defined in
+# file 'LICENSE', which is part of this source code package.
+#       Copyright (c) 2011 R Pratap Chakravarthy
+
+"""Pre-fork multi-process mode for
+:class:`pluggdapps.web.server.HTTPEPollServer`. Listening sockets are bound
+by the parent process, which then forks ``workers`` number of children. Each
+worker runs its own event loop and accepts connections from the shared
+listening sockets. The parent process does not serve requests, it
+supervises the workers,
+
+* Workers that exit or crash are restarted with exponential backoff, so
+  that a worker crashing during startup does not fork in a tight loop.
+* On SIGHUP, settings are reloaded from modified configuration files, refer
+  to :meth:`pluggdapps.platform.Pluggdapps.reload`, and workers are
+  restarted one after the other. A new worker is forked before the old one
+  is asked to stop, the old worker stops accepting connections and exits
+  after finishing on-going requests.
+* On SIGTERM and SIGINT, all workers are stopped gracefully and the parent
+  exits.
+
+Each worker opens its own connection to configuration database, connections
+are not shared across ``fork()``. Request statistics, refer to
+:mod:`pluggdapps.stats`, are collected by each worker separately.
+
+Workers can optionally be pinned to a CPU, worker ``n`` is pinned to CPU
+``n % cpu_count``. With ``reuseport`` listener, parent process does not bind
+any socket, each worker binds its own ``SO_REUSEPORT`` socket when it starts.
+"""
+
+import os, signal, time
+
+from   pluggdapps.log   import closeall
+import pluggdapps.utils as h
+
+__all__ = [ 'Supervisor' ]
+
+class Supervisor( object ):
+    """Supervise ``workers`` number of worker processes serving connections
+    on listening ``sockets`` for ``server``, a
+    :class:`pluggdapps.web.server.HTTPEPollServer` plugin."""
+
+    tick = 0.1
+    """Seconds between supervising rounds."""
+
+    def __init__( self, server, workers, sockets ):
+        self.server = server
+        self.sockets = sockets
+        self.count = workers
+        self.slots = [ None ] * workers     # slot -> pid of serving worker
+        self.crashes = [ 0 ] * workers      # slot -> consecutive crashes
+        self.restartat = [ 0 ] * workers    # slot -> time to fork again
+        self.startedat = {}                 # pid -> time when forked
+        self.retiring = {}                  # pid -> deadline to kill
+        self.rolling = []                   # slots to restart, on SIGHUP
+        self.stopping = False
+        self.restarting = False
+        self.signalled = None               # Signal that stopped supervisor
+
+    def start( self ):
+        """Fork workers and supervise them until :meth:`stop` is called.
+        Must be called from the main thread."""
+        signal.signal( signal.SIGHUP, lambda *args : self.restart() )
+        signal.signal( signal.SIGTERM, lambda signum, _ : self.stop( signum ))
+        signal.signal( signal.SIGINT, lambda signum, _ : self.stop( signum ))
+
+        self.server.pa.loginfo( "Starting %s workers ...", (self.count,) )
+        while not self.stopping :
+            self.reap()
+            now = time.time()
+            if self.restarting :
+                self.restarting = False
+                self.reload()
+                self.rolling = list( range( self.count ))
+            for slot, pid in enumerate( self.slots ) :
+                if pid is None and now >= self.restartat[slot] :
+                    self.spawn( slot )
+            self.roll( now )
+            time.sleep( self.tick )
+        self.shutdown()
+
+    def stop( self, signum=None ):
+        """Stop all workers and return from :meth:`start`. Thread safe.
+        ``signum`` is the signal, SIGTERM or SIGINT, that asked to stop,
+        available as :attr:`signalled`."""
+        self.signalled = signum
+        self.stopping = True
+
+    def restart( self ):
+        """Reload settings and do a rolling restart of workers. Thread
+        safe."""
+        self.restarting = True
+
+    #---- Local functions
+
+    def spawn( self, slot ):
+        """Fork a new worker for ``slot``."""
+        pid = os.fork()
+        if pid == 0 :
+            code = 0
+            try :
+                self.runworker( slot )
+            except BaseException :
+                self.server.pa.logerror( h.print_exc() )
+                code = 1
+            finally :
+                closeall()
+                os._exit( code )
+
+        self.slots[slot] = pid
+        self.startedat[pid] = time.time()
+        self.server.pa.loginfo( "Forked worker %s, pid %s", (slot, pid) )
+
+    def runworker( self, slot ):
+        """Serve connections in worker process, until the worker is
+        stopped."""
+        server = self.server
+        signal.signal( signal.SIGHUP, signal.SIG_IGN )
+        signal.signal( signal.SIGINT, signal.SIG_IGN )
+        signal.signal( signal.SIGTERM,
+                       lambda *args : server.ioloop.add_callback(
+                                    lambda : server.drain(
+                                        server['worker.graceful_timeout'] )))
+        if server['worker.affinity'] and hasattr( os, 'sched_setaffinity' ) :
+            os.sched_setaffinity( 0, { slot % h.cpu_count() } )
+        h.reseed_random()
+        # Database connection opened by the parent cannot be used after fork.
+        configdb = server.pa.configdb
+        if configdb :
+            configdb.close()
+            configdb.connect()
+        server.supervisor = None
+        server.renewioloop()
+        if server['listener'] == 'reuseport' :
+            server.serve( server.bind_sockets( reuseport=True ))
+        else :
+            server.serve( self.sockets )
+
+    def reap( self ):
+        """Collect exited workers and schedule them to be restarted."""
+        while True :
+            try :
+                pid, status = os.waitpid( -1, os.WNOHANG )
+            except ChildProcessError :
+                return
+            if pid == 0 : return
+
+            if self.retiring.pop( pid, None ) is not None : continue
+            if pid not in self.slots : continue
+
+            slot = self.slots.index( pid )
+            self.slots[slot] = None
+            uptime = time.time() - self.startedat.pop( pid )
+            if self.stopping : continue
+
+            # Worker that was serving long enough is not considered as
+            # crashing repeatedly.
+            backoff, maxbackoff = self.server['worker.backoff'], \
+                                  self.server['worker.backoff_max']
+            if uptime > maxbackoff :
+                self.crashes[slot] = 0
+            delay = min( maxbackoff, backoff * (2 ** self.crashes[slot]) )
+            self.crashes[slot] += 1
+            self.restartat[slot] = time.time() + delay
+            self.server.pa.logerror(
+                "Worker %s, pid %s, exited with status %s, restarting in "
+                "%.1f seconds", (slot, pid, status, delay) )
+
+    def roll( self, now ):
+        """Restart workers in ``rolling`` one after the other. Old worker is
+        asked to stop after a new worker is forked for its slot."""
+        if self.retiring :  # Wait for the old worker to exit.
+            for pid, deadline in list( self.retiring.items() ) :
+                if now > deadline : self.kill( pid, signal.SIGKILL )
+            return
+
+        if self.rolling :
+            slot = self.rolling.pop( 0 )
+            old = self.slots[slot]
+            self.spawn( slot )
+            if old is not None :
+                self.startedat.pop( old, None )
+                self.retire( old )
+
+    def retire( self, pid ):
+        """Ask worker ``pid`` to stop gracefully."""
+        timeout = self.server['worker.graceful_timeout']
+        self.retiring[pid] = time.time() + timeout + 1
+        self.kill( pid, signal.SIGTERM )
+
+    def reload( self ):
+        """Reload settings from modified configuration files, forked workers
+        will inherit the new settings."""
+        try :
+            for netpath, sections in self.server.pa.reload() :
+                self.server.pa.loginfo(
+                        "Reloaded %r settings %r", (netpath, sections) )
+        except Exception :
+            self.server.pa.logerror( h.print_exc() )
+
+    def shutdown( self ):
+        """Stop all workers gracefully, kill them if they do not exit within
+        graceful timeout."""
+        self.server.pa.loginfo( "Stopping workers ..." )
+        self.rolling = []
+        [ self.retire( pid ) for pid in self.slots if pid is not None ]
+        self.slots = [ None ] * self.count
+        while self.retiring :
+            self.reap()
+            self.roll( time.time() )
+            time.sleep( self.tick )
+        [ sock.close() for sock in self.sockets ]
+
+    def kill( self, pid, sig ):
+        try :
+            os.kill( pid, sig )
+        except ProcessLookupError :
+            self.retiring.pop( pid, None )
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+
+# This file is subject to the terms and conditions defined in
+# file 'LICENSE', which is part of this source code package.
+#       Copyright (c) 2011 R Pratap Chakravarthy
+
+"""Read buffer for non-blocking sockets. Data is received directly into a
+growable ``bytearray`` using ``recv_into()``, searched in place and consumed
+by advancing an offset, so that bytes read from the socket are copied only
+once, when they are handed over to the consumer.
+
+Consumed space at the front of the buffer is reclaimed lazily, by moving the
+unconsumed data to the front when there is no room left at the end, and the
+buffer doubles in size when the data does not fit even after that. Data
+is kept contiguous, so that delimiters and regular expressions can be
+searched without joining chunks.
+
+Large pieces of data of known size, like request body, are better received
+with ``recv()`` as separate chunks and joined once when consumed. Growing
+the bytearray to hold them costs more than the join, since the grown
+memory is zero-filled and the consumer is handed a copy anyway.
+"""
+
+__all__ = [ 'ReadBuffer' ]
+
+class ReadBuffer( object ):
+    """Buffer of bytes read from a socket, unconsumed data is between
+    offsets ``start`` and ``end`` of ``buf``."""
+
+    __slots__ = [ 'buf', 'start', 'end', 'scanned', 'delimiter', 'chunks',
+                  'chunked' ]
+
+    def __init__( self, size=4096 ):
+        self.buf = bytearray( size )
+        self.start = 0
+        self.end = 0
+        # Offset till which delimiter was last searched, and the delimiter.
+        self.scanned, self.delimiter = 0, None
+        self.chunks = []    # Chunks received by recv(), following buf.
+        self.chunked = 0    # Size of data in chunks.
+
+    def __len__( self ):
+        return self.end - self.start + self.chunked
+
+    def recv_into( self, sock, nbytes ):
+        """Receive upto ``nbytes`` from ``sock`` into the buffer and return
+        the number of bytes received. Exceptions from ``sock.recv_into()``
+        are propagated."""
+        if self.chunks :    # Data must follow the chunks received so far.
+            return self.recv( sock, nbytes )
+        self.reserve( nbytes )
+        with memoryview( self.buf ) as view :
+            n = sock.recv_into( view[ self.end : self.end + nbytes ], nbytes )
+        self.end += n
+        return n
+
+    def recv( self, sock, nbytes ):
+        """Receive upto ``nbytes`` from ``sock`` as a separate chunk and
+        return the number of bytes received. Exceptions from ``sock.recv()``
+        are propagated."""
+        data = sock.recv( nbytes )
+        if data :
+            self.chunks.append( data )
+            self.chunked += len( data )
+        return len( data )
+
+    def extend( self, data ):
+        """Append ``data`` to the buffer."""
+        if self.chunks :
+            self.chunks.append( bytes( data ))
+            self.chunked += len( data )
+            return
+        n = len( data )
+        self.reserve( n )
+        self.buf[ self.end : self.end + n ] = data
+        self.end += n
+
+    def find( self, delimiter ):
+        """Return the offset of ``delimiter`` in unconsumed data, or -1. A
+        subsequent call for the same delimiter resumes the search from where
+        this one stopped, till data is consumed."""
+        self.chunks and self.fold()
+        if delimiter != self.delimiter :   # Search afresh.
+            self.delimiter, self.scanned = delimiter, self.start
+        pos = max( self.start, self.scanned - len( delimiter ) + 1 )
+        loc = self.buf.find( delimiter, pos, self.end )
+        if loc == -1 :
+            self.scanned = self.end
+            return -1
+        return loc - self.start
+
+    def search( self, regex ):
+        """Return the offset just after the match for compiled ``regex`` in
+        unconsumed data, or -1."""
+        self.chunks and self.fold()
+        m = regex.search( self.buf, self.start, self.end )
+        return -1 if m is None else m.end() - self.start
+
+    def consume( self, nbytes ):
+        """Remove ``nbytes`` from the front of the buffer and return them as
+        bytes."""
+        if self.chunks :
+            return self.join( nbytes )
+        # Contiguous data is small, large data is received as chunks, hence
+        # slicing is cheaper than a memoryview.
+        data = bytes( self.buf[ self.start : self.start + nbytes ] )
+        self.skip( nbytes )
+        return data
+
+    def view( self, nbytes ):
+        """Return a memoryview of ``nbytes`` from the front of the buffer,
+        without consuming them. Buffer cannot be resized while the view is
+        held, release the view and call :meth:`skip` when done."""
+        self.chunks and self.fold()
+        with memoryview( self.buf ) as view :
+            return view[ self.start : self.start + nbytes ]
+
+    def skip( self, nbytes ):
+        """Remove ``nbytes`` from the front of the buffer."""
+        self.start += nbytes
+        self.scanned = self.start
+        if self.start == self.end :
+            self.start = self.end = self.scanned = 0
+
+    #---- Local functions
+
+    def fold( self ):
+        """Move received chunks into the contiguous buffer."""
+        chunks, self.chunks, self.chunked = self.chunks, [], 0
+        [ self.extend( data ) for data in chunks ]
+
+    def join( self, nbytes ):
+        """Consume ``nbytes`` from contiguous data and chunks, with a single
+        join when they are consumed entirely."""
+        chunks, self.chunks, self.chunked = self.chunks, [], 0
+        if self.start == self.end and len( chunks ) == 1 :
+            data = chunks[0]
+        else :
+            with memoryview( self.buf ) as view :
+                data = b''.join([ view[ self.start : self.end ] ] + chunks )
+        self.start = self.end = self.scanned = 0
+        if len( data ) > nbytes :
+            self.extend( data[ nbytes: ] )
+            data = data[ :nbytes ]
+        return data
+
+    def reserve( self, nbytes ):
+        """Make room for ``nbytes`` at the end of the buffer."""
+        if len( self.buf ) - self.end >= nbytes : return
+
+        size = self.end - self.start
+        if self.start :     # Move unconsumed data to the front.
+            with memoryview( self.buf ) as view :
+                view[ : size ] = view[ self.start : self.end ]
+            self.scanned -= self.start
+            self.start, self.end = 0, size
+
+        if len( self.buf ) - self.end < nbytes :
+            grow = max( len( self.buf ), size + nbytes - len( self.buf ))
+            self.buf.extend( bytes( grow ))
@@ -9,6 +9,8 @@ import time
 import pluggdapps.utils          as h
 from   pluggdapps.plugin         import Plugin, implements
 from   pluggdapps.web.interfaces import IHTTPRequest
+from   pluggdapps.web.spooledbody import SpooledBody
+from   pluggdapps.web.multipart  import MultipartParser, newparser
 
 # TODO : Product token, header field `Server` to be automatically added in
 # response.
@@ -21,13 +23,33 @@ class HTTPRequest( Plugin ):
 
     implements( IHTTPRequest )
 
-    content_type = ''
-    """Parsed content type as return from :meth:`parse_content_type`."""
+    # Request attributes are kept in slots, plugin attributes and attributes
+    # added by routers and views continue to live in instance dictionary.
+    __slots__ = [
+        'httpconn', 'method', 'uri', 'uriparts', 'version', 'headers', 'body',
+        'chunks', 'trailers', 'cookies', 'getparams', 'postparams',
+        'multiparts', 'files', 'params', 'router', 'cookie', 'response',
+        'session', 'view', 'viewname', 'receivedat', 'finishedat',
+        'content_type',     # Parsed content type as returned by
+                            # :meth:`parse_content_type`.
+    ]
 
     # IHTTPRequest interface methods and attributes
     def __init__( self, httpconn, method, uri, uriparts, version, headers ):
         """:meth:`pluggdapps.web.interfaces.IHTTPRequest.__init__` interface
         method."""
+        self.chunks = []
+        self.trailers = {}
+        self.cookies = {}
+        self.postparams = {}
+        self.multiparts = {}
+        self.files = {}
+        self.params = {}
+        self.renew( httpconn, method, uri, uriparts, version, headers )
+
+    def renew( self, httpconn, method, uri, uriparts, version, headers ):
+        """:meth:`pluggdapps.web.interfaces.IHTTPRequest.renew` interface
+        method."""
         self.router = self.cookie = None
         self.response = self.session = None
 
@@ -37,19 +59,11 @@ class HTTPRequest( Plugin ):
         self.headers = headers
 
         # Initialize request handler attributes, these attributes will be
-        # valid only after a call to handle() method.
+        # valid only after a call to handle() method. Containers are
+        # initialized by __init__() or cleared by reset().
         self.body = b''
-        self.chunks = []
-        self.trailers = {}
-        self.cookies = {}
-
-        # Only in case of POST and PUT method.
-        self.postparams = {}
-        self.multiparts = {}
-        self.files = {}
 
         # Initialize
-        self.params = {}
         self.getparams = { h.strof(k) : list( map( h.strof, vs )) 
                            for k,vs in self.uriparts['query'].items() }
         self.params.update( self.getparams )
@@ -57,10 +71,27 @@ class HTTPRequest( Plugin ):
         self.content_type = \
                 h.parse_content_type( headers.get( 'content_type', None ))
 
-        self.view = None
+        self.view = self.viewname = None
         self.receivedat = time.time()
         self.finishedat = None
 
+    def reset( self ):
+        """:meth:`pluggdapps.web.interfaces.IHTTPRequest.reset` interface
+        method."""
+        self.router = self.cookie = self.response = self.session = None
+        self.httpconn = self.uriparts = self.headers = self.view = None
+        # Spooled body and uploaded files are closed by WebApp.recycle().
+        self.body = b''
+        self.getparams = None
+        self.chunks.clear()
+        self.cookies.clear()
+        self.trailers.clear()
+        self.postparams.clear()
+        self.multiparts.clear()
+        self.files.clear()
+        self.params.clear()
+        self._settngx.overlay = None
+
     def supports_http_1_1( self ):
         """:meth:`pluggdapps.web.interfaces.IHTTPRequest.supports_http_1_1`
         interface method."""
@@ -98,36 +129,81 @@ class HTTPRequest( Plugin ):
     def handle( self, body=None, chunk=None, trailers=None ):
         """:meth:`pluggdapps.web.interfaces.IHTTPRequest.handle`
         interface method."""
-        self.cookies = self.cookie.parse_cookies( self.headers )
-
-        # In case of `chunked` encoding, check whether this is the last chunk.
-        finishing = body or ( chunk and trailers and chunk[0] == 0)
-
-        # Apply IHTTPInBound transformers on this request.
-        data = body if body != None else (chunk[2] if chunk else b'')
-        for tr in self.webapp.in_transformers :
-            data = tr.transform( self, data, finishing=finishing )
-
-        # Update the request plugin with attributes.
-        if body :
-            self.body = data
-        elif chunk :
-            self.chunks.append( (chunk[0], chunk[1], data) )
-        self.trailers = trailers or self.trailers
-
-        # Process POST and PUT request interpreting multipart content.
+        # Containers are re-used across requests, refer to reset().
+        self.cookies.update( self.cookie.parse_cookies( self.headers ) or {} )
+
+        # Multipart body was parsed as it was streamed, by the parser
+        # returned from multipart().
+        if isinstance( body, MultipartParser ) :
+            self.body, formbody = b'', body
+
+        # Streamed body is transformed chunk by chunk, without reading it
+        # into memory. Only multipart content in it is parsed, incrementally.
+        elif isinstance( body, SpooledBody ) :
+            transformers = self.webapp.in_transformers
+            def transform( data, finishing ):
+                for tr in transformers :
+                    data = tr.transform( self, data, finishing=finishing )
+                return data
+            self.body = body.transform( transform ) if transformers else body
+            formbody = self.body
+
+        else :
+            # In case of `chunked` encoding, check whether this is the last
+            # chunk.
+            finishing = body or ( chunk and trailers and chunk[0] == 0)
+
+            # Apply IHTTPInBound transformers on this request.
+            data = body if body != None else (chunk[2] if chunk else b'')
+            for tr in self.webapp.in_transformers :
+                data = tr.transform( self, data, finishing=finishing )
+
+            # Update the request plugin with attributes.
+            if body :
+                self.body = data
+            elif chunk :
+                self.chunks.append( (chunk[0], chunk[1], data) )
+            trailers and self.trailers.update( trailers )
+            formbody = self.body
+
+        # Process POST and PUT request interpreting multipart content. File
+        # uploads are spooled to temporary files beyond a size.
         if self.method in ( b'POST', b'PUT' ) :
-            self.postparams, self.multiparts = \
-                    h.parse_formbody( self.content_type, self.body )
+            self.postparams, self.multiparts = h.parse_formbody(
+                    self.content_type, formbody,
+                    spool_size=self['multipart.spool_size'],
+                    max_part_size=self['multipart.max_part_size'],
+                    max_field_size=self['multipart.max_field_size'] )
             self.postparams = { h.strof(k) : list( map( h.strof, vs )) 
                                 for k,vs in self.postparams.items() }
             [ self.params.setdefault( name, [] ).extend( value )
               for name, value in self.postparams.items() ]
-            [ self.params.setdefault( name, [] ).extend( value )
-              for name, value in self.multiparts.items() ]
-            [ self.files.setdefault( name, [] 
-                                   ).extend( (f['filename'], f['value'] ) )
-              for name, value in self.multiparts.items() ]
+            for name, values in self.multiparts.items() :
+                name = h.strof( name )
+                for value in values :
+                    if isinstance( value, dict ) :
+                        self.files.setdefault( name, [] ).append( value )
+                    else :
+                        self.params.setdefault( name, [] ).append(
+                                h.strof( value ))
+
+    def multipart( self ):
+        """:meth:`pluggdapps.web.interfaces.IHTTPRequest.multipart`
+        interface method."""
+        ctype = self.content_type
+        if ( self.method not in ( b'POST', b'PUT' ) or not ctype or
+             ctype[0] != b'multipart' or self.webapp.in_transformers ) :
+            return None
+        return newparser(
+                ctype, spool_size=self['multipart.spool_size'],
+                max_part_size=self['multipart.max_part_size'],
+                max_field_size=self['multipart.max_field_size'],
+                onpart=self.onpart )
+
+    def onpart( self, part ):
+        """:meth:`pluggdapps.web.interfaces.IHTTPRequest.onpart`
+        interface method."""
+        pass
 
     def onfinish( self ):
         """:meth:`pluggdapps.web.interfaces.IHTTPRequest.onfinish`
@@ -168,6 +244,43 @@ class HTTPRequest( Plugin ):
         """
         return _default_settings
 
+    @classmethod
+    def normalize_settings( cls, sett ):
+        """:meth:`pluggdapps.plugin.ISettings.normalize_settings` interface
+        method.
+        """
+        ds = _default_settings
+        sett['multipart.spool_size'] = \
+                h.asint( sett['multipart.spool_size'],
+                         ds['multipart.spool_size'] )
+        sett['multipart.max_part_size'] = \
+                h.asint( sett['multipart.max_part_size'],
+                         ds['multipart.max_part_size'] )
+        sett['multipart.max_field_size'] = \
+                h.asint( sett['multipart.max_field_size'],
+                         ds['multipart.max_field_size'] )
+        return sett
+
 _default_settings = h.ConfigDict()
 _default_settings.__doc__ = (
     "Plugin encapsulates HTTP request." )
+
+_default_settings['multipart.spool_size'] = {
+    'default' : 1048576,    # 1MB
+    'types'   : (int,),
+    'help'    : "File uploaded in multipart request body is kept in memory "
+                "till this size, in bytes, after which it is spilled to a "
+                "temporary file."
+}
+_default_settings['multipart.max_part_size'] = {
+    'default' : 104857600,  # 100MB
+    'types'   : (int,),
+    'help'    : "Maximum size, in bytes, of a part in multipart request body."
+}
+_default_settings['multipart.max_field_size'] = {
+    'default' : 1048576,    # 1MB
+    'types'   : (int,),
+    'help'    : "Maximum size, in bytes, of a form field in multipart "
+                "request body, and of url-encoded request body that was "
+                "spooled. Form fields are kept in memory."
+}
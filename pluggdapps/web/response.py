@@ -31,41 +31,46 @@ class HTTPResponse( Plugin ):
 
     implements( IHTTPResponse )
 
-    start_response = False
-    """Response headers are already sent on the connection."""
-
-    write_buffer = []
-    """Either a list of byte-string buffered by write() method. Or a generator
-    function created via chunk_generator() method."""
-
-    flush_callback = None
-    """Flush callback subscribed using flush() method."""
-
-    finish_callback = None
-    """Finish callback subscribed using set_finish_callback() method."""
-
-    finished = False
-    """A request is considered finished when there is no more response data to
-    be sent for the on-going request. This is typically indicated by flushing
-    the response with finishing=True argument."""
+    # Response attributes are kept in slots, plugin attributes continue to
+    # live in instance dictionary.
+    __slots__ = [
+        'statuscode', 'reason', 'version', 'headers', 'body',
+        'trailers', 'setcookies', 'request', 'context',
+        'media_type', 'content_coding', 'charset', 'language', 'httpconn',
+        'start_response',   # Response headers are already sent on the
+                            # connection.
+        'write_buffer',     # Either a list of byte-string buffered by
+                            # write() method. Or a generator function
+                            # created via chunk_generator() method.
+        'flush_callback',   # Subscribed using flush() method.
+        'finish_callback',  # Subscribed using set_finish_callback() method.
+        'finished',         # A request is considered finished when there is
+                            # no more response data to be sent for the
+                            # on-going request. This is typically indicated
+                            # by flushing the response with finishing=True.
+    ]
 
     def __init__( self, request ):
         """:meth:`pluggdapps.web.webinterfaces.IHTTPResponse.__init__`
         interface method."""
+        self.headers = {}
+        self.trailers = {}
+        self.setcookies = SimpleCookie()
+        self.context = h.Context()
+        self.renew( request )
+
+    def renew( self, request ):
+        """:meth:`pluggdapps.web.webinterfaces.IHTTPResponse.renew`
+        interface method."""
         # Initialize response attributes
         self.statuscode = b'200'
         self.reason = http.client.responses[ int(self.statuscode) ]
         self.version = request.httpconn.version
-        self.headers = {}
         self.body = b''
         self.chunk_generator = None
-        self.trailers = {}
-
-        self.setcookies = SimpleCookie()
 
         # Initialize framework attributes
         self.request = request
-        self.context = h.Context()
         self.media_type = None
         self.content_coding = None
         self.charset = self.webapp['encoding']
@@ -79,6 +84,20 @@ class HTTPResponse( Plugin ):
         self.flush_callback = None
         self.finish_callback = None
 
+    def reset( self ):
+        """:meth:`pluggdapps.web.webinterfaces.IHTTPResponse.reset`
+        interface method."""
+        self.request = self.httpconn = None
+        self.body = b''
+        self.write_buffer = []
+        self.flush_callback = self.finish_callback = None
+        self.headers.clear()
+        self.trailers.clear()
+        self.setcookies.clear()
+        self.context.clear()
+        self.context.etag.clear()
+        self._settngx.overlay = None
+
     #---- IHTTPResponse APIs
 
     def set_status( self, code ):
@@ -314,19 +333,21 @@ class HTTPResponse( Plugin ):
         return b"\r\n".join(lines) + b"\r\n\r\n"
 
     def _flush_body( self, finishing ):
-        data = b''.join( self.write_buffer )
+        data, stats = b''.join( self.write_buffer ), self.pa.stats
         for tr in self.webapp.out_transformers :
+            t = stats and stats.timer()
             data = tr.transform( self.request, data, finishing=finishing )
+            stats and stats.since( self.webapp.netpath, self.request.viewname,
+                                   'outbound.' + tr.caname, t )
         if self._if_etag() :
             self.body = data 
         else :
             self.body = b''
         self.set_header( "content_length", len(self.body) )
-        data = self._try_start_headers( finishing=finishing )
-        if self.request.method == b'HEAD' :
-            pass
-        elif self.body :
-            data += self.body
+        # Header and body are written without concatenating them.
+        data = [ self._try_start_headers( finishing=finishing ) ]
+        if self.request.method != b'HEAD' :
+            data.append( self.body )
         self.httpconn.write( data, callback=self._onflush )
         self.write_buffer = []
 
@@ -335,11 +356,16 @@ class HTTPResponse( Plugin ):
         data = self._try_start_headers( finishing=finishing )
 
         chunk = self.write_buffer( self.request, self.c )
+        stats = self.pa.stats
         for tr in self.webapp.out_transformers :
+            t = stats and stats.timer()
             chunk = tr.transform( self.request, chunk, finishing=finishing )
+            stats and stats.since( self.webapp.netpath, self.request.viewname,
+                                   'outbound.' + tr.caname, t )
 
         if chunk :
-            data += hex(len(chunk)).encode('utf-8') + b'\r\n' + chunk + b'\r\n'
+            data = [ data + hex(len(chunk)).encode('utf-8') + b'\r\n',
+                     chunk, b'\r\n' ]
         else :
             data += b'0\r\n'
             if self.trailers :
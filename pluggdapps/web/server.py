@@ -10,14 +10,19 @@ schedule time-based events.
 """
 
 import sys, datetime, errno, heapq, time, os, select, socket, re, \
-       collections, http.client, traceback
+       collections, http.client, traceback, struct
+from   functools                 import partial
 
 import ssl  # Python 2.6+
 
+from   pluggdapps                import __version__
 import pluggdapps.utils          as h
 from   pluggdapps.plugin         import Plugin, implements
-from   pluggdapps.web.interfaces import IHTTPRequest
 from   pluggdapps.interfaces     import IHTTPServer, IHTTPConnection
+from   pluggdapps.web.timerwheel import TimerWheel
+from   pluggdapps.web.readbuffer import ReadBuffer
+from   pluggdapps.web.spooledbody import SpooledBody
+from   pluggdapps.web.multipart   import MultipartError
 
 
 # TODO :
@@ -32,6 +37,17 @@ def run_callback( server, callback, *args, **kwargs ):
     except Exception:
         server.pa.logerror( h.print_exc() )
 
+TIMEOUT_PHASES = [ 'header', 'body', 'write', 'keepalive' ]
+"""Phases of a connection, with a timeout for each, refer to
+:class:`HTTPConnection`."""
+
+try :
+    IOV_MAX = os.sysconf( 'SC_IOV_MAX' )
+except ( AttributeError, ValueError, OSError ) :
+    IOV_MAX = 16
+"""Maximum number of buffers that can be written with a single sendmsg()
+call."""
+
 class HTTPEPollServer( Plugin ):
     """A non-blocking, single-threaded HTTP Server plugin. `HTTPEPollServer`
     can serve SSL traffic with Python 2.6+ and OpenSSL.  To make this server
@@ -43,13 +59,45 @@ class HTTPEPollServer( Plugin ):
     corresponding :class:`IWebApp` plugin. Finishing the request does
     not necessarily close the connection in the case of HTTP/1.1 keep-alive
     requests.
+
+    When configured with more than one ``workers``, server runs in pre-fork
+    mode, refer to :mod:`pluggdapps.web.prefork`. ``listener`` setting
+    decides how workers accept connections,
+
+    * ``shared``, listening sockets bound by the parent process are polled
+      by all workers, every worker is woken up for a new connection.
+    * ``exclusive``, same as ``shared`` but sockets are polled with
+      ``EPOLLEXCLUSIVE``, so that only one of the waiting workers is woken
+      up.
+    * ``reuseport``, each worker binds its own listening socket with
+      ``SO_REUSEPORT`` and kernel balances new connections between them.
+      Every worker has its own accept queue.
+
+    Accept statistics of listening sockets are available from
+    :meth:`listenstats`.
+
+    Every event-loop iteration accepts at most ``accept_batch`` connections
+    on a listening socket, so that a burst of new connections does not
+    starve the on-going ones. When ``max_connections`` are open, new
+    connections are rejected with a ``503`` response or closed. Counts of
+    accepted, rejected and closed connections are available from
+    :meth:`connstats`.
     """
 
     implements( IHTTPServer )
 
+    SERVICE_UNAVAILABLE = ( b'HTTP/1.1 503 ' +
+                            http.client.responses[503].encode('utf8') +
+                            b'\r\nContent-Length: 0\r\nConnection: close'
+                            b'\r\nRetry-After: 1\r\n\r\n' )
+
     ioloop = None
     "IOLoop instance for event-polling."
 
+    supervisor = None
+    """:class:`pluggdapps.web.prefork.Supervisor` object in the parent
+    process, when running in pre-fork mode."""
+
     def __init__( self ):
         self.version = b'HTTP/1.1'
 
@@ -59,14 +107,32 @@ class HTTPEPollServer( Plugin ):
 
         # Attributes
         self.sockets = {}      # fd->socket mapping for listening sockets.
+        self.listeners = {}    # fd->Listener mapping for listening sockets.
+        self.accepted = self.rejected = self.closed = 0 # Connection counts.
+        self.timeouts = dict.fromkeys( TIMEOUT_PHASES, 0 )
         self.connections = []  # [ HTTPConnection() ]
+        self.streampool = h.FreeList( self['pool.streams'] )
 
     #---- IHTTPServer interface methods.
 
     def start( self ):
         """:meth:`pluggdapps.interfaces.IHTTPServer.start` interface method.
         """
-        self.listen()
+        workers = self['workers'] or h.cpu_count()
+        reuseport = self['listener'] == 'reuseport'
+        if workers > 1 :
+            from pluggdapps.web.prefork import Supervisor
+            # With `reuseport` workers bind their own listening sockets.
+            sockets = [] if reuseport else self.bind_sockets()
+            self.supervisor = Supervisor( self, workers, sockets )
+            self.supervisor.start()
+        else :
+            self.serve( self.bind_sockets( reuseport=reuseport ))
+
+    def serve( self, sockets ):
+        """Serve connections accepted on listening ``sockets`` using event
+        loop. Blocks until the server is stopped."""
+        self.add_sockets( sockets )
         try :
             self.ioloop.start() # Block !
         except KeyboardInterrupt :
@@ -78,13 +144,16 @@ class HTTPEPollServer( Plugin ):
         # Sanity check on unclosed connections
         if self.connections : 
             addrs = tuple( map( lambda c : c.address, self.connections ))
-            self.pa.logwarn( "%r connections are still active" % (addrs,) )
+            self.pa.logwarn( "%r connections are still active", (addrs,) )
 
     def stop( self ):
         """Stop listening for new connections. Expected to be called in case
         of exceptions and SIGNALS. Refer
         :meth:`pluggdapps.interfaces.IHTTPServer.start` interface method.
         """
+        if self.supervisor :
+            self.supervisor.stop()
+            return
         # Stop EPoll, this must un-block ioloop.start() call. Do close() after
         # that.
         self.ioloop.stop()
@@ -97,11 +166,41 @@ class HTTPEPollServer( Plugin ):
         """:meth:`pluggdapps.interfaces.IHTTPServer.close_connection` 
         interface method."""
         if httpconn in self.connections :
-            self.pa.logdebug("Closing connection %r ..."%(httpconn.address,))
+            self.pa.logdebug( "Closing connection %r ...", (httpconn.address,) )
             self.connections.remove( httpconn )
+            self.closed += 1
 
     #---- Internal methods
 
+    def drain( self, timeout ):
+        """Stop accepting new connections and stop the server once on-going
+        requests are finished, or after ``timeout`` seconds. Idle keep-alive
+        connections are closed."""
+        for fd, sock in list( self.sockets.items() ) :
+            # Connections queued on a socket owned only by this worker will
+            # be reset when it is closed, accept them to be served.
+            if self['listener'] == 'reuseport' :
+                self.listeners[fd].handler( fd, IOLoop.READ )
+            self.ioloop.remove_handler( fd )
+            sock.close()
+        self.sockets, self.listeners = {}, {}
+        deadline = time.time() + timeout
+
+        def check() :
+            [ httpconn.close() for httpconn in self.connections[:]
+              if httpconn.request is None ]
+            if not self.connections or time.time() > deadline :
+                self.stop()
+            else :
+                self.ioloop.add_timeout( time.time() + 0.1, check )
+        check()
+
+    def renewioloop( self ):
+        """Replace event loop, inherited from parent process, with a new
+        one. Called in a forked process before serving connections."""
+        self.ioloop.discard()
+        self.ioloop = IOLoop( self )
+
     def listen( self ):
         """Starts accepting connections on the given port. This method may be
         called more than once to listen on multiple ports.  `listen` takes
@@ -117,12 +216,47 @@ class HTTPEPollServer( Plugin ):
         given sockets.  The ``sockets`` parameter is a list of socket objects
         such as those returned by `bind_sockets`.
         """
+        events = IOLoop.READ
+        if self['listener'] == 'exclusive' :
+            events |= select.EPOLLEXCLUSIVE
         for sock in sockets:
-            self.sockets[ sock.fileno() ] = sock
-            add_accept_handler(self, sock, self.handle_connection, self.ioloop)
-
-    def handle_connection( self, conn, address ):
+            fd = sock.fileno()
+            listener = Listener( sock )
+            self.sockets[ fd ] = sock
+            self.listeners[ fd ] = listener
+            listener.handler = add_accept_handler(
+                    self, sock, partial( self.handle_connection,
+                                         listener=listener ),
+                    self.ioloop, events, self['accept_batch'] )
+
+    def listenstats( self ):
+        """Return a list of accept statistics, one for each listening
+        socket of this process, refer to :meth:`Listener.stats`."""
+        return [ listener.stats() for listener in self.listeners.values() ]
+
+    def connstats( self ):
+        """Return a dictionary of process id, number of open connections,
+        and number of connections accepted, rejected and closed by this
+        process. Connections closed on timeout are counted for each
+        phase of the connection, refer to :class:`HTTPConnection`."""
+        return {
+            'pid'      : os.getpid(),
+            'active'   : len( self.connections ),
+            'accepted' : self.accepted,
+            'rejected' : self.rejected,
+            'closed'   : self.closed,
+            'timeouts' : dict( self.timeouts ),
+        }
+
+    def handle_connection( self, conn, address, listener=None ):
         httpconn = None     # if query_plugin bombs.
+        if listener : listener.accepted += 1
+        maxconns = self['max_connections']
+        if maxconns and len( self.connections ) >= maxconns :
+            self.reject( conn, address )
+            return
+
+        self.accepted += 1
         try :
             httpconn = self.qp( IHTTPConnection, self['IHTTPConnection'],
                                 conn, address, self )
@@ -141,11 +275,27 @@ class HTTPEPollServer( Plugin ):
             self.pa.logerror( h.print_exc() )
             httpconn.close() if httpconn else None
 
-    def bind_sockets( self ):
+    def reject( self, conn, address ):
+        """Reject accepted connection ``conn`` when the server is
+        overloaded, with a ``503`` response if configured so."""
+        self.rejected += 1
+        self.pa.logdebug( "Rejecting connection %r ...", (address,) )
+        scheme = self['scheme'] or self.pa.settings['pluggdapps']['scheme']
+        try :
+            if self['overload'] == '503' and scheme == 'http' :
+                conn.setblocking( False )
+                conn.send( self.SERVICE_UNAVAILABLE )
+        except socket.error :
+            pass
+        conn.close()
+
+    def bind_sockets( self, reuseport=False ):
         """Creates listening sockets (server) bound to the given port and 
         address. Returns a list of socket objects (multiple sockets are
         returned if the given address maps to multiple IP addresses, which is
-        most common for mixed IPv4 and IPv6 use).
+        most common for mixed IPv4 and IPv6 use). If ``reuseport`` is True,
+        sockets are bound with ``SO_REUSEPORT`` so that more than one process
+        can listen on the same address.
 
         Address may be either an IP address or hostname.  If it's a hostname,
         the server will listen on all IP addresses associated with the
@@ -182,11 +332,13 @@ class HTTPEPollServer( Plugin ):
                     address, port, family, socket.SOCK_STREAM, 0, flags))
 
         for res in addrinfo :
-            self.pa.loginfo( "Binding socket for %s ..." % (res,) )
+            self.pa.loginfo( "Binding socket for %s ...", (res,) )
             af, socktype, proto, canonname, sockaddr = res
             sock = socket.socket(af, socktype, proto)
             h.set_close_exec( sock.fileno() )
             sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            if reuseport :
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
             if af == socket.AF_INET6:
                 # On linux, ipv6 sockets accept ipv4 too by default,
                 # but this makes it impossible to bind to both
@@ -202,7 +354,7 @@ class HTTPEPollServer( Plugin ):
             self.pa.logdebug( "Set server socket to non-blocking mode ..." )
             sock.setblocking(0) # Set to non-blocking.
             sock.bind( sockaddr )
-            self.pa.loginfo( "Server listening with backlog %s" % backlog )
+            self.pa.loginfo( "Server listening with backlog %s", (backlog,) )
             sock.listen( backlog )
             sockets.append( sock )
         return sockets
@@ -227,6 +379,33 @@ class HTTPEPollServer( Plugin ):
                 h.asint( sett['poll_threshold'], _ds1['poll_threshold'] )
         sett['poll_timeout'] = \
                 h.asfloat( sett['poll_timeout'], _ds1['poll_timeout'] )
+        sett['timer_resolution'] = \
+                h.asfloat( sett['timer_resolution'], _ds1['timer_resolution'] )
+        sett['edge_triggered'] = h.asbool( sett['edge_triggered'] )
+        sett['pool.streams'] = \
+                h.asint( sett['pool.streams'], _ds1['pool.streams'] )
+        sett['accept_batch'] = \
+                h.asint( sett['accept_batch'], _ds1['accept_batch'] )
+        sett['max_connections'] = \
+                h.asint( sett['max_connections'], _ds1['max_connections'] )
+        sett['workers'] = h.asint( sett['workers'], _ds1['workers'] )
+        # Fall back to shared listening sockets where not supported.
+        listeners = _ds1.specifications()['listener']['options']
+        if sett['listener'] not in listeners or \
+           ( sett['listener'] == 'reuseport' and
+                not hasattr( socket, 'SO_REUSEPORT' )) or \
+           ( sett['listener'] == 'exclusive' and
+                not hasattr( select, 'EPOLLEXCLUSIVE' )) :
+            sett['listener'] = _ds1['listener']['default']
+        sett['worker.affinity'] = h.asbool( sett['worker.affinity'] )
+        sett['worker.backoff'] = \
+                h.asfloat( sett['worker.backoff'], _ds1['worker.backoff'] )
+        sett['worker.backoff_max'] = \
+                h.asfloat( sett['worker.backoff_max'],
+                           _ds1['worker.backoff_max'] )
+        sett['worker.graceful_timeout'] = \
+                h.asfloat( sett['worker.graceful_timeout'],
+                           _ds1['worker.graceful_timeout'] )
         return sett
 
 
@@ -292,6 +471,104 @@ _ds1['poll_timeout']       = {
                 "seconds and perform callbacks (if any) and start a fresh "
                 "poll. Will be used by HTTPIOLoop definition",
 }
+_ds1['edge_triggered']     = {
+    'default' : False,
+    'types'   : (bool,),
+    'help'    : "Poll connections in edge-triggered mode. Each connection is "
+                "registered once for both read and write events and drained "
+                "till EAGAIN on every event, hence there are no epoll_ctl "
+                "calls to change the interest-set. Connections on ``https`` "
+                "are always polled in level-triggered mode.",
+}
+_ds1['timer_resolution']   = {
+    'default' : 1.0,
+    'types'   : (float,),
+    'help'    : "Resolution, in seconds, of timing wheel that manages "
+                "connection timeouts. Timeouts expire within this many "
+                "seconds after their deadline.",
+}
+_ds1['pool.streams']       = {
+    'default' : 0,
+    'types'   : (int,),
+    'help'    : "Number of closed IOStream objects to pool for re-use by new "
+                "connections. Streams for `https` scheme are not pooled. "
+                "Pooling is disabled by default.",
+}
+_ds1['accept_batch']       = {
+    'default' : 64,
+    'types'   : (int,),
+    'help'    : "Maximum number of connections to accept on a listening "
+                "socket, for every iteration of the event loop. Remaining "
+                "connections are accepted in the next iteration, after "
+                "serving events on the on-going connections.",
+}
+_ds1['max_connections']    = {
+    'default' : 0,
+    'types'   : (int,),
+    'help'    : "Maximum number of open connections for each process. New "
+                "connections beyond this limit are rejected, refer to "
+                "``overload``. Zero means no limit.",
+}
+_ds1['overload']           = {
+    'default' : '503',
+    'types'   : (str,),
+    'options' : [ '503', 'close' ],
+    'help'    : "How to reject a connection when ``max_connections`` are "
+                "open. ``503`` responds with `Service Unavailable` and "
+                "closes the connection, ``close`` closes it right away. "
+                "Connections on ``https`` are always closed.",
+}
+#---- Settings for pre-fork mode
+_ds1['workers']       = {
+    'default' : 0,
+    'types'   : (int,),
+    'help'    : "Number of worker processes to serve connections. If more "
+                "than one, listening sockets are bound by a supervising "
+                "parent process and shared by forked workers. Zero means as "
+                "many workers as CPUs.",
+    'webconfig' : False,
+}
+_ds1['listener']      = {
+    'default' : 'shared',
+    'types'   : (str,),
+    'options' : [ 'shared', 'exclusive', 'reuseport' ],
+    'help'    : "How worker processes accept connections. ``shared`` polls "
+                "sockets bound by parent process in all workers, "
+                "``exclusive`` does the same with EPOLLEXCLUSIVE to avoid "
+                "waking up all workers for a connection, ``reuseport`` binds "
+                "a SO_REUSEPORT socket in each worker and kernel balances "
+                "connections between them. Falls back to ``shared`` if not "
+                "supported by the platform.",
+    'webconfig' : False,
+}
+_ds1['worker.affinity'] = {
+    'default' : False,
+    'types'   : (bool,),
+    'help'    : "Pin each worker process to a CPU.",
+    'webconfig' : False,
+}
+_ds1['worker.backoff'] = {
+    'default' : 0.5,
+    'types'   : (float,),
+    'help'    : "Seconds to wait before restarting a crashed worker. Doubled "
+                "for every consecutive crash.",
+    'webconfig' : False,
+}
+_ds1['worker.backoff_max'] = {
+    'default' : 30.0,
+    'types'   : (float,),
+    'help'    : "Maximum seconds to wait before restarting a crashed worker. "
+                "Worker that was serving longer than this is not considered "
+                "as crashing repeatedly.",
+    'webconfig' : False,
+}
+_ds1['worker.graceful_timeout'] = {
+    'default' : 10.0,
+    'types'   : (float,),
+    'help'    : "Seconds to wait for on-going requests to finish, when a "
+                "worker is stopped or restarted.",
+    'webconfig' : False,
+}
 #---- SSL settings, for scheme `https`
 _ds1['ssl.certfile']  = {
     'default' : '',
@@ -327,28 +604,79 @@ _ds1['ssl.ca_certs']   = {
                 "connection. SSL options can be set only in the .ini file."
 }
 
-def add_accept_handler( server, sock, callback, ioloop ):
+def add_accept_handler( server, sock, callback, ioloop, events=None,
+                        batch=0 ):
     """Adds an ``IOLoop`` event handler to accept new connections on 
     ``sock``. When a connection is accepted, ``callback(connection, address)``
     will be run (``connection`` is a socket object, and ``address`` is the
     address of the other end of the connection).  Note that this signature is
     different from the ``callback(fd, events)`` signature used for ``IOLoop``
-    handlers.
+    handlers. Returns the event handler.
+
+    If ``batch`` is non-zero, at most ``batch`` connections are accepted for
+    every event. Since the event loop is level-triggered, remaining
+    connections are reported again in the next iteration.
     """
     def accept_handler( fd, events ):
-        while True:
+        n = batch or -1
+        while n :
+            n -= 1
             try :
+                # Accepted socket is already close-on-exec, python uses
+                # accept4() with SOCK_CLOEXEC.
                 connection, address = sock.accept()
-                h.set_close_exec( connection.fileno() )
             except socket.error as e:
                 if e.args[0] in (errno.EWOULDBLOCK, errno.EAGAIN):
                     return
                 server.pa.logerror( h.print_exc() )
+                return
 
-            server.pa.logdebug( "Accepting new connection from %r"%(address,) )
+            server.pa.logdebug( "Accepting new connection from %r", (address,) )
             callback( connection, address )
 
-    ioloop.add_handler( sock.fileno(), accept_handler, IOLoop.READ )
+    ioloop.add_handler( sock.fileno(), accept_handler, events or IOLoop.READ )
+    return accept_handler
+
+
+class Listener( object ):
+    """Listening socket polled by the event loop, and its accept
+    statistics."""
+
+    __slots__ = [ 'sock', 'address', 'accepted', 'since', 'handler' ]
+
+    def __init__( self, sock ):
+        self.sock = sock
+        self.address = sock.getsockname()[:2]
+        self.accepted = 0           # Number of connections accepted.
+        self.since = time.time()    # Listening since.
+        self.handler = None         # Accept handler polled by IOLoop.
+
+    def stats( self ):
+        """Return a dictionary of process id, listening address, number of
+        connections accepted and accept rate per second. On Linux, current
+        depth of the accept queue and its maximum size are also returned,
+        otherwise they are None."""
+        elapsed = max( time.time() - self.since, 1e-6 )
+        depth, backlog = acceptqueue( self.sock ) or (None, None)
+        return {
+            'pid'      : os.getpid(),
+            'address'  : '%s:%s' % self.address,
+            'accepted' : self.accepted,
+            'rate'     : self.accepted / elapsed,
+            'queue'    : depth,
+            'backlog'  : backlog,
+        }
+
+
+def acceptqueue( sock ):
+    """Return a tuple of (depth, maxdepth) for accept queue of listening
+    ``sock``, read from TCP_INFO. Return None if not supported."""
+    try :
+        info = sock.getsockopt( socket.IPPROTO_TCP, socket.TCP_INFO, 104 )
+        # tcpi_unacked and tcpi_sacked, for a listening socket.
+        return struct.unpack_from( '8B6I', info )[12:14]
+    except ( AttributeError, OSError, struct.error ) :
+        return None
 
 
 class IOLoop( object ):
@@ -361,6 +689,7 @@ class IOLoop( object ):
         READ  = select.EPOLLIN
         WRITE = select.EPOLLOUT
         ERROR = select.EPOLLERR | select.EPOLLHUP
+        EDGE  = select.EPOLLET
     except :
         pass
 
@@ -381,6 +710,17 @@ class IOLoop( object ):
     _timeouts = []
     """A heap queue list to manage timeout events and its callbacks."""
 
+    _cancelled = 0
+    """Number of cancelled timeouts in ``_timeouts``."""
+
+    compact_threshold = 512
+    """Heap of timeouts is compacted when number of cancelled timeouts
+    exceed this threshold and half the size of the heap."""
+
+    wheel = None
+    """:class:`pluggdapps.web.timerwheel.TimerWheel` to manage timers that
+    are frequently reset, like connection timeouts."""
+
     _running = False
     """Initialized to True when start() is called and set to False to
     indicate that stop() is called."""
@@ -399,6 +739,9 @@ class IOLoop( object ):
     poll_timeout = None
     """Timout value while waiting on epoll()."""
 
+    edge_triggered = False
+    """Whether connection streams are polled in edge-triggered mode."""
+
     server = None
     """:class:`IHTTPServer` plugin."""
 
@@ -406,6 +749,7 @@ class IOLoop( object ):
 
         self.poll_threshold = server['poll_threshold']
         self.poll_timeout = server['poll_timeout']
+        self.edge_triggered = server['edge_triggered']
         self.server = server
 
         self._evpoll = select.epoll()
@@ -418,8 +762,10 @@ class IOLoop( object ):
         self._events = {}
         self._callbacks = []
         self._timeouts = []
+        self._cancelled = 0
         self._running = False
         self._stopped = False
+        self.wheel = TimerWheel( server['timer_resolution'] )
 
         server.pa.logdebug( "Adding poll-loop waker ..." )
         self.add_handler( self._waker.fileno(), 
@@ -438,18 +784,18 @@ class IOLoop( object ):
         self._evpoll.register( fd, events | self.ERROR )
         if len(self._handlers) > self.poll_threshold :
             self.server.pa.logwarn(
-                "Polled descriptors exceeded threshold" % self.poll_threshold
-            )
-        self.server.pa.logdebug( "Add descriptor to epoll : %s" % fd )
+                "Polled descriptors exceeded threshold %s",
+                (self.poll_threshold,) )
+        self.server.pa.logdebug( "Add descriptor to epoll : %s", (fd,) )
 
     def update_handler( self, fd, events ):
         """Changes the events we listen for fd."""
         self._evpoll.modify( fd, events | self.ERROR )
-        self.server.pa.logdebug("Updating descriptor : %s, %s" % (fd, events))
+        self.server.pa.logdebug( "Updating descriptor : %s, %s", (fd, events) )
 
     def remove_handler( self, fd ):
         """Stop listening for events on fd."""
-        self.server.pa.logdebug( "Remove descriptor from epoll : %s:" % fd )
+        self.server.pa.logdebug( "Remove descriptor from epoll : %s", (fd,) )
         self._handlers.pop(fd, None)
         self._events.pop(fd, None)
         try:
@@ -481,10 +827,35 @@ class IOLoop( object ):
         """
         # Removing from a heap is complicated, so just leave the defunct
         # timeout object in the queue (see discussion in
-        # http://docs.python.org/library/heapq.html).
-        # If this turns out to be a problem, we could add a garbage
-        # collection pass whenever there are too many dead timeouts.
+        # http://docs.python.org/library/heapq.html), and compact the heap
+        # when there are too many of them.
+        if timeout.callback is None : return
         timeout.callback = None
+        self._cancelled += 1
+        if ( self._cancelled > self.compact_threshold and
+             self._cancelled * 2 > len( self._timeouts ) ) :
+            self._timeouts = [ t for t in self._timeouts if t.callback ]
+            heapq.heapify( self._timeouts )
+            self._cancelled = 0
+
+    #---- Manage timers on timing wheel.
+
+    def add_timer( self, deadline, callback ):
+        """Calls the given callback at the time deadline, a UNIX timestamp,
+        within ``timer_resolution`` seconds. Returns a handle that may be
+        passed to :meth:`reset_timer` and :meth:`remove_timer`. Unlike
+        :meth:`add_timeout`, timers can be reset and removed in constant
+        time.
+        """
+        return self.wheel.add( deadline, callback )
+
+    def reset_timer( self, timer, deadline ):
+        """Move ``timer``, returned by add_timer(), to a new deadline."""
+        self.wheel.reset( timer, deadline )
+
+    def remove_timer( self, timer ):
+        """Cancel ``timer`` returned by add_timer()."""
+        self.wheel.remove( timer )
 
 
     #---- manage straight-forward callbacks inside evented ioloop.
@@ -529,6 +900,7 @@ class IOLoop( object ):
                 while self._timeouts :
                     if self._timeouts[0].callback is None : # Cancelled timeout
                         heapq.heappop( self._timeouts )
+                        self._cancelled -= 1
 
                     elif self._timeouts[0].deadline <= now : # Handle timeout
                         timeout = heapq.heappop( self._timeouts )
@@ -540,6 +912,13 @@ class IOLoop( object ):
                         poll_timeout = min(seconds, poll_timeout)
                         break
 
+            # Handle timers
+            if self.wheel.count :
+                for timer in self.wheel.advance( time.time() ) :
+                    try    : timer.callback()
+                    except : self.server.pa.logerror( h.print_exc() )
+                poll_timeout = min( self.wheel.resolution, poll_timeout )
+
             if self._callbacks :
                 # If any callbacks or timeouts called add_callback,
                 # we don't want to wait in poll() before we run them.
@@ -598,6 +977,17 @@ class IOLoop( object ):
 
         self._waker.wake()  # Wake the ioloop
 
+    def discard( self ):
+        """Close descriptors of an event loop inherited from parent process,
+        without un-registering them from epoll instance that is shared with
+        the parent."""
+        self._waker.close()
+        self._evpoll.close()
+        self._handlers, self._events = {}, {}
+        self._callbacks, self._timeouts = [], []
+        self._cancelled = 0
+        self.wheel = TimerWheel( self.wheel.resolution )
+
     def close( self ):
         """Closes the event-poll, freeing any resources used.
 
@@ -619,10 +1009,10 @@ class IOLoop( object ):
         self._timeouts = []
         if self._handlers :
             self.server.pa.logerror( 
-                    "Handlers are still subscribed: %r" % self._handlers )
+                    "Handlers are still subscribed: %r", (self._handlers,) )
         if self._events :
             self.server.pa.logerror(
-                    "Events are pending to be handled: %r" % self._events )
+                    "Events are pending to be handled: %r", (self._events,) )
 
 
 class HTTPConnection( Plugin ):
@@ -633,31 +1023,56 @@ class HTTPConnection( Plugin ):
 
     Accepts only HTTP/1.1 request. If otherwise, reponds with bad-request
     (400) and closes the connection.
-    """
-
-    implements( IHTTPConnection )
 
-    write_callback = None
-    """Call-back for writing data to connection."""
+    Pipelined requests are parsed from the read buffer as soon as they are
+    received and dispatched, upto ``pipeline_depth`` requests at a time.
+    Responses are written in the order in which requests were received,
+    refer :class:`PipelinedConnection`.
 
-    close_callback = None
-    """Call-back when connection is closed."""
-
-    finish_callback = None
-    """Call-back when request is finished."""
-
-    stream = None
-    """:class:`IOStream` object."""
-
-    iotimeout = None
-    """Connection timeout from ioloop."""
+    Request body larger than ``body_stream_size`` is streamed into a
+    :class:`pluggdapps.web.spooledbody.SpooledBody` as it is received,
+    instead of buffering it in memory. Multipart body is fed, as it is
+    received, to the parser returned by request's ``multipart()`` method.
+    """
 
-    reqdata = None
-    """Tuple of new request's start line and headers,
-    (method, uri, version, hdrs)"""
+    implements( IHTTPConnection )
 
-    chunk = None
-    """Tuple of on-going request chunk, (chunk_size, chunk_ext, chunk_data)"""
+    # Connection state is kept in slots, plugin attributes continue to live
+    # in the instance dictionary.
+    __slots__ = [
+        'conn',             # Socket object accepted by the server.
+        'address',          # Socket address for the other end.
+        'server',           # :class:`IHTTPServer` plugin instance.
+        'version',          # HTTP version supported by the server.
+        'request',          # On-going :class:`IHTTPRequest` plugin, whose
+                            # response is being written.
+        'pipeline',         # Deque of :class:`PipelinedConnection` for
+                            # requests received after on-going request.
+        'held',             # Headers of pipelined request with body, held
+                            # till earlier responses are written.
+        'draining',         # No more requests are to be read.
+        'stream',           # :class:`IOStream` object.
+        'iotimeout',        # Connection timeout from ioloop.
+        'write_callback',   # Call-back for writing data to connection.
+        'close_callback',   # Call-back when connection is closed.
+        'finish_callback',  # Call-back when request is finished.
+        'reqdata',          # Tuple of new request's start line and headers,
+                            # (method, uri, version, hdrs)
+        'chunk',            # Tuple of on-going request chunk,
+                            # (chunk_size, chunk_ext, chunk_data)
+        'parsetime',        # Seconds taken to parse request headers.
+        'writeat',          # Timestamp when on-going write was started.
+        'phase',            # Phase of connection, for timeouts.
+        'bodystart',        # Timestamp when request body started.
+        'bodyrecv',         # Bytes of request body received so far.
+        'spool',            # :class:`SpooledBody` or MultipartParser of
+                            # streamed request body.
+        'bodyrequest',      # :class:`IHTTPRequest` plugin created before
+                            # its streamed body is received.
+    ]
+
+    product = b'PluggdappsServer/' + __version__.encode('utf8')
+    """Product token for server identification."""
 
     # error response
     BAD_REQUEST    = ( b'HTTP/1.1 400 ' + 
@@ -674,14 +1089,14 @@ class HTTPConnection( Plugin ):
                        b'\r\n\r\n' )
 
     def __init__( self, conn, addr, server ):
-        from pluggdapps import __version__
-
         self.conn = conn
         self.address = addr
         self.server = server
-        self.product = b'PluggdappsServer/' + __version__.encode('utf8')
         self.version = server.version
         self.request = None
+        self.pipeline = collections.deque()
+        self.held = None
+        self.draining = False
 
         # Book-keeping
         self.stream = None
@@ -692,6 +1107,13 @@ class HTTPConnection( Plugin ):
         self.finish_callback = None
         self.reqdata = None
         self.chunk = None
+        self.parsetime = self.writeat = None
+        self.bodystart, self.bodyrecv = None, 0
+        self.spool = None
+        self.bodyrequest = None
+
+        self.iotimeout = None
+        self.phase = 'header'
 
         # Set up a socket from accepted connection (conn, addr).
         scheme = server['scheme'] or self.pa.settings['pluggdapps']['scheme']
@@ -700,12 +1122,15 @@ class HTTPConnection( Plugin ):
             self.conn = ssl.wrap_socket( conn, server_side=True,
                                          do_handshake_on_connect=False,
                                          **sslopts )
-        streamcls = SSLIOStream if scheme == 'https' else IOStream
-        self.stream = streamcls( self )
+        if scheme == 'https' :
+            self.stream = SSLIOStream( self )
+        else :
+            stream = server.streampool.get()
+            self.stream = stream.renew( self ) if stream else IOStream( self )
 
         # IMPORTANT : Subscribe timeout before subscribing to stream.
-        tm = time.time() + self['connection_timeout']
-        self.iotimeout = self.server.ioloop.add_timeout( tm, self.on_timeout )
+        tm = time.time() + self['header_timeout']
+        self.iotimeout = self.server.ioloop.add_timer( tm, self.on_timeout )
 
         # IMPORTANT : Subscribe close-callback before subscribing to stream.
         self.stream.set_close_callback( self.on_connection_close )
@@ -734,26 +1159,18 @@ class HTTPConnection( Plugin ):
             trailers=None ):
         """:meth:`pluggdapps.interfaces.IHTTPConnection.handle_request`
         interface method."""
-
-        # Fresh request, resolve application.
-        uriparts, webapp = self.pa.resolveapp( uri, headers )
-        if webapp == None :
-            self.pa.logerror("Unable to resolve request for apps. (%s)" % uri)
-            self.write_error( self.NOT_FOUND )
-            return
-
-        try :
-            # Since the connection plugin do not operate in the context
-            # of a webapp, use `webapp` plugin to query for IHTTPRequest.
-            request = webapp.qp(
-                            IHTTPRequest, webapp['IHTTPRequest'],
-                            self, method, uri, uriparts, version, headers )
-        except :
-            self.pa.logerror( h.print_exc() )
-            self.write_error( self.INTERNAL_ERROR )
-            return
-
-        self.request = request
+        # Request might be created before its streamed body was received.
+        request, self.bodyrequest = self.bodyrequest, None
+        if request is None :
+            request = self.newrequest( method, uri, version, headers )
+            if request is None : return
+
+        httpconn, webapp = request.httpconn, request.webapp
+        if httpconn is self :
+            self.request = request
+        else :
+            httpconn.request = request
+            self.pipeline.append( httpconn )
         if chunk :
             webapp.dorequest( request, chunk=chunk, trailers=trailers )
         else :
@@ -773,13 +1190,31 @@ class HTTPConnection( Plugin ):
             raise Exception( "Request is not yet received." )
 
         if self.stream and self.stream.closed() :
-            self.pa.logwarn("Cannot write to closed stream %r"%(self.address,))
+            self.pa.logwarn(
+                "Cannot write to closed stream %r", (self.address,) )
             return
 
-        self.write_callback = callback
+        self.startwrite( callback )
         self.stream.write( data, self.on_write_complete )
         return
 
+    def write_file( self, file, offset=0, count=None, callback=None ):
+        """:meth:`pluggdapps.interfaces.IHTTPConnection.write_file`
+        interface method. Write a file segment to socket.
+        """
+        if self.request == None :
+            raise Exception( "Request is not yet received." )
+
+        if self.stream and self.stream.closed() :
+            self.pa.logwarn(
+                "Cannot write to closed stream %r", (self.address,) )
+            file.close()
+            return
+
+        self.startwrite( callback )
+        self.stream.write_file( file, offset, count, self.on_write_complete )
+        return
+
     def close( self ):
         """:meth:`pluggdapps.interfaces.IHTTPConnection.close` interface 
         method."""
@@ -787,14 +1222,162 @@ class HTTPConnection( Plugin ):
 
     #---- Internal methods
 
+    def newrequest( self, method, uri, version, headers ):
+        """Resolve application for a fresh request and return a new
+        :class:`IHTTPRequest` plugin for it. On failure, error response is
+        written and None is returned."""
+        stats = self.pa.stats
+        t = stats and stats.timer()
+
+        uriparts, webapp = self.pa.resolveapp( uri, headers )
+        if webapp == None :
+            self.pa.logerror(
+                "Unable to resolve request for apps. (%s)", (uri,) )
+            self.write_error( self.NOT_FOUND )
+            return None
+
+        if stats :
+            stats.since( webapp.netpath, None, 'resolve', t )
+            stats.record( webapp.netpath, None, 'parse',
+                          int( (self.parsetime or 0) * 1000000 ))
+            t = stats.timer()
+
+        # Pipelined request, its response is written after the on-going
+        # response.
+        httpconn = self if self.request is None else PipelinedConnection(self)
+        try :
+            # Since the connection plugin do not operate in the context
+            # of a webapp, use `webapp` plugin to query for IHTTPRequest.
+            request = webapp.newrequest(
+                        httpconn, method, uri, uriparts, version, headers )
+        except :
+            self.pa.logerror( h.print_exc() )
+            self.write_error( self.INTERNAL_ERROR )
+            return None
+        stats and stats.since( webapp.netpath, None, 'newrequest', t )
+        return request
+
+    def startwrite( self, callback ):
+        """Response data is being written, subscribe ``callback`` for it."""
+        stats = self.pa.stats
+        self.writeat = stats and stats.timer()
+        self.write_callback = callback
+        self.phase = 'write'
+        self.touch( self['write_timeout'] )
+
+    def touch( self, timeout ):
+        """Reset connection's timer to expire after ``timeout`` seconds."""
+        if self.stream :    # Timer is removed once the stream is closed.
+            self.server.ioloop.reset_timer(
+                    self.iotimeout, time.time() + timeout )
+
+    def startbody( self, nbytes ):
+        """Request headers are received and ``nbytes`` of request body is
+        already buffered, wait for the rest of the body."""
+        self.phase = 'body'
+        self.bodystart, self.bodyrecv = time.time(), nbytes
+        self.touch( self.bodydeadline( self.bodystart ) - self.bodystart )
+
+    def bodydeadline( self, now ):
+        """Deadline to receive more of request body. Apart from
+        ``body_timeout``, the client is expected to send the body at an
+        average rate of ``body_min_rate``."""
+        timeout, rate = self['body_timeout'], self['body_min_rate']
+        deadline = now + timeout
+        if rate :
+            deadline = min( deadline,
+                            self.bodystart + timeout + self.bodyrecv / rate )
+        return deadline
+
+    def on_read( self, nbytes ):
+        """Stream read ``nbytes`` of data from the connection. Deadline for
+        request headers is not extended on progress, so that clients
+        sending headers slowly cannot hold the connection."""
+        phase = self.phase
+        if phase == 'keepalive' :   # Next request on keep-alive connection.
+            self.phase = 'header'
+            self.touch( self['header_timeout'] )
+        elif phase == 'body' :
+            self.bodyrecv += nbytes
+            now = time.time()
+            self.touch( self.bodydeadline( now ) - now )
+
+    def on_written( self ):
+        """Stream made progress writing response data."""
+        if self.phase == 'write' :
+            self.touch( self['write_timeout'] )
+
+    def dispatched( self ):
+        """Request is received and dispatched to the application, response
+        is expected within ``write_timeout``."""
+        self.phase = 'write'
+        self.touch( self['write_timeout'] )
+
     def write_error( self, rawdata ):
-        """Write raw data as response and close the connection."""
+        """Write raw data as response and close the connection. If
+        responses are pending for earlier requests, error is written after
+        them."""
+        if self.request is not None :
+            self.draining = True
+            httpconn = PipelinedConnection( self )
+            httpconn.writes.append( (self.write_error, (rawdata,)) )
+            self.pipeline.append( httpconn )
+            return
         if self.stream and self.stream.closed() :
-            self.pa.logwarn("Cannot write to closed stream %r"%(self.address,))
+            self.pa.logwarn(
+                "Cannot write to closed stream %r", (self.address,) )
             return
         self.stream.write( rawdata, self.close )
         return
 
+    def readbody( self, clen ):
+        """Read request body of ``clen`` bytes. Body larger than
+        ``body_stream_size`` is written to a spooled body as it arrives.
+        If it is multipart, request is created before reading the body and
+        its parser is fed instead."""
+        stream_size = self['body_stream_size']
+        if stream_size and clen > stream_size :
+            request = self.newrequest( *self.reqdata )
+            if request is None : return
+            parser = request.multipart()
+            self.bodyrequest = request
+            if parser is None :
+                self.spool = SpooledBody( self['body_spool_size'] )
+                callback = self.spool.write
+            else :
+                self.spool, callback = parser, self.on_multipart
+            self.stream.read_bytes( clen, self.on_request_body,
+                                    streaming_callback=callback )
+        else :
+            self.stream.read_bytes( clen, self.on_request_body )
+
+    def readnext( self ):
+        """Read the next request, if there is room in the pipeline. Data
+        for pipelined requests might already be buffered, in which case it is
+        parsed without reading the socket."""
+        inflight = len( self.pipeline ) + (self.request is not None)
+        stream = self.stream
+        if ( self.draining or self.held or inflight >= self['pipeline_depth']
+             or stream is None or stream.closed() or stream.reading() ) :
+            return
+        stream.read_until( b"\r\n\r\n", self.on_request_headers )
+
+    def nextresponse( self ):
+        """Response for on-going request is written. Next pipelined
+        request, if any, becomes the on-going request and its held back
+        response data is written, making room to read another request."""
+        if self.pipeline :
+            self.dispatched()
+            self.pipeline.popleft().promote()
+            self.readnext()
+        elif self.held :
+            data, self.held = self.held, None
+            self.on_request_headers( data )
+        else :
+            self.phase = 'keepalive'
+            self.touch( self['connection_timeout'] )
+            self.readnext()
+
     def supports_http_1_1( self ):
         """Check whether the client support HTTP 1.1"""
         if self.reqdata :
@@ -810,17 +1393,31 @@ class HTTPConnection( Plugin ):
             conn_val = h.parse_connection( hdrs.get( "connection", b'' ))
             disconnect = conn_val == [ b'close' ]
 
-        if disconnect == True :
-            self.server.ioloop.remove_timeout( self.iotimeout )
-            self.stream.close()
+        # Closing the stream calls back on_connection_close(), detach the
+        # stream before closing so that the connection is closed only once.
+        if disconnect == True and self.stream :
+            stream, self.stream = self.stream, None
+            self.server.ioloop.remove_timer( self.iotimeout )
+            stream.close()
             if self.close_callback :
                 callback, self.close_callback = self.close_callback, None
                 callback()
             self.write_callback = None
             self.close_callback = None
             self.finish_callback = None
+            pipeline, self.pipeline = self.pipeline, collections.deque()
+            [ httpconn.discard() for httpconn in pipeline ]
+            if self.spool is not None : # Closed while receiving body.
+                spool, self.spool = self.spool, None
+                if isinstance( spool, SpooledBody ) :
+                    spool.close()
+                else :
+                    spool.discard()
+            self.bodyrequest = None
             self.server.close_connection( self )
-            self.request = self.stream = self.server = None
+            if type( stream ) == IOStream :
+                self.server.streampool.put( stream )
+            self.request = self.server = None
 
         return disconnect
 
@@ -828,11 +1425,21 @@ class HTTPConnection( Plugin ):
 
     def on_write_complete( self ):
         """Local callback once response data is written."""
+        request, stats = self.request, self.pa.stats
+        if stats and request and self.writeat :
+            stats.since( request.webapp.netpath, request.viewname, 'write',
+                         self.writeat )
+            self.writeat = None
+
         if self.write_callback is not None:
             callback, self.write_callback = self.write_callback, None
             callback()
 
-        if self.request and self.request.has_finished() :
+        if request and request.has_finished() :
+            if stats :
+                usecs = int( (time.time() - request.receivedat) * 1000000 )
+                stats.record( request.webapp.netpath, request.viewname,
+                              'total', max( usecs, 0 ))
             # Mark that response is sent and close the connection if required,
             # before subscribing to request-handler.
             disconnect = self.tryclose()
@@ -841,24 +1448,24 @@ class HTTPConnection( Plugin ):
                 callback, self.finish_callback = self.finish_callback, None
                 callback()
             self.request = None
+            # Connection no more refers to the finished request.
+            request.webapp.recycle( request )
             if ( disconnect == False and self.stream and 
                  self.stream.closed() == False ) :
-                self.stream.read_until( b"\r\n\r\n", self.on_request_headers )
-
-    def on_request_headers( self, data ):
-        """A request has started. Parse `data` for startline and headers."""
-        if self.request != None :
-            self.pa.logerror( h.print_exc() )
-            self.write_error( self.INTERNAL_ERROR )
-            return
+                self.nextresponse()
 
+    def on_request_headers( self, rawdata ):
+        """A request has started. Parse `rawdata` for startline and
+        headers."""
         # Remove empty-lines (CRLFs) prefixed to request message
-        if data.strip( b'\r\n' ) == b'' :
+        if rawdata.strip( b'\r\n' ) == b'' :
             self.stream.read_until( b"\r\n\r\n", self.on_request_headers )
             return
 
+        stats = self.pa.stats
+        t = stats and stats.timer()
         try :
-            data = data.rstrip( b'\r\n' )
+            data = rawdata.rstrip( b'\r\n' )
             # Get request-startline
             try :
                 startline, hdrdata = data.split( b"\r\n", 1 )
@@ -872,6 +1479,7 @@ class HTTPConnection( Plugin ):
 
             hdrs = h.HTTPHeaders.parse( hdrdata ) if hdrdata else []
             self.reqdata = ( method, uri, version, hdrs )
+            self.parsetime = stats and (stats.timer() - t)
 
             # The presence of a message-body in a request is signaled by the
             # inclusion of a Content-Length or Transfer-Encoding header field
@@ -879,29 +1487,41 @@ class HTTPConnection( Plugin ):
             clen = h.parse_content_length( hdrs.get( "content_length", None ))
             transenc = h.parse_transfer_encoding( 
                             hdrs.get( 'transfer_encoding', b'' ))
+            conn_val = h.parse_connection( hdrs.get( "connection", b'' ))
+            self.draining = conn_val == [ b'close' ]
 
-            if transenc and transenc[0][0] == b'chunked' :
+            if (clen or transenc) and self.request is not None :
+                # Request body is read once responses for earlier requests
+                # are written, so that interim and error responses for this
+                # request are not written out of order.
+                self.held = rawdata
+
+            elif transenc and transenc[0][0] == b'chunked' :
                 hdrs.pop( "content_length", None )
+                self.startbody( self.stream.buffered() )
                 self.stream.read_until( b"\r\n", self.on_request_chunk_line )
 
             elif clen :
+                self.startbody( self.stream.buffered() )
                 expect = hdrs.get( "expect", '' ).strip()
                 if clen > self['max_buffer_size'] :
                     self.write_error( self.ENTITY_LARGE )
-                    self.stream.read_bytes( clen, self.on_skip_request )
-
-                elif expect == b"100-continue" :
-                    self.stream.write( b"HTTP/1.1 100 (Continue)\r\n\r\n" )
-                    self.stream.read_bytes( clen, self.on_request_body )
+                    # Discard the body as it arrives, instead of buffering,
+                    # till the error response is written.
+                    if self.stream and self.stream.closed() == False :
+                        self.stream.read_bytes(
+                                clen, self.on_skip_request,
+                                streaming_callback=self.on_skip )
 
                 else :
-                    self.stream.read_bytes( clen, self.on_request_body )
+                    if expect == b"100-continue" :
+                        self.stream.write(b"HTTP/1.1 100 (Continue)\r\n\r\n")
+                    self.readbody( clen )
 
             else :
+                self.dispatched()
                 self.handle_request( *self.reqdata )
-                if self.stream and self.stream.closed() == False :
-                    self.stream.read_until(
-                            b"\r\n\r\n", self.on_request_headers )
+                self.readnext()
 
         except :
             self.pa.logerror( h.print_exc() )
@@ -914,11 +1534,28 @@ class HTTPConnection( Plugin ):
         if self.stream and self.stream.closed() == False :
             self.stream.read_until( b"\r\n\r\n", self.on_request_headers )
 
+    def on_skip( self, data ):
+        """Discard a chunk of request body that is skipped."""
+        pass
+
     def on_request_body( self, data ):
         """Request body receivd. Dispatch request."""
+        spool, self.spool = self.spool, None
+        if isinstance( spool, SpooledBody ) :
+            data = spool.finish()
+        elif spool is not None :    # Multipart body, parsed as received.
+            data = spool
+        self.dispatched()
         self.handle_request( *self.reqdata, body=data )
-        if self.stream and self.stream.closed() == False :
-            self.stream.read_until( b"\r\n\r\n", self.on_request_headers )
+        self.readnext()
+
+    def on_multipart( self, data ):
+        """Feed a chunk of streamed multipart body to its parser. Parse
+        error is raised again when the request closes the parser."""
+        try :
+            self.spool.feed( data )
+        except MultipartError :
+            pass
 
     def on_request_chunk_line( self, data ):
         """A new Request chunk has started. We will receive only the
@@ -977,9 +1614,11 @@ class HTTPConnection( Plugin ):
             self.stream.read_until( b"\r\n\r\n", self.on_request_headers )
 
     def on_timeout( self ):
-        """The connection was idle and a timeout has occured. Close the
-        connection."""
-        self.pa.logdebug( "Connection %r timed-out" % (self.address,) )
+        """The connection was idle, or a read or write stalled, and a timeout
+        has occured. Close the connection."""
+        self.pa.logdebug(
+            "Connection %r timed-out in %s", (self.address, self.phase) )
+        self.server.timeouts[ self.phase ] += 1
         self.tryclose( disconnect=True )
 
     def on_connection_close( self ):
@@ -1002,6 +1641,23 @@ class HTTPConnection( Plugin ):
                 h.asint( sett['max_buffer_size'], _ds2['max_buffer_size'] )
         sett['read_chunk_size'] = \
                 h.asint( sett['read_chunk_size'], _ds2['read_chunk_size'] )
+        sett['connection_timeout'] = \
+                h.asint( sett['connection_timeout'], 
+                         _ds2['connection_timeout'] )
+        sett['header_timeout'] = \
+                h.asint( sett['header_timeout'], _ds2['header_timeout'] )
+        sett['body_timeout'] = \
+                h.asint( sett['body_timeout'], _ds2['body_timeout'] )
+        sett['body_min_rate'] = \
+                h.asint( sett['body_min_rate'], _ds2['body_min_rate'] )
+        sett['write_timeout'] = \
+                h.asint( sett['write_timeout'], _ds2['write_timeout'] )
+        sett['pipeline_depth'] = \
+                h.asint( sett['pipeline_depth'], _ds2['pipeline_depth'] )
+        sett['body_stream_size'] = \
+                h.asint( sett['body_stream_size'], _ds2['body_stream_size'] )
+        sett['body_spool_size'] = \
+                h.asint( sett['body_spool_size'], _ds2['body_spool_size'] )
         return sett
 
 
@@ -1009,10 +1665,38 @@ _ds2 = h.ConfigDict()
 _ds2.__doc__ = HTTPConnection.__doc__
 
 _ds2['connection_timeout']  = {
-    'default' : 60*60*1,    # 1 hours
+    'default' : 75,
+    'types'   : (int,),
+    'help'    : "Timeout in seconds after which an idle keep-alive "
+                "connection, waiting for the next request, is gracefully "
+                "closed."
+}
+_ds2['header_timeout']  = {
+    'default' : 20,
+    'types'   : (int,),
+    'help'    : "Timeout in seconds to receive request start-line and "
+                "headers, from when the connection is accepted or from the "
+                "first byte of the next request on a keep-alive connection. "
+                "Not extended when headers arrive slowly."
+}
+_ds2['body_timeout']  = {
+    'default' : 30,
+    'types'   : (int,),
+    'help'    : "Timeout in seconds to receive more of request body, "
+                "extended every time body data is received."
+}
+_ds2['body_min_rate']  = {
+    'default' : 500,
+    'types'   : (int,),
+    'help'    : "Minimum average rate, in bytes per second, at which request "
+                "body must be received after the first ``body_timeout`` "
+                "seconds. Zero disables the check."
+}
+_ds2['write_timeout']  = {
+    'default' : 60,
     'types'   : (int,),
-    'help'    : "Timeout in seconds after which an idle connection is "
-                "gracefully closed."
+    'help'    : "Timeout in seconds for the application to respond to a "
+                "request, and for writing response data to make progress."
 }
 _ds2['max_buffer_size'] = {
     'default' : 104857600,  # 100MB
@@ -1030,6 +1714,101 @@ _ds2['read_chunk_size'] = {
     'types'   : (int,),
     'help'    : "Chunk of data, size in bytes, to read at a time."
 }
+_ds2['pipeline_depth'] = {
+    'default' : 1,
+    'types'   : (int,),
+    'help'    : "Maximum number of pipelined requests dispatched on a "
+                "connection at a time. With 1, next request is parsed once "
+                "response for the previous request is written. With more, "
+                "requests are dispatched as they are received while their "
+                "responses are held back and written in order. Requests "
+                "with body are not dispatched ahead."
+}
+_ds2['body_stream_size'] = {
+    'default' : 0,
+    'types'   : (int,),
+    'help'    : "Request body larger than this size, in bytes, is streamed "
+                "into a spooled body as it is received, instead of being "
+                "buffered in memory. Multipart form data is parsed as it is "
+                "received, unless in-bound transformers are configured, "
+                "other content is to be iterated from ``request.body`` by "
+                "views. Zero disables streaming."
+}
+_ds2['body_spool_size'] = {
+    'default' : 1048576,    # 1MB
+    'types'   : (int,),
+    'help'    : "Streamed request body is kept in memory till this size, "
+                "in bytes, after which it is spilled to a temporary file."
+}
+
+
+class PipelinedConnection( object ):
+    """Stands in for :class:`HTTPConnection` to a pipelined request,
+    dispatched while response for an earlier request on the same connection
+    is yet to be written. Response data is held back till this request
+    becomes the connection's on-going request, there after it is written
+    straight to the connection. Other attributes are that of the
+    connection."""
+
+    __slots__ = [ 'httpconn', 'request', 'head', 'writes', 'close_callback',
+                  'finish_callback' ]
+
+    def __init__( self, httpconn ):
+        self.httpconn = httpconn
+        self.request = None
+        self.head = False   # Whether this is the on-going request.
+        self.writes = []    # Held back writes, list of (method, args).
+        self.close_callback = None
+        self.finish_callback = None
+
+    def __getattr__( self, name ):
+        return getattr( self.httpconn, name )
+
+    def set_close_callback( self, callback ):
+        if self.head :
+            self.httpconn.set_close_callback( callback )
+        else :
+            self.close_callback = callback
+
+    def set_finish_callback( self, callback ):
+        if self.head :
+            self.httpconn.set_finish_callback( callback )
+        else :
+            self.finish_callback = callback
+
+    def write( self, data, callback=None ):
+        if self.head :
+            self.httpconn.write( data, callback=callback )
+        else :
+            self.writes.append( (self.httpconn.write, (data, callback)) )
+
+    def write_file( self, file, offset=0, count=None, callback=None ):
+        if self.head :
+            self.httpconn.write_file( file, offset, count, callback=callback )
+        else :
+            self.writes.append(
+                (self.httpconn.write_file, (file, offset, count, callback)) )
+
+    def promote( self ):
+        """Make this the on-going request of the connection and write the
+        response data held back so far."""
+        httpconn = self.httpconn
+        self.head = True
+        httpconn.request = self.request
+        httpconn.close_callback = self.close_callback
+        httpconn.finish_callback = self.finish_callback
+        writes, self.writes = self.writes, []
+        [ method( *args ) for method, args in writes ]
+
+    def discard( self ):
+        """Connection is closed before this request became the on-going
+        request."""
+        writes, self.writes = self.writes, []
+        for method, args in writes :
+            if method.__name__ == 'write_file' : args[0].close()
+        if self.close_callback :
+            callback, self.close_callback = self.close_callback, None
+            callback()
 
 
 
@@ -1100,65 +1879,59 @@ class IOStream( object ):
 
     The socket is a resulting connected socket via socket.accept()."""
 
-    httpconn = None
-    """:class:`IHTTPConnection` plugin."""
-
-    conn = None
-    """Socket object (accepted by the server) to stream data."""
-
-    address = None
-    """socket address for the other end of connection."""
-
-    ioloop = None
-    """Event loop for epoll service."""
-
-    server = None
-    """:class:`IHTTPServer` plugin instance."""
-
-    _read_buffer = None
-    """A collection object to buffer read bytes from socket."""
-
-    _write_buffer = None
-    """A collection object to buffer bytes to be written to socket."""
-
-    _read_buffer_size = 0
-    """Indicates the size of available read data in _read_buffer."""
-
-    _write_buffer_frozen = False
-
-    _read_delimiter = None
-    """stream reads data from the socket until this delimiter is detected."""
-
-    _read_regex = None
-    """stream reads data from the socket until a pattern specified by this
-    regular expression is detected"""
-
-    _read_bytes = None
-    """stream reads specified number of bytes from the socket."""
-
-    _read_until_close = False
-    """stream reads data from the socket until the socket is closed."""
-
-    _read_callback = None
-    """Call back for one of the read*() APIs."""
-
-    _write_callback = None
-    """Call back for one of the write*() APIs."""
-
-    _close_callback = None
-    """Call back when socket is closed."""
-
-    _state = None
-    """IO Events for which this connection is polled for."""
-
-    _pending_callbacks = 0
+    # Server can hold thousands of idle connections, so stream's state is
+    # kept in slots instead of a per-instance dictionary.
+    __slots__ = [
+        'httpconn',             # :class:`IHTTPConnection` plugin.
+        'conn',                 # Socket object accepted by the server.
+        'address',              # Socket address for the other end.
+        'server',               # :class:`IHTTPServer` plugin instance.
+        'ioloop',               # Event loop for epoll service.
+        'max_buffer_size',      # Maximum bytes to buffer from socket.
+        'read_chunk_size',      # Chunk of data to read at a time.
+        '_read_buffer',         # ReadBuffer of data from socket, or None.
+        '_write_buffer',        # Deque of bytes and FileSegment, or None.
+        '_write_offset',        # Bytes of _write_buffer[0] already written.
+        '_read_delimiter',      # Read data until this delimiter.
+        '_read_regex',          # Read data until this regular expression.
+        '_read_bytes',          # Read specified number of bytes.
+        '_read_until_close',    # Read data until socket is closed.
+        '_read_callback',       # Call back for one of the read*() APIs.
+        '_streaming_callback',  # Call back for chunks of read_bytes().
+        '_write_callback',      # Call back for one of the write*() APIs.
+        '_close_callback',      # Call back when socket is closed.
+        '_state',               # IO events for which this stream is polled.
+        '_pending_callbacks',
+        'edge',                 # Polled in edge-triggered mode.
+        'generation',           # Incremented every time the stream is
+                                # renewed for a connection.
+    ]
+
+    STREAM_CHUNK = 64 * 1024
+    """Size of data to read at a time for streamed read_bytes()."""
 
     def __init__( self, httpconn ):
+        # Buffers are allocated when there is data to buffer and released
+        # when drained, idle connections don't hold them.
+        self._read_buffer = None
+        self._write_buffer = None
+        self.generation = 0
+        self.renew( httpconn )
+
+    def renew( self, httpconn ):
+        """Initialize the stream for ``httpconn``'s connection. A pooled
+        stream is expected to be reset via :meth:`reset`. Return self.
+
+        Callbacks queued on the ioloop for the previous connection are bound
+        to its :attr:`generation`, they are ignored once the stream is
+        renewed."""
+        self.generation += 1
         self.httpconn = httpconn
         self.conn = httpconn.conn
         self.address = httpconn.address
         self.server = httpconn.server
         self.ioloop = self.server.ioloop
+        self.edge = self.ioloop.edge_triggered
 
         self.conn.setblocking( False )
 
@@ -1166,10 +1939,7 @@ class IOStream( object ):
         self.max_buffer_size = httpconn['max_buffer_size']
         self.read_chunk_size = httpconn['read_chunk_size']
 
-        self._read_buffer = collections.deque()
-        self._write_buffer = collections.deque()
-        self._read_buffer_size = 0
-        self._write_buffer_frozen = False
+        self._write_offset = 0
 
         self._read_delimiter = None
         self._read_regex = None
@@ -1177,11 +1947,21 @@ class IOStream( object ):
         self._read_until_close = False
 
         self._read_callback = None
+        self._streaming_callback = None
         self._write_callback = None
         self._close_callback = None
 
         self._state = None
         self._pending_callbacks = 0
+        return self
+
+    def reset( self ):
+        """Drop buffered data of a closed stream, before it is pooled for
+        re-use. Server and ioloop references are retained, the stream's
+        on-going methods might still refer them after close."""
+        self._read_buffer = self._write_buffer = None
+        self._write_offset = 0
+        self.address = None
 
     #---- API methods.
 
@@ -1197,7 +1977,11 @@ class IOStream( object ):
         with binary data."""
         self._read_callback = callback
         self._read_delimiter = delimiter
-        self.tryread()
+        # Data for the next request on a keep-alive connection might already
+        # be available. Complete the read in the next IOLoop iteration, so
+        # that the stack unwinds between requests.
+        self.ioloop.add_callback(
+                h.hitch( self.tryreadlater, self.generation ))
 
     def read_bytes( self, num_bytes, callback, streaming_callback=None ):
         """Call callback when we read the given number of bytes. Callback is
@@ -1205,15 +1989,18 @@ class IOStream( object ):
 
         If a ``streaming_callback`` is given, it will be called with chunks
         of data as they become available, and the argument to the final
-        ``callback`` will be empty.
+        ``callback`` will be empty. Chunks are passed as memoryview into the
+        read buffer, valid only till ``streaming_callback`` returns.
         """
         self._read_callback = callback
+        self._streaming_callback = streaming_callback
         self._read_bytes = num_bytes
         self.tryread()
 
     def write( self, data, callback=None ):
         """Write the given data to this stream. `data` is expected to be in
-        bytes.
+        bytes, or a list of bytes that are written without concatenating
+        them.
 
         If callback is given, we call it when all of the buffered write
         data has been successfully written to the stream. If there was
@@ -1224,27 +2011,51 @@ class IOStream( object ):
         if data :
             # We use bool(_write_buffer) as a proxy for write_buffer_size>0,
             # so never put empty strings in the buffer.
-            self._write_buffer.append( data )
+            if self._write_buffer is None :
+                self._write_buffer = collections.deque()
+            if isinstance( data, list ) :
+                self._write_buffer.extend( x for x in data if x )
+            else :
+                self._write_buffer.append( data )
         self._write_callback = callback
         self.handle_write()
         if self._write_buffer :
             self.add_io_state( self.ioloop.WRITE )
         self.maybe_add_error_listener()
 
+    def write_file( self, file, offset=0, count=None, callback=None ):
+        """Write ``count`` bytes from ``file``, starting at ``offset``, to
+        this stream. ``file`` is a file object opened in binary mode and it
+        is closed once written or when the stream is closed. If ``count`` is
+        None, file is written till its end. Data is sent with sendfile(),
+        without reading the file into memory. ``callback`` is same as for
+        :meth:`write`.
+        """
+        if count is None :
+            count = os.fstat( file.fileno() ).st_size - offset
+        if count > 0 :
+            self.write( FileSegment( file, offset, count ), callback )
+        else :
+            file.close()
+            self.write( b'', callback )
+
     def set_close_callback( self, callback ):
         """Call the given callback when the stream is closed."""
         self._close_callback = callback
 
     def close( self ):
         """Close this stream."""
-        self.server.pa.logdebug("Closing the stream for %r" % (self.address,))
+        self.server.pa.logdebug( "Closing the stream for %r", (self.address,) )
         if self.conn :
             if self._read_until_close :
-                self.docallback( self._read_buffer_size, self._read_callback )
+                self.docallback( self.buffered(), self._read_callback )
             if self._state is not None:
                 self.ioloop.remove_handler( self.conn.fileno() )
                 self._state = None
-            self.conn.close()
+            [ x.file.close() for x in self._write_buffer or []
+              if type( x ) is FileSegment ]
+            conn, self.conn = self.conn, None
+            conn.close()
             self.try_close_callback()
 
         self.httpconn = self.conn = None
@@ -1253,11 +2064,16 @@ class IOStream( object ):
         self._read_until_close = False
 
         self._read_callback = None
+        self._streaming_callback = None
         self._write_callback = None
         self._close_callback = None
 
         self._state = None
 
+    def close_conn( self, generation ):
+        """Close this stream if it is not renewed since ``generation``."""
+        if self.generation == generation : self.close()
+
     def reading(self):
         """Returns true if we are currently reading from the stream."""
         return self._read_callback is not None
@@ -1282,12 +2098,15 @@ class IOStream( object ):
         if self.try_read_buffer() : return
 
         # If the socket is not closed, then try reading from the socket.
+        # Stop as soon as the read is complete, further data is read the way
+        # the next read wants it, like large body into separate chunks.
         try :
-            while self.read_to_buffer() : pass
+            while self.read_to_buffer() :
+                if self.try_read_buffer() : return
         except Exception as e :
             if e.args[0] == 'Closed' :
                 self.server.pa.logwarn(
-                    "May be remote end %r closed" % (self.address,) )
+                    "May be remote end %r closed", (self.address,) )
             else :
                 self.server.pa.logerror( h.print_exc() )
             self.close()
@@ -1297,53 +2116,49 @@ class IOStream( object ):
 
         self.add_io_state( self.ioloop.READ )
 
+    def tryreadlater( self, generation ):
+        """Deferred :meth:`tryread`, if a read is still pending for the
+        connection of ``generation``."""
+        if ( self.generation == generation and
+             self._read_callback is not None and not self.closed() ) :
+            self.tryread()
+
     def try_read_buffer(self):
         """Attempts to complete the currently-pending read from the buffer.
         Returns True if read was completed and the callback registered via
         one of the API is issued and the callback return.
         """
-        # For read_bytes() API
-        if ( self._read_bytes != None and
-                self._read_buffer_size >= self._read_bytes ) :
-
-            self.docallback( self._read_bytes, self._read_callback )
-            return True
-
-        # For read_until() API
-        elif self._read_delimiter is not None and self._read_buffer:
-            # Multi-byte delimiters (e.g. '\r\n') may straddle two
-            # chunks in the read buffer, so we can't easily find them
-            # without collapsing the buffer.  However, since protocols
-            # using delimited reads (as opposed to reads of a known
-            # length) tend to be "line" oriented, the delimiter is likely
-            # to be in the first few chunks.  Merge the buffer gradually
-            # since large merges are relatively expensive and get undone in
-            # consume().
-            while True:
-                loc = self._read_buffer[0].find( self._read_delimiter )
-                if loc != -1 :  # Do callback
-                    l = loc + len(self._read_delimiter)
-                    self.docallback( l, self._read_callback )
-                    return True
+        buf = self._read_buffer
 
-                if len(self._read_buffer) == 1: # Let us wait for more data.
-                    break
-
-                # Join with next chunk and try to find a delimiter.
-                self.double_prefix( self._read_buffer )
+        # For read_bytes() API
+        if self._read_bytes is not None :
+            if self._streaming_callback and buf :
+                n = min( len(buf), self._read_bytes )
+                self._read_bytes -= n
+                data = buf.view( n )
+                run_callback( self.server, self._streaming_callback, data )
+                data.release()
+                self.consume_view( n )
+
+            if self.buffered() >= self._read_bytes :
+                self.docallback( self._read_bytes, self._read_callback )
+                return True
+
+        # For read_until() API. The search resumes from where the previous
+        # attempt stopped, data read so far is not scanned again.
+        elif self._read_delimiter is not None and buf :
+            loc = buf.find( self._read_delimiter )
+            if loc != -1 :
+                l = loc + len(self._read_delimiter)
+                self.docallback( l, self._read_callback )
+                return True
 
         # For read_until_regex() API
-        elif self._read_regex is not None and self._read_buffer :
-            while True:
-                m = self._read_regex.search( self._read_buffer[0] )
-                if m is not None:
-                    self.docallback( m.end(), self._read_callback )
-                    return True
-
-                if len(self._read_buffer) == 1:
-                    break
-
-                self.double_prefix(self._read_buffer)
+        elif self._read_regex is not None and buf :
+            loc = buf.search( self._read_regex )
+            if loc != -1 :
+                self.docallback( loc, self._read_callback )
+                return True
 
         return False
 
@@ -1366,22 +2181,33 @@ class IOStream( object ):
         self._read_until_close = False
 
         self._read_callback = None
+        self._streaming_callback = None
 
         data = self.consume( consume_bytes )
         run_callback( self.server, callback, data )
 
     def consume( self, loc ):
+        """Remove ``loc`` bytes from the read buffer and return them."""
         if loc == 0:
             return b""
-        self.merge_prefix( self._read_buffer, loc )
-        self._read_buffer_size -= loc
-        return self._read_buffer.popleft()
+        data = self._read_buffer.consume( loc )
+        if not self._read_buffer :
+            self._read_buffer = None
+        return data
+
+    def consume_view( self, loc ):
+        """Remove ``loc`` bytes from the read buffer, that were passed to the
+        consumer as a memoryview."""
+        if self._read_buffer is None : return   # Stream reset by consumer.
+        self._read_buffer.skip( loc )
+        if not self._read_buffer :
+            self._read_buffer = None
 
     def on_epoll_event( self, fd, events ):
         """Callback for this socket's (conn's) events monitored by an EPoll."""
 
         if not self.conn:
-            self.server.pa.logwarn( "Got events for closed stream %d" % fd )
+            self.server.pa.logwarn( "Got events for closed stream %d", (fd,) )
             return
 
         try:
@@ -1396,10 +2222,16 @@ class IOStream( object ):
             if events & self.ioloop.ERROR:
                 # We may have queued up a user callback in handle_read or
                 # handle_write, so don't close the HTTPIOStream until those
-                # callbacks have had a chance to run.
-                self.ioloop.add_callback( self.close )
+                # callbacks have had a chance to run. Stream might be closed
+                # and renewed for another connection by then.
+                self.ioloop.add_callback(
+                        h.hitch( self.close_conn, self.generation ))
                 return
 
+            # In edge-triggered mode, stream is polled for all events and
+            # handlers drain the socket till EAGAIN.
+            if self.edge : return
+
             state = self.ioloop.ERROR
             if self.reading() :
                 state |= self.ioloop.READ
@@ -1428,29 +2260,39 @@ class IOStream( object ):
                 # out if it's there is to try to read it.
                 if self.read_to_buffer() == 0:
                     break
+                # Complete the pending read as soon as possible, so that
+                # further data is read the way the next read wants it.
+                self.try_read_buffer()
+                if self.closed() : return
         except Exception as e :
             if e.args[0] == 'Closed' :
                 self.server.pa.logwarn(
-                    "May be remote end %r closed" % (self.address,) )
+                    "May be remote end %r closed", (self.address,) )
             else :
                 self.server.pa.logerror( h.print_exc() )
             self.close()
         self.try_read_buffer()
 
-    def read_from_socket( self ):
-        """Attempts to read from the socket.
-        Returns the data read or None if there is nothing to read.
+    def read_from_socket( self, nbytes ):
+        """Attempts to read upto ``nbytes`` from the socket into the read
+        buffer. Returns the number of bytes read or None if there is nothing
+        to read.
         """
         try:
-            chunk = self.conn.recv( self.read_chunk_size )
+            # Part of a large body, unless it is streamed in which case it
+            # is consumed from the buffer as it is read.
+            if nbytes > self.read_chunk_size and not self._streaming_callback:
+                n = self._read_buffer.recv( self.conn, nbytes )
+            else :
+                n = self._read_buffer.recv_into( self.conn, nbytes )
         except socket.error as e:
             if e.args[0] in (errno.EWOULDBLOCK, errno.EAGAIN):
                 return None
             raise
         # May be the remote end closed
-        if not chunk :
+        if not n :
             raise Exception("Closed")
-        return chunk
+        return n
 
     def read_to_buffer(self):
         """Reads from the socket and appends the result to the read buffer.
@@ -1460,56 +2302,98 @@ class IOStream( object ):
         error closes the socket and raises an exception.
         """
         self.check_closed()
-        chunk = self.read_from_socket()
+        if self._read_buffer is None :
+            self._read_buffer = ReadBuffer( self.read_chunk_size )
+
+        # While receiving a body of known size, read as much as is already
+        # buffered, so that large bodies take fewer recv calls while the
+        # buffer is never more than twice the data received. Streamed body
+        # is consumed as it is read, read it in pieces of STREAM_CHUNK.
+        nbytes, buffered = self.read_chunk_size, len( self._read_buffer )
+        if self._read_bytes is None :
+            pass
+        elif self._streaming_callback is None :
+            nbytes = max( nbytes, min( self._read_bytes - buffered, buffered ))
+        else :
+            nbytes = max( nbytes, min( self._read_bytes, self.STREAM_CHUNK ))
 
-        chunklen = 0
-        if chunk is not None :
-            self._read_buffer.append( chunk )
-            self._read_buffer_size += len(chunk)
-            if self._read_buffer_size >= self.max_buffer_size :
+        chunklen = self.read_from_socket( nbytes ) or 0
+        if chunklen :
+            if buffered + chunklen >= self.max_buffer_size :
                 raise IOError( "Reached maximum read buffer size" )
-            chunklen = len(chunk)
+            self.httpconn.on_read( chunklen )
+        elif not self._read_buffer :
+            self._read_buffer = None    # Idle connections don't hold buffer.
         return chunklen
 
+    def buffered( self ):
+        """Number of bytes read from socket and not yet consumed."""
+        return len( self._read_buffer ) if self._read_buffer else 0
+
     def handle_write(self):
+        written = False
         while self._write_buffer:
             try:
-                if not self._write_buffer_frozen :
-                    # On windows, socket.send blows up if given a
-                    # write buffer that's too large, instead of just
-                    # returning the number of bytes it was able to
-                    # process.  Therefore we must not call socket.send
-                    # with more than 128KB at a time.
-                    self.merge_prefix(self._write_buffer, 128 * 1024)
-                num_bytes = self.conn.send(self._write_buffer[0])
-                if num_bytes == 0:
-                    # With OpenSSL, if we couldn't write the entire buffer,
-                    # the very same string object must be used on the
-                    # next call to send.  Therefore we suppress
-                    # merging the write buffer after an incomplete send.
-                    # A cleaner solution would be to set
-                    # SSL_MODE_ACCEPT_MOVING_WRITE_BUFFER, but this is
-                    # not yet accessible from python
-                    # (http://bugs.python.org/issue8240)
-                    self._write_buffer_frozen = True
-                    break
-                self._write_buffer_frozen = False
-                self.merge_prefix(self._write_buffer, num_bytes)
-                self._write_buffer.popleft()
+                if type( self._write_buffer[0] ) is FileSegment :
+                    num_bytes = self.send_segment( self._write_buffer[0] )
+                else :
+                    num_bytes = self.send_buffers()
             except socket.error as e:
                 if e.args[0] in (errno.EWOULDBLOCK, errno.EAGAIN):
-                    self._write_buffer_frozen = True
                     break
                 else:
                     self.server.pa.logerror( h.print_exc() )
                     self.close()
                     return
+            if not num_bytes :
+                break
+            written = True
 
+        if not self._write_buffer :
+            self._write_buffer = None
+        if written :
+            self.httpconn.on_written()
         if not self._write_buffer and self._write_callback :
             callback = self._write_callback
             self._write_callback = None
             run_callback( self.server, callback )
 
+    def send_buffers( self ):
+        """Send buffered data, till the next file segment, with a single
+        sendmsg() call, without concatenating them. Return the number of
+        bytes sent."""
+        iov = []
+        for data in self._write_buffer :
+            if type( data ) is FileSegment or len( iov ) == IOV_MAX :
+                break
+            iov.append( data )
+        if self._write_offset :
+            iov[0] = memoryview( iov[0] )[ self._write_offset: ]
+        num_bytes = self.conn.sendmsg( iov )
+        self.advance( num_bytes )
+        return num_bytes
+
+    def send_segment( self, segment ):
+        """Send file ``segment`` using sendfile(). Return the number of
+        bytes sent."""
+        num_bytes = os.sendfile( self.conn.fileno(), segment.file.fileno(),
+                                 segment.offset, segment.count )
+        if num_bytes == 0 :
+            raise IOError( "File %r truncated" % segment.file )
+        segment.offset += num_bytes
+        segment.count -= num_bytes
+        if segment.count == 0 :
+            self._write_buffer.popleft().file.close()
+        return num_bytes
+
+    def advance( self, num_bytes ):
+        """Remove ``num_bytes`` written from the front of the write buffer.
+        A partially written buffer is tracked by offset, not re-sliced."""
+        buf, n = self._write_buffer, num_bytes + self._write_offset
+        while n and n >= len( buf[0] ) :
+            n -= len( buf.popleft() )
+        self._write_offset = n
+
     def check_closed(self):
         if not self.conn: raise IOError("Stream is closed")
 
@@ -1545,6 +2429,8 @@ class IOStream( object ):
         if self.conn is None : return
 
         if self._state is None :
+            if self.edge :  # Registered once, never modified.
+                state = self.ioloop.READ | self.ioloop.WRITE | self.ioloop.EDGE
             self._state = self.ioloop.ERROR | state
             self.ioloop.add_handler(
                     self.conn.fileno(), self.on_epoll_event, self._state )
@@ -1553,49 +2439,20 @@ class IOStream( object ):
             self._state = self._state | state
             self.ioloop.update_handler( self.conn.fileno(), self._state )
 
-    def double_prefix( self, deque ):
-        """Grow by doubling, but don't split the second chunk just because the
-        first one is small.
-        """
-        new_len = max( len(deque[0]) * 2, (len(deque[0]) + len(deque[1])) )
-        self.merge_prefix( deque, new_len )
-
-    def merge_prefix( self, deque, size ):
-        """Replace the first entries in a deque of strings with a single
-        string of up to size bytes.
 
-        >>> d = collections.deque(['abc', 'de', 'fghi', 'j'])
-        >>> merge_prefix(d, 5); print d
-        deque(['abcde', 'fghi', 'j'])
+class FileSegment( object ):
+    """Segment of an open file to be written to :class:`IOStream`, refer to
+    :meth:`IOStream.write_file`."""
 
-        Strings will be split as necessary to reach the desired size.
-        >>> merge_prefix(d, 7); print d
-        deque(['abcdefg', 'hi', 'j'])
+    __slots__ = [ 'file', 'offset', 'count' ]
 
-        >>> merge_prefix(d, 3); print d
-        deque(['abc', 'defg', 'hi', 'j'])
+    def __init__( self, file, offset, count ):
+        self.file = file        # File object opened in binary mode.
+        self.offset = offset    # Offset in file to write from.
+        self.count = count      # Remaining bytes to write.
 
-        >>> merge_prefix(d, 100); print d
-        deque(['abcdefghij'])
-        """
-        if len(deque) == 1 and len(deque[0]) <= size:
-            return
-        prefix = []
-        remaining = size
-        while deque and remaining > 0:
-            chunk = deque.popleft()
-            if len(chunk) > remaining:
-                deque.appendleft(chunk[remaining:])
-                chunk = chunk[:remaining]
-            prefix.append(chunk)
-            remaining -= len(chunk)
-        # This data structure normally just contains byte strings, but
-        # the unittest gets messy if it doesn't use the default str() type,
-        # so do the merge based on the type of data that's actually present.
-        if prefix:
-            deque.appendleft(type(prefix[0])().join(prefix))
-        if not deque:
-            deque.appendleft(b"")
+    def __len__( self ):
+        return self.count
 
 
 class SSLIOStream( IOStream ):
@@ -1605,18 +2462,26 @@ class SSLIOStream( IOStream ):
     it will be used as additional keyword arguments to ssl.wrap_socket.
     """
 
+    __slots__ = [ 'ssloptions', '_ssl_accepting', '_handshake_reading',
+                  '_handshake_writing' ]
+
+    FILE_CHUNK = 64 * 1024
+    """Size of chunks to read from a file segment, to write them."""
+
     def __init__( self, httpconn ):
         self.ssloptions = h.settingsfor( 'ssl.', httpconn.server )
         super().__init__( httpconn )
+        # SSL objects buffer data internally, poll them level-triggered.
+        self.edge = False
         self._ssl_accepting = True
         self._handshake_reading = False
         self._handshake_writing = False
 
     def reading(self):
-        return self._handshake_reading or super().reading(self)
+        return self._handshake_reading or super().reading()
 
     def writing(self):
-        return self._handshake_writing or super().writing(self)
+        return self._handshake_writing or super().writing()
 
     def _do_ssl_handshake(self):
         # Based on code from test_ssl.py in the python stdlib
@@ -1636,7 +2501,7 @@ class SSLIOStream( IOStream ):
                 return self.close()
             elif err.args[0] == ssl.SSL_ERROR_SSL:
                 self.server.pa.logwarn( 
-                        "SSL Error on %d: %s" % (self.conn.fileno(), err) )
+                        "SSL Error on %d: %s", (self.conn.fileno(), err) )
                 return self.close()
             raise
         except socket.error as err:
@@ -1656,7 +2521,33 @@ class SSLIOStream( IOStream ):
             return
         super().handle_write()
 
-    def read_from_socket(self):
+    def send_buffers( self ):
+        # SSL sockets don't support sendmsg(), send the first buffer.
+        data = self._write_buffer[0]
+        if self._write_offset :
+            data = memoryview( data )[ self._write_offset: ]
+        try :
+            num_bytes = self.conn.send( data )
+        except ssl.SSLWantWriteError :
+            return 0
+        self.advance( num_bytes )
+        return num_bytes
+
+    def send_segment( self, segment ):
+        # sendfile() would bypass encryption, read the segment in chunks and
+        # queue them ahead of the segment.
+        data = os.pread( segment.file.fileno(),
+                         min( segment.count, self.FILE_CHUNK ), segment.offset )
+        if not data :
+            raise IOError( "File %r truncated" % segment.file )
+        segment.offset += len( data )
+        segment.count -= len( data )
+        if segment.count == 0 :
+            self._write_buffer.popleft().file.close()
+        self._write_buffer.appendleft( data )
+        return self.send_buffers()
+
+    def read_from_socket( self, nbytes ):
         if self._ssl_accepting:
             # If the handshake hasn't finished yet, there can't be anything
             # to read (attempting to read may or may not raise an exception
@@ -1668,7 +2559,7 @@ class SSLIOStream( IOStream ):
             # The recv() method blocks (at least in python 2.6) if it is
             # called when there is nothing to read, so we have to use
             # read() instead.
-            chunk = self.conn.read( self.read_chunk_size )
+            chunk = self.conn.read( nbytes )
         except ssl.SSLError as e:
             # SSLError is a subclass of socket.error, so this except
             # block must come first.
@@ -1682,4 +2573,5 @@ class SSLIOStream( IOStream ):
         # May be the remote end closed
         if not chunk :
             raise Exception( "May be remote end %r closed" % self.conn )
-        return chunk
+        self._read_buffer.extend( chunk )
+        return len( chunk )
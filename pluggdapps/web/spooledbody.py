@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+# This file is subject to the terms and conditions defined in
+# file 'LICENSE', which is part of this source code package.
+#       Copyright (c) 2011 R Pratap Chakravarthy
+
+"""Request body streamed from the connection as it is received, instead of
+being buffered as a single byte-string. Received data is kept in memory
+till it grows beyond a spool size, after which it is spilled to a temporary
+file, so that large uploads cost a bounded amount of memory per client.
+
+Views consume the body by iterating over it, chunk by chunk, or by reading
+it like a file.
+"""
+
+import tempfile
+
+__all__ = [ 'SpooledBody' ]
+
+class SpooledBody( object ):
+    """Request body received in pieces, spilled to a temporary file once
+    it is larger than ``spool_size`` bytes. Iterating over the body yields
+    chunks of ``chunk_size`` bytes from its beginning."""
+
+    __slots__ = [ 'file', 'size', 'spool_size', 'chunk_size' ]
+
+    def __init__( self, spool_size, chunk_size=65536 ):
+        self.file = tempfile.SpooledTemporaryFile( max_size=spool_size )
+        self.size = 0
+        self.spool_size = spool_size
+        self.chunk_size = chunk_size
+
+    def __len__( self ):
+        return self.size
+
+    def __iter__( self ):
+        self.file.seek( 0 )
+        data = self.file.read( self.chunk_size )
+        while data :
+            yield data
+            data = self.file.read( self.chunk_size )
+
+    def write( self, data ):
+        """Append ``data``, a byte-string or memoryview, to the body."""
+        self.file.write( data )
+        self.size += len( data )
+
+    def finish( self ):
+        """Body is received, rewind for reading and return self."""
+        self.file.seek( 0 )
+        return self
+
+    def read( self, size=-1 ):
+        """Read upto ``size`` bytes from current position. Read till the end
+        of body if ``size`` is negative."""
+        return self.file.read( size )
+
+    def getvalue( self ):
+        """Return the entire body as byte-string, reading it into memory."""
+        self.file.seek( 0 )
+        return self.file.read()
+
+    def spilled( self ):
+        """Whether the body was spilled to a temporary file."""
+        return self.size > self.spool_size
+
+    def transform( self, callback ):
+        """Return a new body with each chunk of this body transformed by
+        ``callback( data, finishing )``. ``callback`` is called for every
+        chunk with ``finishing`` as False, and finally with empty data and
+        ``finishing`` as True. This body is closed."""
+        body = SpooledBody( self.spool_size, self.chunk_size )
+        [ body.write( callback( data, False )) for data in self ]
+        body.write( callback( b'', True ))
+        self.close()
+        return body.finish()
+
+    def close( self ):
+        """Release memory or the temporary file holding the body."""
+        self.file.close()
@@ -48,7 +48,7 @@ class StaticView( Plugin ):
             resp.write( c['body'] )
             resp.flush( finishing=True )
         else :
-            resp.pa.logwarn( "Not found %r" % docfile )
+            resp.pa.logwarn( "Not found %r", (docfile,) )
             resp.set_status( b'404' )
             resp.flush( finishing=True )
 
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+# This file is subject to the terms and conditions defined in
+# file 'LICENSE', which is part of this source code package.
+#       Copyright (c) 2011 R Pratap Chakravarthy
+
+"""Hierarchical timing wheel, for large number of timers that are
+frequently reset or cancelled, like idle, read and write timeouts on client
+connections. Adding, resetting and cancelling a timer are O(1) operations.
+
+Time is divided into ticks of ``resolution`` seconds. A timer due within
+``slots`` ticks is kept in the lowest level wheel, a timer due within
+``slots ** 2`` ticks is kept in the next level and so on. As time advances,
+timers in a slot of higher level wheel are cascaded down to lower levels
+and expire from the lowest level. A timer expires within ``resolution``
+seconds after its deadline, never before.
+"""
+
+import time, math
+
+__all__ = [ 'Timer', 'TimerWheel' ]
+
+class Timer( object ):
+    """Timer managed by :class:`TimerWheel`."""
+
+    __slots__ = [ 'deadline', 'callback', 'slot' ]
+
+    def __init__( self, deadline, callback ):
+        self.deadline = deadline    # UNIX timestamp.
+        self.callback = callback
+        self.slot = None            # Set of timers, containing this timer.
+
+
+class TimerWheel( object ):
+    """Timing wheel of ``levels`` number of wheels, each having ``slots``
+    number of slots. ``slots`` must be a power of 2."""
+
+    def __init__( self, resolution=1.0, slots=64, levels=4, now=None ):
+        self.resolution = resolution
+        self.bits = slots.bit_length() - 1
+        self.mask = slots - 1
+        self.wheels = [ [ set() for i in range( slots ) ]
+                        for level in range( levels ) ]
+        self.tick = int( (time.time() if now is None else now) / resolution )
+        self.count = 0
+
+    def add( self, deadline, callback ):
+        """Call ``callback`` at ``deadline``, a UNIX timestamp. Return a
+        :class:`Timer` that can be passed to :meth:`reset` and
+        :meth:`remove`."""
+        timer = Timer( deadline, callback )
+        self.place( timer )
+        self.count += 1
+        return timer
+
+    def reset( self, timer, deadline ):
+        """Move ``timer`` to a new ``deadline``. A cancelled or expired timer
+        is scheduled again."""
+        if timer.slot is None :
+            self.count += 1
+        else :
+            timer.slot.discard( timer )
+        timer.deadline = deadline
+        self.place( timer )
+
+    def remove( self, timer ):
+        """Cancel ``timer``, if it is not already cancelled or expired."""
+        if timer.slot is not None :
+            timer.slot.discard( timer )
+            timer.slot = None
+            self.count -= 1
+
+    def advance( self, now ):
+        """Advance the wheel till ``now`` and return a list of expired
+        timers, in no particular order. Callbacks of expired timers are not
+        called."""
+        target = int( now / self.resolution )
+        if self.count == 0 :
+            self.tick = max( self.tick, target )
+            return []
+
+        expired, bits, mask = [], self.bits, self.mask
+        while self.tick < target :
+            self.tick += 1
+            tick, level = self.tick, 0
+            # Cascade slots of higher levels, when lower levels wrap around.
+            while (tick & mask) == 0 and level < len( self.wheels ) - 1 :
+                level += 1
+                tick >>= bits
+                slot = self.wheels[level][ tick & mask ]
+                timers = list( slot )
+                slot.clear()
+                [ self.place( timer, self.tick ) for timer in timers ]
+
+            slot = self.wheels[0][ self.tick & mask ]
+            for timer in list( slot ) :
+                if self.ticks( timer.deadline ) <= self.tick :
+                    slot.discard( timer )
+                    timer.slot = None
+                    self.count -= 1
+                    expired.append( timer )
+                else :  # Timer beyond the span of the wheel, placed again.
+                    slot.discard( timer )
+                    self.place( timer )
+        return expired
+
+    #---- Local functions
+
+    def ticks( self, deadline ):
+        """Tick at which a timer for ``deadline`` expires, rounded up so that
+        timers never expire before their deadline."""
+        return math.ceil( deadline / self.resolution )
+
+    def place( self, timer, earliest=None ):
+        """Put ``timer`` in a slot based on its deadline, not earlier than
+        ``earliest`` tick, which defaults to the next tick."""
+        earliest = self.tick + 1 if earliest is None else earliest
+        tick = max( self.ticks( timer.deadline ), earliest )
+        delta, bits, level = tick - self.tick, self.bits, 0
+        last = len( self.wheels ) - 1
+        while level < last and delta >> (bits * (level+1)) :
+            level += 1
+        if delta >> (bits * (level+1)) :
+            # Beyond the span of the wheel, park in the farthest slot.
+            tick = self.tick + (1 << (bits * (level+1))) - 1
+        slot = self.wheels[level][ (tick >> (bits * level)) & self.mask ]
+        slot.add( timer )
+        timer.slot = slot
@@ -11,8 +11,11 @@ from   pluggdapps.const          import URLSEP
 from   pluggdapps.plugin         import implements, Plugin
 from   pluggdapps.interfaces     import IWebApp
 from   pluggdapps.web.interfaces import IHTTPRouter,IHTTPCookie, IHTTPResponse,\
-                                        IHTTPSession, IHTTPInBound, \
+                                        IHTTPRequest, IHTTPSession, \
+                                        IHTTPInBound, \
                                         IHTTPOutBound, IHTTPLiveDebug
+from   pluggdapps.web.multipart  import MultipartError
+from   pluggdapps.web.spooledbody import SpooledBody
 import pluggdapps.utils          as h
 
 class WebApp( Plugin ):
@@ -28,6 +31,14 @@ class WebApp( Plugin ):
 
     implements( IWebApp )
 
+    requestpool = None
+    """:class:`pluggdapps.utils.lib.FreeList` of finished request objects
+    that can be re-used."""
+
+    responsepool = None
+    """:class:`pluggdapps.utils.lib.FreeList` of finished response objects
+    that can be re-used."""
+
     def startapp( self ):
         """:meth:`pluggdapps.interfaces.IWebApps.startapp` interface method."""
         # Initialize plugins required to handle http request. 
@@ -46,23 +57,36 @@ class WebApp( Plugin ):
         else :
             self.livedebug = None
 
+        # Free-list of request and response objects.
+        self.requestpool = h.FreeList( self['pool.requests'] )
+        self.responsepool = h.FreeList( self['pool.requests'] )
+
         # Initialize plugins.
         self.router.onboot()
 
     def dorequest( self, request, body=None, chunk=None, trailers=None ):
         """:meth:`pluggdapps.interfaces.IWebApps.dorequest` interface method."""
-        self.pa.logdebug( 
-          "[%s] %s %s" % (request.method,request.uri,request.httpconn.address))
+        self.pa.logdebug( "[%s] %s %s", ( request.method, request.uri,
+                                          request.httpconn.address ))
+        stats = self.pa.stats
 
         try :
             # Initialize framework attributes
             request.router = self.router
             request.cookie = self.cookie
             # TODO : Initialize session attribute here.
-            request.response = response = \
-              self.qp( IHTTPResponse, self['IHTTPResponse'], request )
+            request.response = response = self.newresponse( request )
+            t = stats and stats.timer()
             request.handle( body=body, chunk=chunk, trailers=trailers )
+            stats and stats.since( self.netpath, None, 'handle', t )
             self.router.route( request )
+        except MultipartError as e :
+            # Malformed or too large request body is client's error.
+            self.pa.logwarn( "[%s] %s %s", ( e.status, request.uri, e ))
+            response.set_header( 'content_type', b'text/plain' )
+            response.set_status( e.status )
+            response.write( str( e ))
+            response.flush( finishing=True )
         except :
             self.pa.logerror( h.print_exc() )
             response.set_header( 'content_type', b'text/html' )
@@ -79,13 +103,54 @@ class WebApp( Plugin ):
 
     def dochunk( self, request, chunk=None, trailers=None ):
         """:meth:`pluggdapps.interfaces.IWebApps.dochunk` interface method."""
+        stats = self.pa.stats
+        t = stats and stats.timer()
         request.handle( chunk=chunk, trailers=trailers )
+        stats and stats.since( self.netpath, None, 'handle', t )
         self.router.route( request )
 
     def onfinish( self, request ):
         """:meth:`pluggdapps.interfaces.IWebApps.onfinish` interface method."""
         self.router.onfinish( request )
 
+    def newrequest( self, httpconn, method, uri, uriparts, version, headers ):
+        """Return a :class:`IHTTPRequest` plugin instance for a new request,
+        re-using a pooled request object if available."""
+        request = self.requestpool.get() if self.requestpool else None
+        if request is not None :
+            request.renew( httpconn, method, uri, uriparts, version, headers )
+        else :
+            request = self.qp( IHTTPRequest, self['IHTTPRequest'],
+                               httpconn, method, uri, uriparts, version,
+                               headers )
+        return request
+
+    def newresponse( self, request ):
+        """Return a :class:`IHTTPResponse` plugin instance for ``request``,
+        re-using a pooled response object if available."""
+        response = self.responsepool.get() if self.responsepool else None
+        if response is not None :
+            response.renew( request )
+        else :
+            response = self.qp( IHTTPResponse, self['IHTTPResponse'], request )
+        return response
+
+    def recycle( self, request ):
+        """Pool a finished ``request`` and its response for re-use. Called by
+        :class:`IHTTPConnection` plugin after the request is finished and
+        the connection no more refers to them. Spooled request body and
+        uploaded files are closed, whether the request is pooled or not."""
+        if isinstance( request.body, SpooledBody ) :
+            request.body.close()
+        [ f['value'].close() for fs in request.files.values() for f in fs
+          if isinstance( f['value'], SpooledBody ) ]
+        if not self['pool.requests'] : return
+        response = request.response
+        if response is not None and self.responsepool is not None :
+            self.responsepool.put( response )
+        if self.requestpool is not None :
+            self.requestpool.put( request )
+
     def shutdown( self ):
         """:meth:`pluggdapps.interfaces.IWebApps.shutdown` interface method."""
         self.router = None
@@ -122,6 +187,7 @@ class WebApp( Plugin ):
         """:meth:`pluggdapps.plugin.ISettings.normalize_settings` interface
         method."""
         sett['encoding'] = sett['encoding'].lower()
+        sett['pool.requests'] = h.asint( sett['pool.requests'], 0 )
         sett['IHTTPInBound'] = h.parsecsvlines( sett['IHTTPInBound'] )
         sett['IHTTPOutBound'] = h.parsecsvlines( sett['IHTTPOutBound'] )
         return sett
@@ -170,6 +236,16 @@ _default_settings['IHTTPResponse']  = {
     'types'   : (str,),
     'help'    : "Name of the plugin to encapsulate HTTP response."
 }
+_default_settings['pool.requests'] = {
+    'default' : 0,
+    'types'   : (int,),
+    'help'    : "Number of finished request and response objects to pool for "
+                "re-use, reducing allocations at high request rates. "
+                "Configured IHTTPRequest and IHTTPResponse plugins must "
+                "implement reset() and renew() methods, and views shall not "
+                "refer to request or response once the request is finished. "
+                "Pooling is disabled by default."
+}
 _default_settings['IHTTPInBound'] = {
     'default' : '',
     'types'   : ('csv',list),
@@ -55,6 +55,11 @@ class WebAdminRouter( MatchRouter ):
                        view=get_json_config
                      )
 
+        self.add_view( 'stats', '/stats',
+                       method=b'GET',
+                       media_type='application/json',
+                       view=get_json_stats )
+
         self.add_view( 'framedebug', '/debug/frame/{frameid}',
                        method=b'POST',
                        view=frame_debug )
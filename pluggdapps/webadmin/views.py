@@ -4,7 +4,7 @@
 # file 'LICENSE', which is part of this source code package.
 #       Copyright (c) 2011 R Pratap Chakravarthy
 
-import pprint
+import pprint, os
 from   copy                 import deepcopy
 
 from   pluggdapps.platform  import DEFAULT, pluggdapps_defaultsett
@@ -107,6 +107,24 @@ def get_json_config( request, c ):
     response.write( json )
     response.flush( finishing=True )
 
+def get_json_stats( request, c ):
+    """Request latency statistics, refer to :mod:`pluggdapps.stats`, and
+    accept and connection statistics of the worker process serving this
+    request, along with its ``pid``. In pre-fork mode, statistics are not
+    aggregated across worker processes. Latency statistics are empty if not
+    enabled."""
+    response = request.response
+    stats = request.pa.stats
+    server = request.httpconn.server
+    listenstats = getattr( server, 'listenstats', None )
+    connstats = getattr( server, 'connstats', None )
+    d = stats.snapshot() if stats else {}
+    d['listeners'] = listenstats() if listenstats else []
+    d['connections'] = connstats() if connstats else {}
+    d['pid'] = os.getpid()
+    response.write( h.json_encode( d ))
+    response.flush( finishing=True )
+
 def frame_debug( request, c ):
     frame_index = request.webapp.livedebug.frame_index 
     frameid = request.matchdict['frameid']